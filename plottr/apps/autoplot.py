@@ -11,9 +11,8 @@ from packaging import version
 
 from .. import QtCore, Flowchart, Signal, Slot, QtWidgets, QtGui
 from .. import log as plottrlog
-from ..data.datadict import DataDictBase
+from ..data.datadict import DataDictBase, declared_shape
 from ..data.datadict_storage import DDH5Loader
-from ..data.qcodes_dataset import QCodesDSLoader
 from ..gui import PlotWindow
 from ..gui.widgets import MonitorIntervalInput, SnapshotWidget
 from ..node.data_selector import DataSelector
@@ -237,7 +236,10 @@ class AutoPlotMainWindow(PlotWindow):
             drs = {axes[0]: 'x-axis'}
 
         self.fc.nodes()['Data selection'].selectedData = selected
-        self.fc.nodes()['Grid'].grid = GridOption.guessShape, {}
+        if declared_shape(data) is not None:
+            self.fc.nodes()['Grid'].grid = GridOption.metadataShape, {}
+        else:
+            self.fc.nodes()['Grid'].grid = GridOption.guessShape, {}
         self.fc.nodes()['Dimension assignment'].dimensionRoles = drs
         unwrap_optional(self.plotWidget).plot.draw()
 
@@ -292,6 +294,8 @@ def autoplotQcodesDataset(log: bool = False,
 
     returns the flowchart object and the mainwindow widget
     """
+    # qcodes is slow to import, and not needed for DDH5.
+    from ..data.qcodes_dataset import QCodesDSLoader
 
     fc = linearFlowchart(
         ('Data loader', QCodesDSLoader),
@@ -17,17 +17,22 @@ import time
 import sys
 import argparse
 import logging
-from typing import Optional, Sequence, List, Dict, Iterable, Union, cast
+import threading
+from functools import lru_cache
+from typing import Optional, Sequence, List, Dict, Union, Any, Tuple, cast
 from typing_extensions import TypedDict
 
+import numpy as np
 import pandas
 
 from plottr import QtCore, QtWidgets, Signal, Slot, QtGui, Flowchart
 
 from .. import log as plottrlog
 from ..data.qcodes_dataset import (get_runs_from_db_as_dataframe,
-                                   get_ds_structure, load_dataset_from)
+                                   get_ds_structure, load_dataset_from,
+                                   close_db_connections)
 from plottr.gui.widgets import MonitorIntervalInput, FormLayoutWrapper, dictToTreeWidgetItems
+from plottr.gui.tools import populateTreeWidgetItem
 
 from .autoplot import autoplotQcodesDataset, QCAutoPlotMainWindow
 
@@ -60,22 +65,23 @@ class DateList(QtWidgets.QListWidget):
 
     @Slot(list)
     def updateDates(self, dates: Sequence[str]) -> None:
-        for d in dates:
-            if len(self.findItems(d, QtCore.Qt.MatchExactly)) == 0:
-                self.insertItem(0, d)
-
+        newDates = set(dates)
+        shown = set()
         i = 0
         while i < self.count():
-            if self.item(i).text() not in dates:
+            text = self.item(i).text()
+            if text not in newDates:
                 item = self.takeItem(i)
                 del item
             else:
+                shown.add(text)
                 i += 1
 
-            if i >= self.count():
-                break
-
-        self.sortItems(QtCore.Qt.DescendingOrder)
+        added = newDates.difference(shown)
+        for d in added:
+            self.insertItem(0, d)
+        if len(added) > 0:
+            self.sortItems(QtCore.Qt.DescendingOrder)
 
     @Slot()
     def sendSelectedDates(self) -> None:
@@ -106,28 +112,114 @@ class DateList(QtWidgets.QListWidget):
     ])
 
 
-class SortableTreeWidgetItem(QtWidgets.QTreeWidgetItem):
+class RunListModel(QtCore.QAbstractTableModel):
     """
-    QTreeWidgetItem with an overridden comparator that sorts numerical values
-    as numbers instead of sorting them alphabetically.
+    Table model for a selection of runs from a db overview dataframe (as
+    returned by ``get_runs_from_db_as_dataframe``), with one row per run.
     """
-    def __init__(self, strings: Iterable[str]):
-        super().__init__(strings)
 
-    def __lt__(self, other: "SortableTreeWidgetItem") -> bool:
-        col = self.treeWidget().sortColumn()
-        text1 = self.text(col)
-        text2 = other.text(col)
-        try:
-            return float(text1) < float(text2)
-        except ValueError:
-            return text1 < text2
+    cols = ['Run ID', 'Experiment', 'Sample', 'Name', 'Started', 'Completed', 'Records', 'GUID']
 
+    #: Role under which we provide values for sorting (numbers are sorted
+    #: as numbers, not alphabetically).
+    SortRole = QtCore.Qt.UserRole
+
+    _numericCols = [0, 6]
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._runs = pandas.DataFrame()
+        self._columns = self._columnValues(self._runs)
+
+    def _columnValues(self, runs: pandas.DataFrame) -> List[Sequence[Any]]:
+        if runs.empty:
+            return [[] for _ in self.cols]
+        return [
+            runs.index.values,
+            runs['experiment'].values,
+            runs['sample'].values,
+            runs['name'].values,
+            (runs['started_date'] + ' ' + runs['started_time']).values,
+            (runs['completed_date'] + ' ' + runs['completed_time']).values,
+            runs['records'].values,
+            runs['guid'].values,
+        ]
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._runs)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.cols)
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation,
+                   role: int = QtCore.Qt.DisplayRole) -> Any:
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.cols[section]
+        return None
+
+    def data(self, index: QtCore.QModelIndex,
+             role: int = QtCore.Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        val = self._columns[index.column()][index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return str(val)
+        elif role == self.SortRole:
+            if index.column() in self._numericCols:
+                return int(val)
+            return str(val)
+        return None
+
+    def runId(self, row: int) -> int:
+        return int(self._columns[0][row])
+
+    def setRuns(self, runs: pandas.DataFrame) -> None:
+        """
+        Set the runs to show. If the new selection contains the previous
+        runs, plus possibly new ones, the model is updated in place: only
+        changed runs are updated, and new ones are added.
+
+        :param runs: the runs to show, indexed by run ID.
+        """
+        runs = runs.sort_index()
+        nOld = len(self._runs)
+
+        if nOld == 0 or len(runs) < nOld \
+                or not runs.index[:nOld].equals(self._runs.index):
+            self.beginResetModel()
+            self._runs = runs
+            self._columns = self._columnValues(runs)
+            self.endResetModel()
+            return
+
+        oldColumns = self._columns
+        columns = self._columnValues(runs)
+        changed = np.zeros(nOld, dtype=bool)
+        for old, new in zip(oldColumns, columns):
+            changed |= np.asarray(old) != np.asarray(new[:nOld])
+
+        if len(runs) > nOld:
+            self.beginInsertRows(QtCore.QModelIndex(), nOld, len(runs) - 1)
+            self._runs = runs
+            self._columns = columns
+            self.endInsertRows()
+        else:
+            self._runs = runs
+            self._columns = columns
 
-class RunList(QtWidgets.QTreeWidget):
+        for row in np.flatnonzero(changed):
+            self.dataChanged.emit(self.index(row, 0),
+                                  self.index(row, len(self.cols) - 1))
+
+
+class RunList(QtWidgets.QTreeView):
     """Shows the list of runs for a given date selection."""
 
-    cols = ['Run ID', 'Experiment', 'Sample', 'Name', 'Started', 'Completed', 'Records', 'GUID']
+    cols = RunListModel.cols
 
     runSelected = Signal(int)
     runActivated = Signal(int)
@@ -135,52 +227,46 @@ class RunList(QtWidgets.QTreeWidget):
     def __init__(self, parent: Optional[QtWidgets.QWidget] = None):
         super().__init__(parent)
 
-        self.setColumnCount(len(self.cols))
-        self.setHeaderLabels(self.cols)
-
-        self.itemSelectionChanged.connect(self.selectRun)
-        self.itemActivated.connect(self.activateRun)
-
-    def addRun(self, runId: int, **vals: str) -> None:
-        lst = [str(runId)]
-        lst.append(vals.get('experiment', ''))
-        lst.append(vals.get('sample', ''))
-        lst.append(vals.get('name', ''))
-        lst.append(vals.get('started_date', '') + ' ' + vals.get('started_time', ''))
-        lst.append(vals.get('completed_date', '') + ' ' + vals.get('completed_time', ''))
-        lst.append(str(vals.get('records', '')))
-        lst.append(vals.get('guid', ''))
-
-        item = SortableTreeWidgetItem(lst)
-        self.addTopLevelItem(item)
+        self.runModel = RunListModel(self)
+        self.proxyModel = QtCore.QSortFilterProxyModel(self)
+        self.proxyModel.setSourceModel(self.runModel)
+        self.proxyModel.setSortRole(RunListModel.SortRole)
+        self.setModel(self.proxyModel)
 
-    def setRuns(self, selection: Dict[int, Dict[str, str]]) -> None:
-        self.clear()
+        self.setRootIsDecorated(False)
+        self.setUniformRowHeights(True)
+        self.setSortingEnabled(True)
+        self.sortByColumn(0, QtCore.Qt.DescendingOrder)
 
-        # disable sorting before inserting values to avoid performance hit
-        self.setSortingEnabled(False)
+        self.runModel.modelReset.connect(self.resizeColumns)
+        self.selectionModel().selectionChanged.connect(self.selectRun)
+        self.activated.connect(self.activateRun)
 
-        for runId, record in selection.items():
-            self.addRun(runId, **record)
+    def setRuns(self, selection: pandas.DataFrame) -> None:
+        self.runModel.setRuns(selection)
 
-        self.setSortingEnabled(True)
+    def clear(self) -> None:
+        self.runModel.setRuns(pandas.DataFrame())
 
+    @Slot()
+    def resizeColumns(self) -> None:
         for i in range(len(self.cols)):
             self.resizeColumnToContents(i)
 
+    def _runId(self, index: QtCore.QModelIndex) -> int:
+        return self.runModel.runId(self.proxyModel.mapToSource(index).row())
+
     @Slot()
     def selectRun(self) -> None:
-        selection = self.selectedItems()
+        selection = self.selectionModel().selectedRows()
         if len(selection) == 0:
             return
 
-        runId = int(selection[0].text(0))
-        self.runSelected.emit(runId)
+        self.runSelected.emit(self._runId(selection[0]))
 
-    @Slot(QtWidgets.QTreeWidgetItem, int)
-    def activateRun(self, item: QtWidgets.QTreeWidgetItem, column: int) -> None:
-        runId = int(item.text(0))
-        self.runActivated.emit(runId)
+    @Slot(QtCore.QModelIndex)
+    def activateRun(self, index: QtCore.QModelIndex) -> None:
+        self.runActivated.emit(self._runId(index))
 
 
 class RunInfo(QtWidgets.QTreeWidget):
@@ -195,21 +281,86 @@ class RunInfo(QtWidgets.QTreeWidget):
 
         self.setHeaderLabels(['Key', 'Value'])
         self.setColumnCount(2)
+        self.itemExpanded.connect(populateTreeWidgetItem)
 
     @Slot(dict)
     def setInfo(self, infoDict: Dict[str, Union[dict, str]]) -> None:
         self.clear()
 
-        items = dictToTreeWidgetItems(infoDict)
+        # items for nested dictionaries (like large snapshots) are only
+        # created when expanded. Initially, we show the first two levels.
+        items = dictToTreeWidgetItems(infoDict, lazy=True)
         for item in items:
             self.addTopLevelItem(item)
             item.setExpanded(True)
+            for i in range(item.childCount()):
+                item.child(i).setExpanded(True)
 
-        self.expandAll()
         for i in range(2):
             self.resizeColumnToContents(i)
 
 
+@lru_cache(maxsize=64)
+def loadRunInfo(path: str, runId: int) -> Dict[str, Any]:
+    """
+    Load the information on a run that the inspectr displays (data structure
+    and snapshot). Results are cached, and must not be modified.
+    """
+    ds = load_dataset_from(path, runId)
+    snap = None
+    if hasattr(ds, 'snapshot'):
+        snap = ds.snapshot
+
+    structure = cast(Dict[str, dict], get_ds_structure(ds))
+    # cast away typed dict so we can pop a key
+    for k, v in structure.items():
+        v.pop('values')
+    return {'Data structure': structure,
+            'QCoDeS Snapshot': snap}
+
+
+class LoadRunInfoProcess(QtCore.QObject):
+    """
+    Worker object for loading run information (see :func:`loadRunInfo`) in a
+    separate thread. Only the most recent request is processed; requests
+    that are superseded before the worker gets to them are dropped.
+    """
+
+    #: Signal (`str`, `int`, `dict`) -- emitted with db path, run ID, and
+    #: info, once info on a run has been loaded.
+    runInfoLoaded = Signal(str, int, object)
+
+    _requested = Signal()
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[str, int]] = None
+        self._requested.connect(self._loadRunInfo, QtCore.Qt.QueuedConnection)
+
+    def request(self, path: str, runId: int) -> None:
+        """Request loading run info; can be called from any thread."""
+        with self._lock:
+            self._pending = (path, runId)
+        self._requested.emit()
+
+    @Slot()
+    def _loadRunInfo(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+
+        path, runId = pending
+        try:
+            info = loadRunInfo(path, runId)
+        except Exception as e:
+            logger().error(f"Could not load info on run {runId} from "
+                           f"{path}: {e}")
+            return
+        self.runInfoLoaded.emit(path, runId, info)
+
+
 class LoadDBProcess(QtCore.QObject):
     """
     Worker object for getting a qcodes db overview as pandas dataframe.
@@ -219,12 +370,21 @@ class LoadDBProcess(QtCore.QObject):
     dbdfLoaded = Signal(object)
     pathSet = Signal()
 
-    def setPath(self, path: str) -> None:
+    def setPath(self, path: str,
+                previous: Optional[pandas.DataFrame] = None) -> None:
+        """Set the db to load, and start loading.
+
+        :param path: path of the db file.
+        :param previous: the dataframe from the last load of the same file.
+            If given, only new and incomplete runs are loaded from the db.
+        """
         self.path = path
+        self.previous = previous
         self.pathSet.emit()
 
     def loadDB(self) -> None:
-        dbdf = get_runs_from_db_as_dataframe(self.path)
+        dbdf = get_runs_from_db_as_dataframe(self.path, self.previous)
+        self.previous = None
         self.dbdfLoaded.emit(dbdf)
 
 
@@ -333,6 +493,15 @@ class QCodesDBInspector(QtWidgets.QMainWindow):
         self.loadDBProcess.dbdfLoaded.connect(self.loadDBThread.quit)
         self.loadDBThread.started.connect(self.loadDBProcess.loadDB)  # type: ignore[attr-defined]
 
+        # Loading run info; can be slow for large snapshots.
+        self.loadRunInfoProcess = LoadRunInfoProcess()
+        self.loadRunInfoThread = QtCore.QThread()
+        self.loadRunInfoProcess.moveToThread(self.loadRunInfoThread)
+        self.loadRunInfoProcess.runInfoLoaded.connect(self.runInfoLoaded)
+        self.loadRunInfoThread.finished.connect(close_db_connections,
+                                                QtCore.Qt.DirectConnection)
+        self._selectedRun: Optional[Tuple[str, int]] = None
+
         ### connect signals/slots
 
         self.dbdfUpdated.connect(self.updateDates)
@@ -361,6 +530,9 @@ class QCodesDBInspector(QtWidgets.QMainWindow):
         for runId, info in self._plotWindows.items():
             info['window'].close()
 
+        self.loadRunInfoThread.quit()
+        self.loadRunInfoThread.wait()
+
     @Slot()
     def showDBPath(self) -> None:
         tstamp = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -399,11 +571,19 @@ class QCodesDBInspector(QtWidgets.QMainWindow):
             # refreshed one.
             self.latestRunId = None
 
+        self._startLoading()
+
+    def _startLoading(self, previous: Optional[pandas.DataFrame] = None) -> None:
         if self.filepath is not None:
             if not self.loadDBThread.isRunning():
-                self.loadDBProcess.setPath(self.filepath)
+                self.loadDBProcess.setPath(self.filepath, previous)
 
     def DBLoaded(self, dbdf: pandas.DataFrame) -> None:
+        if dbdf is self.dbdf:
+            # incremental refresh without any new or changed runs.
+            self.showDBPath()
+            return
+
         self.dbdf = dbdf
         self.dbdfUpdated.emit()
         self.dateList.sendSelectedDates()
@@ -436,7 +616,7 @@ class QCodesDBInspector(QtWidgets.QMainWindow):
             else:
                 self.latestRunId = -1
 
-            self.loadFullDB()
+            self._startLoading(previous=self.dbdf)
 
     @Slot(int)
     def setMonitorInterval(self, val: int) -> None:
@@ -456,26 +636,25 @@ class QCodesDBInspector(QtWidgets.QMainWindow):
     def setDateSelection(self, dates: Sequence[str]) -> None:
         if len(dates) > 0:
             assert self.dbdf is not None
-            selection = self.dbdf.loc[self.dbdf['started_date'].isin(dates)].sort_index(ascending=False)
-            self.runList.setRuns(selection.to_dict(orient='index'))
+            selection = self.dbdf.loc[self.dbdf['started_date'].isin(dates)]
+            self.runList.setRuns(selection)
         else:
             self.runList.clear()
 
     @Slot(int)
     def setRunSelection(self, runId: int) -> None:
         assert self.filepath is not None
-        ds = load_dataset_from(self.filepath, runId)
-        snap = None
-        if hasattr(ds, 'snapshot'):
-            snap = ds.snapshot
-
-        structure = cast(Dict[str, dict], get_ds_structure(ds))
-        # cast away typed dict so we can pop a key
-        for k, v in structure.items():
-            v.pop('values')
-        contentInfo = {'Data structure': structure,
-                       'QCoDeS Snapshot': snap}
-        self._sendInfo.emit(contentInfo)
+        self._selectedRun = (self.filepath, runId)
+        if not self.loadRunInfoThread.isRunning():
+            self.loadRunInfoThread.start()
+        self.loadRunInfoProcess.request(self.filepath, runId)
+
+    @Slot(str, int, object)
+    def runInfoLoaded(self, path: str, runId: int,
+                      info: Dict[str, Any]) -> None:
+        # ignore info on runs that aren't selected anymore.
+        if (path, runId) == self._selectedRun:
+            self._sendInfo.emit(info)
 
     @Slot(int)
     def plotRun(self, runId: int) -> None:
@@ -3,16 +3,217 @@
 import sys
 import os
 import time
+import logging
+import sqlite3
 import argparse
-from typing import List, Optional, Dict
-from functools import partial
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Optional, Dict, Sequence, Set, Tuple
 
-from .. import QtCore, QtWidgets, Signal, Slot
+from .. import QtCore, QtGui, QtWidgets, Signal, Slot
+from .. import log as plottrlog
+from ..data.datadict import DataDict
 from ..data.datadict_storage import all_datadicts_from_hdf5
+from ..data.ddh5_index import DDH5Index
 from ..apps.autoplot import autoplotDDH5
 from ..utils.misc import unwrap_optional
 
 from .ui.Monitr_UI import Ui_MainWindow
+from .ui.monitr import scanFolders
+
+
+def logger() -> logging.Logger:
+    logger = logging.getLogger('plottr.apps.monitr')
+    logger.setLevel(plottrlog.LEVEL)
+    return logger
+
+
+class StructurePrefetcher(QtCore.QObject):
+    """Reads the structure of data files (as returned by
+    :func:`.all_datadicts_from_hdf5` with ``structure_only=True``) in a pool
+    of background threads.
+
+    Files that cannot be read yet (because a writer holds them, or they don't
+    contain any data yet) are tried again, with increasing delays. The
+    results are cached as long as the files don't change; they are delivered
+    via signals, i.e., in the thread the prefetcher lives in.
+
+    :param nWorkers: number of threads.
+    :param nRetries: how often to try again to read a file.
+    :param retryDelay: delay (in seconds) before the first retry; doubled
+        for each following one.
+    :param cacheSize: maximum number of structures to keep.
+    """
+
+    #: Signal(str, object, object) -- emitted when the structure of a file
+    #: has been read.
+    #: Arguments:
+    #:   - the path of the file
+    #:   - the datadicts in the file, by group
+    #:   - modification time and size of the file when read
+    structureLoaded = Signal(str, object, object)
+
+    #: Signal(str, str) -- emitted when a file could not be read.
+    #: Arguments:
+    #:   - the path of the file
+    #:   - the error message
+    structureFailed = Signal(str, str)
+
+    def __init__(self, nWorkers: int = 4, nRetries: int = 8,
+                 retryDelay: float = 0.05, cacheSize: int = 1000,
+                 parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self.nRetries = nRetries
+        self.retryDelay = retryDelay
+        self.cacheSize = cacheSize
+
+        self._executor = ThreadPoolExecutor(max_workers=nWorkers)
+        self._stop = threading.Event()
+        self._inFlight: Set[str] = set()
+        self._futures: Set[Future] = set()
+        self._cache: "OrderedDict[str, Tuple[Tuple[float, int], Dict[str, DataDict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def shutdown(self) -> None:
+        """Stop reading; waits for the threads to finish."""
+        self._stop.set()
+        # (Executor.shutdown can only cancel pending work itself from
+        # python 3.9 on.)
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def isLoading(self, filePath: str) -> bool:
+        with self._lock:
+            return filePath in self._inFlight
+
+    def cached(self, filePath: str) -> Optional[Dict[str, DataDict]]:
+        """The structure of a file, if cached and the file has not changed."""
+        with self._lock:
+            entry = self._cache.get(filePath)
+        if entry is None:
+            return None
+        try:
+            st = os.stat(filePath)
+        except OSError:
+            return None
+        if entry[0] != (st.st_mtime, st.st_size):
+            return None
+        return entry[1]
+
+    def request(self, filePaths: Sequence[str]) -> None:
+        """Read the structure of the given files in the background (unless
+        already being read)."""
+        if self._stop.is_set():
+            return
+        for f in filePaths:
+            with self._lock:
+                if f in self._inFlight:
+                    continue
+                self._inFlight.add(f)
+            future = self._executor.submit(self._load, f)
+            with self._lock:
+                self._futures.add(future)
+            future.add_done_callback(self._discardFuture)
+
+    def _discardFuture(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def _load(self, filePath: str) -> None:
+        delay = self.retryDelay
+        error = ''
+        try:
+            for _ in range(self.nRetries + 1):
+                if self._stop.is_set():
+                    return
+                try:
+                    st = os.stat(filePath)
+                    groups = all_datadicts_from_hdf5(filePath, structure_only=True)
+                    if len(groups) > 0:
+                        self._store(filePath, groups, (st.st_mtime, st.st_size))
+                        return
+                    error = 'File contains no data.'
+                except OSError as e:
+                    error = str(e)
+                self._stop.wait(delay)
+                delay *= 2
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            with self._lock:
+                self._inFlight.discard(filePath)
+
+        if not self._stop.is_set():
+            self.structureFailed.emit(filePath, error)
+
+    def _store(self, filePath: str, groups: Dict[str, DataDict],
+               stat: Tuple[float, int]) -> None:
+        with self._lock:
+            self._cache[filePath] = (stat, groups)
+            self._cache.move_to_end(filePath)
+            while len(self._cache) > self.cacheSize:
+                self._cache.popitem(last=False)
+        if not self._stop.is_set():
+            self.structureLoaded.emit(filePath, groups, stat)
+
+
+class FolderScanner(QtCore.QObject):
+    """Scans folder trees for data files (see :func:`.scanFolders`) in a
+    background thread. Results are delivered via a signal, i.e., in the
+    thread the scanner lives in.
+    """
+
+    #: Signal(str, object, object) -- emitted when a scan is done.
+    #: Arguments:
+    #:   - the scanned path
+    #:   - the files found
+    #:   - the active folders
+    scanned = Signal(str, object, object)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._stop = threading.Event()
+        self._scanning: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def shutdown(self) -> None:
+        """Stop scanning; waits for a running scan to finish."""
+        self._stop.set()
+        self._executor.shutdown(wait=True)
+
+    def isScanning(self, path: str) -> bool:
+        with self._lock:
+            return path in self._scanning
+
+    def scan(self, path: str, extensions: Sequence[str], maxAge: float) -> None:
+        """Scan ``path`` in the background, unless it's being scanned
+        already."""
+        if self._stop.is_set():
+            return
+        with self._lock:
+            if path in self._scanning:
+                return
+            self._scanning.add(path)
+        self._executor.submit(self._scan, path, extensions, maxAge)
+
+    def _scan(self, path: str, extensions: Sequence[str], maxAge: float) -> None:
+        try:
+            if self._stop.is_set():
+                return
+            files, activeFolders = scanFolders(path, extensions, maxAge)
+        except Exception as e:
+            logger().warning(f"Could not scan '{path}': {type(e).__name__}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._scanning.discard(path)
+        if not self._stop.is_set():
+            self.scanned.emit(path, files, activeFolders)
 
 
 class Monitr(QtWidgets.QMainWindow):
@@ -24,7 +225,23 @@ class Monitr(QtWidgets.QMainWindow):
 
     def __init__(self, monitorPath: str = '.',
                  refreshInterval: int = 1,
+                 rescanInterval: int = 300,
+                 useIndex: bool = True,
                  parent: Optional[QtWidgets.QMainWindow] = None):
+        """Constructor for :class:`Monitr`.
+
+        :param monitorPath: folder to monitor.
+        :param refreshInterval: interval (in seconds) at which new files
+            are checked for plottable data.
+        :param rescanInterval: interval (in seconds) at which the full
+            folder tree is scanned again. Between scans, only the active
+            folders are watched for changes (see :class:`.DataFileList`).
+        :param useIndex: if ``True``, keep an index of the files and their
+            structure (see :class:`.DDH5Index`), and start from it: the file
+            list is then shown right away, while the full scan (which always
+            runs in the background) is going on.
+        :param parent: parent widget.
+        """
 
         super().__init__(parent=parent)
         self.ui = Ui_MainWindow()
@@ -36,23 +253,120 @@ class Monitr(QtWidgets.QMainWindow):
 
         self.monitorPath = os.path.abspath(monitorPath)
         self.refreshInterval = refreshInterval
-        self.refreshFiles = partial(self.ui.fileList.loadFromPath, self.monitorPath,
-                                    emitNew=True)
-        self.ui.fileList.loadFromPath(self.monitorPath, emitNew=False)
+        self.rescanInterval = rescanInterval
+
+        self.index: Optional[DDH5Index] = None
+        if useIndex:
+            try:
+                self.index = DDH5Index(self.monitorPath)
+            except (OSError, sqlite3.Error) as e:
+                logger().warning(f'Could not open file index: {e}')
+
+        self.prefetcher = StructurePrefetcher(parent=self)
+        self.prefetcher.structureLoaded.connect(self.onStructureLoaded)
+        self.prefetcher.structureFailed.connect(self.onStructureFailed)
+
+        # full scans run in the background. until the first one is done,
+        # we show what's in the index.
+        self.scanner = FolderScanner(parent=self)
+        self.scanner.scanned.connect(self.onFolderScanned)
+        self._scanned = False
+
+        indexedFiles: List[str] = []
+        if self.index is not None:
+            self.ui.fileList.filesChanged.connect(self.onFilesChanged)
+            try:
+                indexedFiles = self.index.files()
+            except sqlite3.Error as e:
+                logger().warning(f'Could not read file index: {e}')
+        self.ui.fileList.loadFromList(self.monitorPath, indexedFiles)
+        self.refreshFiles()
 
         self.monitor = QtCore.QTimer()
-        self.monitor.timeout.connect(self.refreshFiles)
         self.monitor.timeout.connect(self.plotQueuedFiles)
         self.monitor.start(self.refreshInterval * 1000)
 
+        self.rescanTimer = QtCore.QTimer()
+        self.rescanTimer.timeout.connect(self.refreshFiles)
+        self.rescanTimer.start(self.rescanInterval * 1000)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        self.scanner.shutdown()
+        self.prefetcher.shutdown()
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        super().closeEvent(event)
+
+    @Slot()
+    def refreshFiles(self) -> None:
+        """Scan the full folder tree again, in the background."""
+        fileList = self.ui.fileList
+        self.scanner.scan(self.monitorPath, fileList.fileExtensions,
+                          fileList.activeFolderAge)
+
+    @Slot(str, object, object)
+    def onFolderScanned(self, path: str, files: List[str],
+                        activeFolders: List[str]) -> None:
+        if path != self.monitorPath:
+            return
+        # the first scan just fills the list; files found after are new.
+        self.ui.fileList.applyScan(path, files, activeFolders,
+                                   emitNew=self._scanned)
+        self._scanned = True
+
+    def cachedStructure(self, filePath: str) -> Optional[Dict[str, DataDict]]:
+        """The datadicts (without values) in a file, if we know them (from
+        the index or the prefetcher) and the file has not changed since."""
+        groups = self.prefetcher.cached(filePath)
+        if groups is None and self.index is not None:
+            try:
+                groups = self.index.structure(filePath, read=False)
+            except sqlite3.Error as e:
+                logger().warning(f'Could not read file index: {e}')
+        return groups
+
+    @Slot(list, list)
+    def onFilesChanged(self, newFiles: List[str], removedFiles: List[str]) -> None:
+        if self.index is not None:
+            try:
+                self.index.add(newFiles)
+                self.index.remove(removedFiles)
+            except sqlite3.Error as e:
+                logger().warning(f'Could not update file index: {e}')
+
+    @Slot(str, object, object)
+    def onStructureLoaded(self, filePath: str, groups: Dict[str, DataDict],
+                          stat: Tuple[float, int]) -> None:
+        if self.index is not None:
+            try:
+                self.index.set_structure(filePath, groups, *stat)
+            except sqlite3.Error as e:
+                logger().warning(f'Could not update file index: {e}')
+        if filePath == self.selectedFile:
+            self.dataFileSelected.emit(groups)
+        if filePath in self.newFiles and self.ui.autoPlotNewAction.isChecked():
+            self.newFiles.remove(filePath)
+            for grp in groups.keys():
+                self.plot(filePath, grp)
+
+    @Slot(str, str)
+    def onStructureFailed(self, filePath: str, error: str) -> None:
+        if filePath == self.selectedFile:
+            self.dataFileSelected.emit({})
+
     @Slot(str)
     def processFileSelection(self, filePath: str) -> None:
         self.selectedFile = filePath
-        groups = all_datadicts_from_hdf5(filePath, structure_only=True)
-        self.dataFileSelected.emit(groups)
+        groups = self.cachedStructure(filePath)
+        if groups is not None:
+            self.dataFileSelected.emit(groups)
+        else:
+            self.prefetcher.request([filePath])
 
     @Slot(list)
     def onNewDataFilesFound(self, files: List[str]) -> None:
+        self.prefetcher.request(files)
         if not self.ui.autoPlotNewAction.isChecked():
             return
 
@@ -60,20 +374,22 @@ class Monitr(QtWidgets.QMainWindow):
 
     @Slot()
     def plotQueuedFiles(self) -> None:
+        """Plot new files whose structure is known. For the others, make sure
+        they are being read."""
         if not self.ui.autoPlotNewAction.isChecked():
             return
 
         removeFiles = []
         for f in self.newFiles:
-            try:
-                contents = all_datadicts_from_hdf5(f, structure_only=True)
-            except OSError:
-                contents = {}
-
-            if len(contents) > 0:
+            contents = self.cachedStructure(f)
+            if contents is not None and len(contents) > 0:
                 for grp in contents.keys():
                     self.plot(f, grp)
                 removeFiles.append(f)
+            elif os.path.exists(f):
+                self.prefetcher.request([f])
+            else:
+                removeFiles.append(f)
 
         for f in removeFiles:
             self.newFiles.remove(f)
@@ -108,6 +424,12 @@ def script() -> int:
     parser.add_argument("-r", "--refresh_interval", default=2,
                         help="interval at which to look for changes in the "
                              "monitored path (in seconds)")
+    parser.add_argument("--rescan_interval", default=300,
+                        help="interval at which to scan the full monitored "
+                             "path again (in seconds)")
+    parser.add_argument("--no_index", action='store_true',
+                        help="do not keep an index of the files in the "
+                             "monitored path")
     args = parser.parse_args()
 
     path = os.path.abspath(args.path)
@@ -116,6 +438,7 @@ def script() -> int:
         sys.exit()
 
     app = QtWidgets.QApplication([])
-    win = Monitr(path, args.refresh_interval)
+    win = Monitr(path, int(args.refresh_interval), int(args.rescan_interval),
+                 useIndex=not args.no_index)
     win.show()
     return app.exec_()
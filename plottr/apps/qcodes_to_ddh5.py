@@ -0,0 +1,225 @@
+"""
+plottr/apps/qcodes_to_ddh5.py : bulk conversion of qcodes runs to DDH5.
+
+Completed runs from a qcodes database are converted in a pool of worker
+processes, and written to DDH5 files, including the qcodes
+meta data (GUID, timestamps, shape). Each run goes into its own file, in the
+same kind of date-based folder structure that :class:`DDH5Writer` uses, so the
+results can be browsed with the monitr.
+
+Runs whose target file already contains the run with the same GUID are
+skipped; converting the same database into the same folder again only
+converts what is new.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+from concurrent.futures import as_completed
+from typing import Dict, List, Optional, Sequence
+
+from typing_extensions import TypedDict
+
+import h5py
+
+from ..data.datadict import DataDict, DataDictBase, combine_datadicts
+from ..data.datadict_storage import deh5ify, init_file, write_data_to_file, \
+    AppendMode, DATAFILEXT
+from ..utils.misc import spawn_process_pool
+
+__author__ = 'Wolfgang Pfaff'
+__license__ = 'MIT'
+
+
+class ConversionResult(TypedDict):
+    #: 'converted', 'skipped' (converted before), 'incomplete' (run not
+    #: completed yet), or 'error'
+    status: str
+    #: path of the DDH5 file
+    path: str
+    #: error message, if any
+    error: str
+
+
+def targetPath(outputDir: str, dbPath: str, runId: int,
+               startedDate: str, name: str) -> str:
+    """The path (without extension) of the DDH5 file for a run:
+    ``<outputDir>/<date>/<date>_<db name>_<run ID>_<run name>/<same>``,
+    where date is the start date of the run."""
+    dbName = os.path.splitext(os.path.split(dbPath)[1])[0]
+    base = f"{startedDate}_{dbName}_{runId:04}_{name}"
+    base = re.sub(r'[^\w\-.]', '_', base)
+    return os.path.join(outputDir, startedDate, base, base)
+
+
+def convertedGuid(filePath: str) -> Optional[str]:
+    """The GUID of the qcodes run stored in a DDH5 file, or ``None``
+    if there is no (readable) file with a qcodes GUID."""
+    if not os.path.exists(filePath):
+        return None
+    try:
+        with h5py.File(filePath, 'r', libver='latest', swmr=True) as f:
+            for grp in f.values():
+                if '__qcodes_guid__' in grp.attrs:
+                    return deh5ify(grp.attrs['__qcodes_guid__'])
+    except OSError:
+        pass
+    return None
+
+
+def _h5Meta(data: DataDictBase) -> None:
+    # shapes are dictionaries, which we cannot store directly as attributes.
+    shape = data.meta_val('qcodes_shape')
+    if shape is None:
+        data.delete_meta('qcodes_shape')
+    else:
+        data.add_meta('qcodes_shape', json.dumps(shape))
+
+
+def convertRun(dbPath: str, runId: int, basePath: str) -> ConversionResult:
+    """Convert a single run. This is what runs in the worker processes.
+
+    If the dependents in the run have the same number of records, all data is
+    written into one group, ``data``. Otherwise, each dependent (with its
+    axes) is written into a group named after the dependent.
+    The file is first written under a temporary name (with extension
+    ``.ddh5.tmp``, so that it is not picked up as data file while incomplete),
+    and only moved to its final location once complete.
+
+    :param dbPath: path of the qcodes database.
+    :param runId: ID of the run to convert.
+    :param basePath: path of the DDH5 file, without extension.
+    :returns: the result of the conversion; errors are reported in the result,
+        not raised.
+    """
+    # qcodes is slow to import; only needed in the workers.
+    from ..data.qcodes_dataset import (load_dataset_from, ds_to_datadicts,
+                                       add_ds_meta)
+
+    filePath = basePath + DATAFILEXT
+    tmpPath = filePath + '.tmp'
+    try:
+        ds = load_dataset_from(dbPath, runId)
+        ddicts = ds_to_datadicts(ds)
+        data = combine_datadicts(*ddicts.values())
+        if isinstance(data, DataDict):
+            groups = {'data': data}
+        else:
+            groups = dict(ddicts)
+
+        os.makedirs(os.path.split(basePath)[0], exist_ok=True)
+        with h5py.File(tmpPath, mode='w', libver='latest') as f:
+            for groupName, grpData in groups.items():
+                add_ds_meta(grpData, ds, os.path.abspath(dbPath))
+                _h5Meta(grpData)
+                init_file(f, groupName)
+                write_data_to_file(grpData, f, groupName, AppendMode.none)
+        os.replace(tmpPath, filePath)
+
+    except Exception as e:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        return ConversionResult(status='error', path=filePath,
+                                error=f"{type(e).__name__}: {e}")
+
+    return ConversionResult(status='converted', path=filePath, error='')
+
+
+def convertRuns(dbPath: str, outputDir: str,
+                runIds: Optional[Sequence[int]] = None,
+                nWorkers: Optional[int] = None,
+                overwrite: bool = False) -> Dict[int, ConversionResult]:
+    """Convert many runs from a qcodes database in a pool of worker processes.
+
+    :param dbPath: path of the qcodes database.
+    :param outputDir: folder to write the DDH5 files to.
+    :param runIds: IDs of the runs to convert. Default: all runs.
+    :param nWorkers: number of worker processes. Default: number of CPUs.
+    :param overwrite: if ``True``, also convert runs that have been converted
+        before.
+    :returns: the result for each requested run, by run ID.
+    """
+    from ..data.qcodes_dataset import get_runs_from_db
+
+    overview = get_runs_from_db(dbPath)
+    if runIds is None:
+        runIds = list(overview.keys())
+
+    results: Dict[int, ConversionResult] = {}
+    todo: Dict[int, str] = {}
+    for runId in runIds:
+        info = overview.get(runId)
+        if info is None:
+            results[runId] = ConversionResult(
+                status='error', path='', error=f"No run with ID {runId}.")
+            continue
+
+        basePath = targetPath(outputDir, dbPath, runId,
+                              info['started_date'], info['name'])
+        filePath = basePath + DATAFILEXT
+        if info['completed_date'] == '':
+            results[runId] = ConversionResult(status='incomplete',
+                                              path=filePath, error='')
+        elif not overwrite and convertedGuid(filePath) == info['guid']:
+            results[runId] = ConversionResult(status='skipped',
+                                              path=filePath, error='')
+        else:
+            todo[runId] = basePath
+
+    if len(todo) == 0:
+        return results
+
+    # where possible, the workers don't inherit any (qcodes db) state from
+    # the parent process.
+    with spawn_process_pool(nWorkers) as executor:
+        futures = {executor.submit(convertRun, dbPath, runId, basePath): runId
+                   for runId, basePath in todo.items()}
+        for future in as_completed(futures):
+            runId = futures[future]
+            try:
+                results[runId] = future.result()
+            except Exception as e:
+                results[runId] = ConversionResult(
+                    status='error', path=todo[runId] + DATAFILEXT,
+                    error=f"{type(e).__name__}: {e}")
+
+    return results
+
+
+def script() -> int:
+    parser = argparse.ArgumentParser(
+        description='plottr qcodes-to-ddh5 -- convert completed qcodes runs '
+                    'to DDH5 files.'
+    )
+    parser.add_argument('dbpath', help='path to qcodes .db file')
+    parser.add_argument('--runs', default='',
+                        help='run IDs to convert, e.g., 1-10,12 '
+                             '(default: all)')
+    parser.add_argument('-o', '--output', default='.',
+                        help='folder to write the DDH5 files to')
+    parser.add_argument('-n', '--workers', type=int, default=None,
+                        help='number of worker processes (default: #CPUs)')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='also convert runs that have been converted '
+                             'before')
+    args = parser.parse_args()
+
+    from .render import parseRunIds
+    runIds: Optional[List[int]] = None
+    if args.runs != '':
+        runIds = parseRunIds(args.runs)
+
+    results = convertRuns(args.dbpath, args.output, runIds=runIds,
+                          nWorkers=args.workers, overwrite=args.overwrite)
+
+    counts: Dict[str, int] = {}
+    for runId, result in sorted(results.items()):
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        if result['status'] == 'error':
+            print(f"Error converting run {runId}: {result['error']}",
+                  file=sys.stderr)
+    print(', '.join(f"{n} {status}" for status, n in sorted(counts.items()))
+          + f" -- output in {os.path.abspath(args.output)}.")
+    return 0 if counts.get('error', 0) == 0 else 2
@@ -0,0 +1,450 @@
+"""
+plottr/apps/render.py : headless rendering of autoplot figures to files.
+
+Runs the same node chain as the autoplot apps (loader, data selection,
+gridding, xy-axes selection), but without any windows, and renders the
+result with the matplotlib Agg backend into image files (png, pdf, ...).
+
+Sources (DDH5 files, or runs in a qcodes database) are distributed over a
+pool of worker processes. What has been rendered is recorded in a manifest
+file in the output folder; when rendering into the same folder again, sources
+that have not changed since are skipped.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import as_completed
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Type, Union
+
+from typing_extensions import TypedDict
+
+import numpy as np
+import h5py
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from .. import QtWidgets, Flowchart
+from ..data.datadict import DataDictBase, declared_shape
+from ..data.datadict_storage import DDH5Loader, DATAFILEXT
+from ..node.data_selector import DataSelector
+from ..node.dim_reducer import XYSelector
+from ..node.grid import DataGridder, GridOption
+from ..node.node import Node
+from ..node.tools import linearFlowchart
+from ..plot.mpl import (PlotDataType, PlotType, determinePlotDataType,
+                        colorplot2d, plot1dTrace, setMplDefaults)
+from ..utils.misc import spawn_process_pool
+from .ui.monitr import findFilesByExtension
+
+__author__ = 'Wolfgang Pfaff'
+__license__ = 'MIT'
+
+
+#: name of the manifest file in the output folder
+MANIFESTFILE = 'plottr_render_manifest.json'
+
+
+class RenderJob(TypedDict):
+    #: either 'ddh5' or 'qcodes'
+    kind: str
+    #: path of the data file or database
+    path: str
+    #: qcodes run ID; ignored for ddh5 (all groups in the file are rendered)
+    runId: int
+
+
+class RenderResult(TypedDict):
+    #: 'ok', 'empty' (nothing plottable), or 'error'
+    status: str
+    #: paths of the image files written
+    outputs: List[str]
+    #: token for detecting changes of the source, see :func:`sourceStamp`
+    stamp: str
+    #: error message, if any
+    error: str
+
+
+def jobKey(job: RenderJob) -> str:
+    """Unique key of a job in the manifest."""
+    if job['kind'] == 'qcodes':
+        return f"{os.path.abspath(job['path'])}::{job['runId']}"
+    return os.path.abspath(job['path'])
+
+
+def sourceStamp(job: RenderJob) -> str:
+    """A cheap token that changes when the source of a job changes.
+
+    This is size and modification time of the source file (for qcodes runs,
+    the database). Once a qcodes run is completed, :func:`renderJob` records a
+    stamp based on the completion time instead, since completed runs do not
+    change anymore.
+    """
+    st = os.stat(job['path'])
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def ddh5Jobs(paths: Sequence[str]) -> List[RenderJob]:
+    """Make jobs for all DDH5 files in `paths`. Folders are searched
+    recursively."""
+    jobs: List[RenderJob] = []
+    for p in paths:
+        if os.path.isdir(p):
+            files = findFilesByExtension(p, [DATAFILEXT])
+        else:
+            files = [os.path.abspath(p)]
+        for f in files:
+            jobs.append(RenderJob(kind='ddh5', path=f, runId=-1))
+    return jobs
+
+
+def qcodesJobs(dbPath: str, runIds: Sequence[int]) -> List[RenderJob]:
+    """Make jobs for the runs with IDs `runIds` in the database `dbPath`."""
+    path = os.path.abspath(dbPath)
+    return [RenderJob(kind='qcodes', path=path, runId=int(i)) for i in runIds]
+
+
+def parseRunIds(spec: str) -> List[int]:
+    """Parse a run ID specification like ``1-10,12,15-17``."""
+    ids: List[int] = []
+    for part in spec.split(','):
+        part = part.strip()
+        if part == '':
+            continue
+        if '-' in part:
+            start, stop = part.split('-', 1)
+            ids += list(range(int(start), int(stop) + 1))
+        else:
+            ids.append(int(part))
+    return ids
+
+
+# Processing in the worker processes #
+
+_workerApp: Optional[QtWidgets.QApplication] = None
+
+
+def _initWorker() -> None:
+    """Set up a render worker process; called before each job, only does
+    something the first time.
+
+    The flowchart machinery requires a Qt application object, but no
+    display; we use the `offscreen` platform. Node widgets are not needed.
+    """
+    global _workerApp
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    if QtWidgets.QApplication.instance() is None:
+        _workerApp = QtWidgets.QApplication([])
+
+    for cls in [DDH5Loader, DataSelector, DataGridder, XYSelector]:
+        cls.useUi = False
+    setMplDefaults()
+
+
+def renderFlowchart(loaderType: Type[Node]) -> Flowchart:
+    """The node chain used for rendering, equivalent to the autoplot apps."""
+    return linearFlowchart(
+        ('Data loader', loaderType),
+        ('Data selection', DataSelector),
+        ('Grid', DataGridder),
+        ('Dimension assignment', XYSelector),
+    )
+
+
+def setDefaults(fc: Flowchart, data: DataDictBase) -> None:
+    """Set the same defaults that the autoplot windows use:
+    first dependent, last two axes as x and y, guessed grid (or the shape
+    from the metadata, if present)."""
+    selected = data.dependents()
+    if len(selected) > 0:
+        selected = selected[:1]
+
+    axes = data.axes(selected)
+    drs = dict()
+    if len(axes) >= 2:
+        drs = {axes[-1]: 'x-axis', axes[-2]: 'y-axis'}
+    if len(axes) == 1:
+        drs = {axes[0]: 'x-axis'}
+
+    fc.nodes()['Data selection'].selectedData = selected
+    if (data.has_meta('qcodes_shape') and data.meta_val('qcodes_shape') is not None) \
+            or declared_shape(data) is not None:
+        fc.nodes()['Grid'].grid = GridOption.metadataShape, {}
+    else:
+        fc.nodes()['Grid'].grid = GridOption.guessShape, {}
+    fc.nodes()['Dimension assignment'].dimensionRoles = drs
+
+
+def renderData(fig: Figure, data: Optional[DataDictBase]) -> bool:
+    """Plot data into a figure.
+
+    1D data is plotted as traces into a single panel, 2D data as image
+    (or scatter, if the data is not on a grid), one panel per dependent.
+    For complex 2D data, real and imaginary part get separate panels.
+
+    :param fig: matplotlib figure to plot into.
+    :param data: data (output of the rendering flowchart).
+    :returns: ``True`` if something was plotted.
+    """
+    plotDataType = determinePlotDataType(data)
+    if plotDataType is PlotDataType.unknown:
+        return False
+    assert data is not None
+
+    depnames = data.dependents()
+    xname = data.axes()[0]
+    xvals = np.asanyarray(data.data_vals(xname))
+
+    if plotDataType in [PlotDataType.scatter1d, PlotDataType.line1d]:
+        ax = fig.add_subplot(1, 1, 1)
+        for yname in depnames:
+            yvals = data.data_vals(yname)
+            if isinstance(yvals, np.ma.MaskedArray):
+                yvals = yvals.filled(np.nan)
+            plot1dTrace(ax, xvals, np.asanyarray(yvals),
+                        axLabels=(data.label(xname), None),
+                        curveLabel=data.label(yname),
+                        addLegend=(yname == depnames[-1]))
+    else:
+        if plotDataType is PlotDataType.grid2d:
+            style = PlotType.image
+        else:
+            style = PlotType.scatter2d
+
+        yname = data.axes()[1]
+        yvals = np.asanyarray(data.data_vals(yname))
+        panels: List[Tuple[np.ndarray, str]] = []
+        for zname in depnames:
+            zvals = data.data_vals(zname)
+            if isinstance(zvals, np.ma.MaskedArray):
+                zvals = zvals.filled(np.nan)
+            zvals = np.asanyarray(zvals)
+            if np.issubsctype(zvals, np.complexfloating):
+                panels.append((zvals.real, f"Re( {data.label(zname)} )"))
+                panels.append((zvals.imag, f"Im( {data.label(zname)} )"))
+            else:
+                panels.append((zvals, str(data.label(zname))))
+
+        nrows = int(len(panels) ** .5 + .5)
+        ncols = int(np.ceil(len(panels) / nrows))
+        for i, (zvals, zlabel) in enumerate(panels):
+            ax = fig.add_subplot(nrows, ncols, i + 1)
+            colorplot2d(ax, xvals, yvals, zvals, style,
+                        axLabels=(data.label(xname), data.label(yname), zlabel))
+
+    if data.has_meta('title'):
+        fig.text(0.5, 0.99, data.meta_val('title'),
+                 horizontalalignment='center',
+                 verticalalignment='top',
+                 fontsize='small')
+    return True
+
+
+def _renderFlowchartOutput(fc: Flowchart, outputPath: str, dpi: int) -> bool:
+    data = fc.outputValues()['dataOut']
+    fig = Figure(figsize=(6, 4.5))
+    FigureCanvasAgg(fig)
+    if not renderData(fig, data):
+        return False
+    fig.subplots_adjust(left=0.125, bottom=0.125, top=0.9, right=0.875,
+                        wspace=0.35, hspace=0.2)
+    fig.savefig(outputPath, dpi=dpi, facecolor='w')
+    return True
+
+
+def renderJob(job: RenderJob, outputDir: str, fmt: str = 'png',
+              dpi: int = 150) -> RenderResult:
+    """Render a single job. This is what runs in the worker processes.
+
+    :param job: the job to render.
+    :param outputDir: folder to write images to.
+    :param fmt: image format (file extension understood by matplotlib).
+    :param dpi: resolution of the images.
+    :returns: the result of the rendering; errors are reported in the result,
+        not raised.
+    """
+    _initWorker()
+    outputs: List[str] = []
+    stamp = ''
+    try:
+        stamp = sourceStamp(job)
+        if job['kind'] == 'ddh5':
+            base = os.path.splitext(os.path.split(job['path'])[1])[0]
+            with h5py.File(job['path'], 'r', libver='latest', swmr=True) as f:
+                groups = list(f.keys())
+
+            for grp in groups:
+                fc = renderFlowchart(DDH5Loader)
+                loader = fc.nodes()['Data loader']
+                loader.groupname = grp
+                loader.filepath = job['path']
+                data = loader.outputValues()['dataOut']
+                if data is None:
+                    continue
+                setDefaults(fc, data)
+                outputPath = os.path.join(outputDir, f"{base}_{grp}.{fmt}")
+                if _renderFlowchartOutput(fc, outputPath, dpi):
+                    outputs.append(outputPath)
+
+        elif job['kind'] == 'qcodes':
+            from ..data.qcodes_dataset import QCodesDSLoader
+            base = os.path.splitext(os.path.split(job['path'])[1])[0]
+            fc = renderFlowchart(QCodesDSLoader)
+            loader = fc.nodes()['Data loader']
+            loader.pathAndId = job['path'], job['runId']
+            data = loader.outputValues()['dataOut']
+            if data is not None:
+                setDefaults(fc, data)
+                outputPath = os.path.join(outputDir,
+                                          f"{base}_run{job['runId']}.{fmt}")
+                if _renderFlowchartOutput(fc, outputPath, dpi):
+                    outputs.append(outputPath)
+
+            # completed runs do not change anymore, no need to track the db.
+            if data is not None and data.meta_val('qcodes_completedTS') is not None:
+                stamp = f"completed:{data.meta_val('qcodes_completedTS')}"
+
+        else:
+            raise ValueError(f"Unknown job type: {job['kind']}")
+
+    except Exception as e:
+        return RenderResult(status='error', outputs=outputs, stamp=stamp,
+                            error=f"{type(e).__name__}: {e}")
+
+    status = 'ok' if len(outputs) > 0 else 'empty'
+    return RenderResult(status=status, outputs=outputs, stamp=stamp, error='')
+
+
+# Batch processing #
+
+def loadManifest(outputDir: str) -> Dict[str, Dict[str, Any]]:
+    path = os.path.join(outputDir, MANIFESTFILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def saveManifest(outputDir: str, manifest: Dict[str, Dict[str, Any]]) -> None:
+    """Write the manifest. We write to a temporary file first, such that an
+    interrupted run never leaves a corrupt manifest behind."""
+    path = os.path.join(outputDir, MANIFESTFILE)
+    tmppath = path + '.tmp'
+    with open(tmppath, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmppath, path)
+
+
+def isUpToDate(job: RenderJob, entry: Optional[Dict[str, Any]]) -> bool:
+    """Check if a job does not need to be rendered again, given its
+    entry in the manifest."""
+    if entry is None or entry.get('status') == 'error':
+        return False
+    stamp = entry.get('stamp', '')
+    if stamp.startswith('completed:'):
+        return True
+    try:
+        return stamp == sourceStamp(job)
+    except OSError:
+        return False
+
+
+def renderBatch(jobs: Sequence[RenderJob], outputDir: str,
+                nWorkers: Optional[int] = None,
+                fmt: str = 'png', dpi: int = 150,
+                resume: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Render many jobs in a pool of worker processes.
+
+    :param jobs: the jobs to render.
+    :param outputDir: folder to write images and the manifest to.
+    :param nWorkers: number of worker processes. Default: number of CPUs.
+    :param fmt: image format.
+    :param dpi: image resolution.
+    :param resume: if ``True``, skip jobs that the manifest lists as rendered
+        and whose source has not changed since.
+    :returns: the updated manifest.
+    """
+    os.makedirs(outputDir, exist_ok=True)
+    manifest = loadManifest(outputDir) if resume else {}
+
+    todo = [j for j in jobs if not (resume and isUpToDate(j, manifest.get(jobKey(j))))]
+    if len(todo) == 0:
+        return manifest
+
+    with spawn_process_pool(nWorkers) as executor:
+        futures = {executor.submit(renderJob, j, outputDir, fmt, dpi): j
+                   for j in todo}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = RenderResult(status='error', outputs=[], stamp='',
+                                      error=f"{type(e).__name__}: {e}")
+
+            entry: Dict[str, Any] = dict(result)
+            entry['job'] = dict(job)
+            entry['time'] = time.strftime("%Y-%m-%d %H:%M:%S")
+            manifest[jobKey(job)] = entry
+            saveManifest(outputDir, manifest)
+
+    return manifest
+
+
+def script() -> int:
+    parser = argparse.ArgumentParser(
+        description='plottr render -- export autoplot figures without GUI.'
+    )
+    parser.add_argument('paths', nargs='*', default=[],
+                        help='.ddh5 files, or folders to search for them')
+    parser.add_argument('--dbpath', default=None,
+                        help='path to qcodes .db file')
+    parser.add_argument('--runs', default='',
+                        help='run IDs to render from the qcodes database, '
+                             'e.g., 1-10,12')
+    parser.add_argument('-o', '--output', default='.',
+                        help='folder to write figures to')
+    parser.add_argument('-n', '--workers', type=int, default=None,
+                        help='number of worker processes (default: #CPUs)')
+    parser.add_argument('--format', default='png',
+                        help='image format (default: png)')
+    parser.add_argument('--dpi', type=int, default=150,
+                        help='image resolution (default: 150)')
+    parser.add_argument('--no-resume', action='store_true',
+                        help='render everything, ignoring the manifest')
+    args = parser.parse_args()
+
+    jobs = ddh5Jobs(args.paths)
+    if args.dbpath is not None:
+        jobs += qcodesJobs(args.dbpath, parseRunIds(args.runs))
+    if len(jobs) == 0:
+        print('Nothing to render.')
+        return 1
+
+    resume = not args.no_resume
+    previous = loadManifest(args.output) if resume else {}
+    upToDate = {jobKey(j) for j in jobs
+                if resume and isUpToDate(j, previous.get(jobKey(j)))}
+    manifest = renderBatch(jobs, args.output, nWorkers=args.workers,
+                           fmt=args.format, dpi=args.dpi, resume=resume)
+
+    nrendered, nskipped, nempty, nerrors = 0, 0, 0, 0
+    for job in jobs:
+        entry = manifest.get(jobKey(job), {})
+        if jobKey(job) in upToDate:
+            nskipped += 1
+        elif entry.get('status') == 'error':
+            nerrors += 1
+            print(f"Error rendering {jobKey(job)}: {entry.get('error')}",
+                  file=sys.stderr)
+        elif entry.get('status') == 'empty':
+            nempty += 1
+        else:
+            nrendered += 1
+    print(f"Rendered {nrendered} of {len(jobs)} sources "
+          f"into {os.path.abspath(args.output)} "
+          f"({nskipped} up to date, {nempty} without data to plot, "
+          f"{nerrors} errors).")
+    return 0 if nerrors == 0 else 2
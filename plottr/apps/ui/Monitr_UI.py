@@ -73,6 +73,7 @@ class Ui_MainWindow(object):
         self.fileContents.headerItem().setText(0, _translate("MainWindow", "Object"))
         self.fileContents.headerItem().setText(1, _translate("MainWindow", "Content"))
         self.fileContents.headerItem().setText(2, _translate("MainWindow", "Type"))
+        self.fileContents.headerItem().setText(3, _translate("MainWindow", "Summary"))
         self.monitorToolBar.setWindowTitle(_translate("MainWindow", "toolBar"))
         self.autoPlotNewAction.setText(_translate("MainWindow", "Auto-plot new"))
         self.autoPlotNewAction.setShortcut(_translate("MainWindow", "Ctrl+A"))
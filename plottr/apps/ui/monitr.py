@@ -1,6 +1,7 @@
 import os
+import time
 from enum import Enum
-from typing import List, Any, Optional, Dict, Sequence, Union
+from typing import List, Any, Optional, Dict, Sequence, Union, Set, Tuple
 from pprint import pprint
 
 from plottr import QtCore, QtGui, QtWidgets, Slot, Signal
@@ -22,6 +23,19 @@ def findFilesByExtension(path: str, extensions: Sequence[str]) -> List[str]:
     return ret
 
 
+def summaryText(summary: Optional[Dict[str, Any]]) -> str:
+    """Short description of the summary of a data field stored in a DDH5
+    file (see :func:`plottr.data.datadict_storage.dataset_summary`)."""
+    if summary is None:
+        return ''
+    ret = f"{summary['nrecords']} records"
+    if summary['min'] is not None:
+        ret += f", {summary['min']:.6g} to {summary['max']:.6g}"
+    if summary['nan_count'] > 0:
+        ret += f", {summary['nan_count']} NaN"
+    return ret
+
+
 class DataFileContent(QtWidgets.QTreeWidget):
 
     #: Signal(str) -- Emitted when the user requests a plot for datadict
@@ -65,9 +79,12 @@ class DataFileContent(QtWidgets.QTreeWidget):
                     vals.append(f'Data (depends on {str(tuple(grpData.axes(dn)))[1:]}')
                 else:
                     vals.append('Data (independent)')
+                vals.append(summaryText(dv.get('__summary__')))
                 ditem = QtWidgets.QTreeWidgetItem(dataParent, vals)
 
                 for mn, mv in grpData.meta_items(dn):
+                    if mn in ['summary', 'limits']:
+                        continue
                     vals = [mn, str(mv)]
                     _ = QtWidgets.QTreeWidgetItem(ditem, vals)
 
@@ -96,13 +113,69 @@ class DataFileContent(QtWidgets.QTreeWidget):
         self.plotRequested.emit(self.selectedGroup)
 
 
+def findActiveFolders(path: str, maxAge: float) -> List[str]:
+    """Find the folders below ``path`` (including ``path`` itself) in which
+    files have recently been added or removed.
+
+    Only folders that have been modified within ``maxAge`` are descended into,
+    so with the usual date-based data folder structure this only looks at
+    the most recent days.
+
+    :param path: root folder.
+    :param maxAge: maximum time since the last modification (in seconds).
+    :returns: absolute paths of the active folders.
+    """
+    path = os.path.abspath(path)
+    ret = [path]
+    since = time.time() - maxAge
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return ret
+    for e in entries:
+        try:
+            if e.is_dir() and e.stat().st_mtime >= since:
+                ret += findActiveFolders(e.path, maxAge)
+        except OSError:
+            pass
+    return ret
+
+
+def scanFolders(path: str, extensions: Sequence[str],
+                maxAge: float) -> Tuple[List[str], List[str]]:
+    """Scan the full folder tree below ``path``. This does not touch any
+    widgets, so it can run in a background thread.
+
+    :param path: root folder.
+    :param extensions: extensions of the files to look for.
+    :param maxAge: see :func:`findActiveFolders`.
+    :returns: the files found, and the active folders.
+    """
+    return (findFilesByExtension(path, extensions),
+            findActiveFolders(path, maxAge))
+
+
 class DataFileList(QtWidgets.QTreeWidget):
     """A Tree Widget that displays all data files that are in a certain
     base directory. All subfolders are monitored.
+
+    The files are kept in a tree of dictionaries (by path component). Items
+    for the contents of a folder are only created once the folder is expanded,
+    so listing a large number of files is fast.
+
+    After the initial scan (:meth:`loadFromPath`), changes are detected by
+    watching the active folders, i.e., the ones that have recently changed
+    (see :func:`findActiveFolders`), and new folders. Only the folders that
+    changed are looked at again. Files appearing elsewhere are only found
+    when :meth:`loadFromPath` is called again.
     """
 
     fileExtensions = ['.ddh5']
 
+    #: folders that have been modified within this time (in seconds) are
+    #: watched for changes.
+    activeFolderAge = 24 * 3600.
+
     #: Signal(str) -- emitted when a data file is selected
     #: Arguments:
     #:   - the absolute path of the data file
@@ -111,12 +184,32 @@ class DataFileList(QtWidgets.QTreeWidget):
     #: Signal(list) -- emitted when new files have been found
     newDataFilesFound = Signal(list)
 
+    #: Signal(list, list) -- emitted when files have been added to or removed
+    #: from the list.
+    #: Arguments:
+    #:   - the added files
+    #:   - the removed files
+    filesChanged = Signal(list, list)
+
     def __init__(self, parent: Optional[QtWidgets.QWidget] = None):
         super().__init__(parent)
 
-        self.files: List[str] = []
+        self.files: Set[str] = set()
         self.path: Optional[str] = None
 
+        # all files, as nested dictionaries by path component (files are
+        # empty dictionaries).
+        self._tree: Dict[str, Any] = {}
+        # existing items by their path relative to ``path``, and the folders
+        # for which items of the contents have been created ('' is the root).
+        self._items: Dict[str, QtWidgets.QTreeWidgetItem] = {}
+        self._populated: Set[str] = {''}
+
+        self.itemExpanded.connect(self.populateItem)
+
+        self.watcher = QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.onDirectoryChanged)
+
     @staticmethod
     def finditem(parent: Union["DataFileList", QtWidgets.QTreeWidgetItem], name: str) -> Optional[QtWidgets.QTreeWidgetItem]:
         if isinstance(parent, DataFileList):
@@ -144,76 +237,259 @@ class DataFileList(QtWidgets.QTreeWidget):
         assert self.path is not None
         return os.path.join(self.path, buildPath(item))
 
-    def findItemByPath(self, path: str) -> Optional[QtWidgets.QTreeWidgetItem]:
+    def _relativePath(self, path: str) -> str:
         assert self.path is not None
-        path = path[len(self.path) + len(os.path.sep):]
-        pathList = path.split(os.path.sep)
-        parent: Union["DataFileList", QtWidgets.QTreeWidgetItem] = self
-        for p in pathList:
-            new_parent = self.finditem(parent, p)
-            if new_parent is None:
+        return path[len(self.path) + len(os.path.sep):]
+
+    def findItemByPath(self, path: str) -> Optional[QtWidgets.QTreeWidgetItem]:
+        """The item for a path, if it has been created (i.e., if its parent
+        folder has been expanded)."""
+        return self._items.get(self._relativePath(path))
+
+    def _makeItem(self, key: str, folder: Dict[str, Any]) -> QtWidgets.QTreeWidgetItem:
+        name = key.rpartition(os.path.sep)[2]
+        item = QtWidgets.QTreeWidgetItem([name])
+        item.setData(0, QtCore.Qt.UserRole, key)
+        if len(folder) > 0:
+            item.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+        elif os.path.splitext(name)[-1] in self.fileExtensions:
+            fnt = QtGui.QFont()
+            item.setFont(0, fnt)
+        self._items[key] = item
+        return item
+
+    def _addItems(self, parentKey: str, items: List[QtWidgets.QTreeWidgetItem]) -> None:
+        if parentKey == '':
+            self.addTopLevelItems(items)
+        else:
+            self._items[parentKey].addChildren(items)
+
+    @Slot(QtWidgets.QTreeWidgetItem)
+    def populateItem(self, item: QtWidgets.QTreeWidgetItem) -> None:
+        """Create the items for the contents of a folder item."""
+        key = item.data(0, QtCore.Qt.UserRole)
+        if key is None or key in self._populated:
+            return
+        folder = self._folder(key)
+        if folder is None:
+            return
+        self._populated.add(key)
+        sep = os.path.sep
+        self._addItems(key, [self._makeItem(key + sep + name, contents)
+                             for name, contents in folder.items()])
+        item.setChildIndicatorPolicy(
+            QtWidgets.QTreeWidgetItem.DontShowIndicatorWhenChildless)
+
+    def _folder(self, key: str) -> Optional[Dict[str, Any]]:
+        folder: Optional[Dict[str, Any]] = self._tree
+        for name in key.split(os.path.sep):
+            assert folder is not None
+            folder = folder.get(name)
+            if folder is None:
                 return None
-            else:
-                parent = new_parent
-        assert isinstance(parent, QtWidgets.QTreeWidgetItem)
-        return parent
+        return folder
 
     def addItemByPath(self, path: str) -> None:
-        assert self.path is not None
-        path = path[len(self.path)+len(os.path.sep):]
-        pathList = path.split(os.path.sep)
-
-        def add(parent: Union["DataFileList", QtWidgets.QTreeWidgetItem], name: str) -> Union["DataFileList", QtWidgets.QTreeWidgetItem]:
-            item = self.finditem(parent, name)
-            if item is None:
-                item = QtWidgets.QTreeWidgetItem(parent, [name])
-                if os.path.splitext(name)[-1] in self.fileExtensions:
-                    fnt = QtGui.QFont()
-                    item.setFont(0, fnt)
-                else:
-                    pass
-                if isinstance(parent, DataFileList):
-                    parent.addTopLevelItem(item)
-                else:
-                    parent.addChild(item)
-            return item
-
-        parent: Union["DataFileList", QtWidgets.QTreeWidgetItem] = self
-        for p in pathList:
-            parent = add(parent, p)
+        self.addItemsByPath([path])
+
+    def addItemsByPath(self, paths: Sequence[str]) -> None:
+        """Add the given file paths to the tree.
+
+        Items are created only for the parts of the paths that are in
+        expanded (populated) folders; they are added to their parents in
+        one go, which is much faster than adding them one by one.
+        """
+        # keys and contents of new items, by the key of their (existing) parent
+        pending: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        sep = os.path.sep
+
+        for path in paths:
+            names = self._relativePath(path).split(sep)
+            folder = self._tree
+            parentKey = ''
+            key = ''
+            created = False
+            for name in names:
+                key = name if key == '' else key + sep + name
+                if name not in folder:
+                    folder[name] = {}
+                    # the first new part of the path needs an item if its
+                    # parent is populated; its contents get filled in below.
+                    if not created and parentKey in self._populated:
+                        pending.setdefault(parentKey, []).append(
+                            (key, folder[name]))
+                        created = True
+                folder = folder[name]
+                parentKey = key
+
+        for parentKey, new in pending.items():
+            self._addItems(parentKey, [self._makeItem(k, f) for k, f in new])
 
     def removeItemByPath(self, path: str) -> None:
 
-        def remove(i: QtWidgets.QTreeWidgetItem) -> None:
-            parent = i.parent()
-            if isinstance(parent, DataFileList):
-                idx = parent.indexOfTopLevelItem(i)
-                parent.takeTopLevelItem(idx)
-            elif isinstance(parent, QtWidgets.QTreeWidgetItem):
-                parent.removeChild(i)
-                if parent.childCount() == 0:
-                    remove(parent)
-
-        item = self.findItemByPath(path)
-        if item is None:
-            return
-        remove(item)
+        def forget(key: str) -> None:
+            item = self._items.pop(key, None)
+            self._populated.discard(key)
+            if item is not None:
+                for j in range(item.childCount()):
+                    forget(key + os.path.sep + item.child(j).text(0))
+
+        names = self._relativePath(path).split(os.path.sep)
+        folders = [self._tree]
+        for name in names:
+            folder = folders[-1].get(name)
+            if folder is None:
+                return
+            folders.append(folder)
+
+        # remove the path and all folders that become empty.
+        i = len(names)
+        while i > 0:
+            del folders[i - 1][names[i - 1]]
+            if i == 1 or len(folders[i - 1]) > 0:
+                break
+            i -= 1
+
+        key = os.path.sep.join(names[:i])
+        item = self._items.get(key)
+        forget(key)
+        if item is not None:
+            parent = item.parent()
+            if parent is None:
+                self.takeTopLevelItem(self.indexOfTopLevelItem(item))
+            else:
+                parent.removeChild(item)
 
-    def loadFromPath(self, path: str, emitNew: bool = False) -> None:
+    def _reset(self, path: str) -> None:
+        """Start from an empty list if we're looking at a new path."""
+        if path == self.path:
+            return
+        if len(self.watcher.directories()) > 0:
+            self.watcher.removePaths(self.watcher.directories())
+        self.clear()
+        self._tree = {}
+        self._items = {}
+        self._populated = {''}
+        self.files = set()
         self.path = path
-        files = findFilesByExtension(path, self.fileExtensions)
-        newFiles = [f for f in files if f not in self.files]
-        removedFiles = [f for f in self.files if f not in files]
 
-        for f in newFiles:
-            self.addItemByPath(f)
+    def loadFromPath(self, path: str, emitNew: bool = False) -> None:
+        """Scan the full folder tree below ``path`` for data files, and
+        (re-)determine the folders to watch for changes.
+
+        This blocks until the scan is done; to scan in the background, run
+        :func:`scanFolders` in another thread and pass the result to
+        :meth:`applyScan`.
+        """
+        files, activeFolders = scanFolders(path, self.fileExtensions,
+                                           self.activeFolderAge)
+        self.applyScan(path, files, activeFolders, emitNew)
+
+    def applyScan(self, path: str, files: Sequence[str],
+                  activeFolders: Sequence[str], emitNew: bool = False) -> None:
+        """Update the list from the result of a full scan (see
+        :func:`scanFolders`), and watch the active folders."""
+        self._reset(path)
+        found = set(files)
+        # files that were added while the scan was going on are not in the
+        # result; only remove the ones that are really gone.
+        removedFiles = {f for f in self.files - found if not os.path.exists(f)}
+        self.updateFiles(found - self.files, removedFiles, emitNew)
+
+        watched = set(self.watcher.directories())
+        active = [f for f in activeFolders if f not in watched]
+        if len(active) > 0:
+            self.watcher.addPaths(active)
+
+    def loadFromList(self, path: str, files: Sequence[str]) -> None:
+        """Show the given files (e.g., from an index) as the contents of
+        ``path``, without scanning or watching the folders."""
+        self._reset(path)
+        fileSet = set(files)
+        self.updateFiles(fileSet - self.files, self.files - fileSet,
+                         emitNew=False)
+
+    def updateFiles(self, newFiles: Set[str], removedFiles: Set[str],
+                    emitNew: bool = True) -> None:
+        """Add and remove files from the list.
+
+        :param newFiles: files to add.
+        :param removedFiles: files to remove.
+        :param emitNew: whether to emit ``newDataFilesFound`` if there are
+            new files.
+        """
+        # sorting after each insertion makes adding many items very slow;
+        # we sort only once, at the end.
+        sorting = self.isSortingEnabled()
+        self.setSortingEnabled(False)
+        self.addItemsByPath(sorted(newFiles))
 
         for f in removedFiles:
             self.removeItemByPath(f)
+        self.setSortingEnabled(sorting)
 
-        self.files = files
+        self.files = (self.files | newFiles) - removedFiles
+        if len(newFiles) > 0 or len(removedFiles) > 0:
+            self.filesChanged.emit(sorted(newFiles), sorted(removedFiles))
         if len(newFiles) > 0 and emitNew:
-            self.newDataFilesFound.emit(newFiles)
+            self.newDataFilesFound.emit(sorted(newFiles))
+
+    @Slot(str)
+    def onDirectoryChanged(self, path: str) -> None:
+        """Update the files in a folder that has changed. New subfolders are
+        scanned and watched as well."""
+        if self.path is None:
+            return
+        key = '' if path == self.path else self._relativePath(path)
+        # the entries of this folder we already know files in.
+        folder = self._tree if key == '' else self._folder(key)
+        if folder is None:
+            folder = {}
+
+        if not os.path.isdir(path):
+            self.updateFiles(set(), self._filesBelow(path, folder))
+            return
+
+        try:
+            entries = {e.name: e.is_dir() for e in os.scandir(path)}
+        except OSError:
+            return
+
+        knownEntries = set(folder.keys())
+        watched = set(self.watcher.directories())
+
+        newFiles: Set[str] = set()
+        newFolders: List[str] = []
+        for name, isDir in entries.items():
+            entryPath = os.path.join(path, name)
+            if not isDir:
+                if os.path.splitext(name)[-1] in self.fileExtensions \
+                        and entryPath not in self.files:
+                    newFiles.add(entryPath)
+            elif entryPath not in watched and name not in knownEntries:
+                newFolders.append(entryPath)
+
+        # watch new folders before scanning them, so we don't miss files
+        # that are created in the meantime.
+        for newFolder in newFolders:
+            self.watcher.addPaths(findActiveFolders(newFolder, self.activeFolderAge))
+        for newFolder in newFolders:
+            newFiles.update(findFilesByExtension(newFolder, self.fileExtensions))
+
+        removedFiles: Set[str] = set()
+        for name in knownEntries - set(entries):
+            removedFiles |= self._filesBelow(os.path.join(path, name), folder[name])
+        self.updateFiles(newFiles - self.files, removedFiles)
+
+    def _filesBelow(self, path: str, folder: Dict[str, Any]) -> Set[str]:
+        """The known files in (or at) ``path``, whose entry in the tree of
+        files is ``folder``."""
+        if len(folder) == 0:
+            return {path} if path in self.files else set()
+        ret: Set[str] = set()
+        for name, contents in folder.items():
+            ret |= self._filesBelow(os.path.join(path, name), contents)
+        return ret
 
     @Slot()
     def processSelection(self) -> None:
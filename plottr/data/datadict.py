@@ -3,12 +3,13 @@ datadict.py :
 
 Data classes we use throughout the plottr package, and tools to work on them.
 """
+import json
 import warnings
 import copy as cp
 
 import numpy as np
 from functools import reduce
-from typing import List, Tuple, Dict, Sequence, Union, Any, Iterator, Optional, TypeVar
+from typing import List, Tuple, Dict, Sequence, Union, Any, Iterator, Optional, TypeVar, Set, Type
 
 from plottr.utils import num, misc
 
@@ -496,10 +497,44 @@ class DataDictBase(dict):
         """
         shapes = {}
         for k, v in self.data_items():
-            shapes[k] = np.array(self.data_vals(k)).shape
+            shapes[k] = np.shape(self.data_vals(k))
 
         return shapes
 
+    def structure_key(self) -> Tuple[Tuple[str, Tuple[str, ...], str, str], ...]:
+        """
+        Get a lightweight, hashable representation of the structure.
+
+        Contains, for each data field, the name, axes, unit and label. Unlike
+        :meth:`structure`, no copies of the data fields are made. Comparing
+        the keys of two datadicts is thus a cheap way to detect structure
+        changes.
+
+        :return: tuple with one entry per data field.
+        """
+        return tuple(
+            (n, tuple(v.get('axes', [])), v.get('unit', ''), v.get('label', ''))
+            for n, v in self.data_items()
+        )
+
+    def limits(self, name: str) -> Tuple[Any, Any]:
+        """
+        Get minimum and maximum of the values of data field ``name``.
+
+        If the field carries the meta entry ``limits`` (see
+        :func:`track_limits`) and it matches the current number of values,
+        it is used; otherwise the limits are computed from the values.
+
+        :param name: name of the data field
+        :return: tuple of min and max. ``(None, None)`` if there are no valid
+                 values.
+        """
+        vals = self.data_vals(name)
+        lims = self[name].get(self._meta_name_to_key('limits'), None)
+        if lims is not None and lims[2] == np.size(vals):
+            return lims[0], lims[1]
+        return num.minmax(vals)
+
     # validation and sanitizing
 
     def validate(self) -> bool:
@@ -1001,7 +1036,7 @@ class MeshgridDataDict(DataDictBase):
         :returns: the shape as tuple. None if no data in the set.
         """
         for d, _ in self.data_items():
-            return np.array(self.data_vals(d)).shape
+            return np.shape(self.data_vals(d))
         return None
 
     def validate(self) -> bool:
@@ -1083,6 +1118,55 @@ class MeshgridDataDict(DataDictBase):
         return ret
 
 
+def track_limits(data: DataDictBase,
+                 previous: Optional[Dict[str, Tuple[Any, Any, int]]] = None) \
+        -> Dict[str, Tuple[Any, Any, int]]:
+    """
+    Update the limits of all data fields, assuming data is only appended.
+
+    For each field, only the values beyond the ones seen previously are
+    scanned. Invalid values at the end (like in data that is pre-allocated
+    with ``nan``, and filled up) don't count as seen, so they are scanned
+    again the next time. The result is also stored in the field meta
+    ``limits`` as ``(min, max, number of values)``, so it is carried along
+    with the data (:meth:`DataDictBase.limits` makes use of it). If a field
+    already carries limits for all its values (for example, from the summary
+    stored in a DDH5 file), nothing is scanned.
+
+    :param data: the data to examine. Meta information is modified in place.
+    :param previous: limits returned by the previous call for the same
+                     (but possibly shorter, or less filled) dataset.
+    :return: the limits per data field, with the number of values seen, to
+             be passed on to the next call.
+    """
+    if previous is None:
+        previous = {}
+
+    ret = {}
+    for n, _ in data.data_items():
+        vals = np.asanyarray(data.data_vals(n)).reshape(-1)
+        prev = previous.get(n, None)
+        carried = data[n].get(meta_name_to_key('limits'), None)
+        if carried is not None and carried[2] == vals.size:
+            lims = carried[0], carried[1]
+            nseen = vals.size
+        else:
+            start = 0
+            if prev is not None and prev[2] <= vals.size:
+                start = prev[2]
+            new = vals[start:]
+            lims = num.minmax(new)
+            if prev is not None and start > 0:
+                lims = num.merge_limits(prev[:2], lims)
+            valid = ~(num.is_invalid(np.asarray(new)) | np.ma.getmaskarray(new))
+            nvalid = np.flatnonzero(valid)
+            nseen = start + (nvalid[-1] + 1 if nvalid.size > 0 else 0)
+        ret[n] = (lims[0], lims[1], int(nseen))
+        data.add_meta('limits', (lims[0], lims[1], vals.size), data=n)
+
+    return ret
+
+
 # Tools for converting between different data types
 
 def guess_shape_from_datadict(data: DataDict) -> \
@@ -1179,6 +1263,138 @@ def datadict_to_meshgrid(data: DataDict,
     return newdata
 
 
+def declared_shape(data: DataDictBase) -> Optional[Tuple[int, ...]]:
+    """
+    Get the grid shape declared in the meta data, if any.
+
+    Looks for the meta entry ``grid_shape`` (written, e.g., by
+    :class:`.DDH5Writer`), and for the shapes of the dependents in
+    ``qcodes_shape`` (as added by the qcodes loader; this may also be a JSON
+    string). The shape refers to the axes of the dependents in their given
+    order, which is assumed to be 'C' order (slowest first).
+
+    :param data: the data to inspect.
+    :returns: the shape, or ``None`` if none is declared, or the dependents
+        in the data have different shapes.
+    """
+    if data.has_meta('grid_shape') and data.meta_val('grid_shape') is not None:
+        return tuple(int(i) for i in data.meta_val('grid_shape'))
+
+    if not data.has_meta('qcodes_shape'):
+        return None
+    shapes = data.meta_val('qcodes_shape')
+    if isinstance(shapes, str):
+        try:
+            shapes = json.loads(shapes)
+        except ValueError:
+            return None
+    if not isinstance(shapes, dict):
+        return None
+
+    depshapes = set(tuple(int(i) for i in shapes[d])
+                    for d in data.dependents() if d in shapes)
+    if len(depshapes) != 1:
+        return None
+    return depshapes.pop()
+
+
+def _invalid_array(shape: Tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+    """Array filled with invalid entries: ``nan`` for numerical dtypes
+    (integers become floats), ``None`` otherwise."""
+    if dtype.kind in 'biuf':
+        return np.full(shape, np.nan)
+    if dtype.kind == 'c':
+        return np.full(shape, np.nan, dtype=complex)
+    return np.full(shape, None, dtype=object)
+
+
+def datadict_to_preallocated_meshgrid(
+        data: DataDict, shape: Tuple[int, ...],
+        grid: Optional[MeshgridDataDict] = None,
+        nrecords: int = 0) -> Tuple[MeshgridDataDict, int]:
+    """
+    Place the records of a DataDict into a grid of known shape.
+
+    The records are assumed to arrive in 'C' order of the grid; the grid is
+    allocated in full, with invalid entries where there are no records yet.
+    Nothing about the shape needs to be inferred from the data.
+
+    To support data that is growing, an existing grid can be passed along;
+    then only the new records are placed into it (in place). The meta data
+    of the grid is always replaced by the current one of ``data``.
+
+    :param data: input data.
+    :param shape: shape of the grid.
+    :param grid: grid returned from an earlier call, for the same data
+        (with fewer records). If ``None`` (or not compatible with the data
+        anymore, or if the data does not start with the records in the grid),
+        a new grid is allocated.
+    :param nrecords: number of records already placed into ``grid``.
+    :returns: the grid, and the number of records placed into it.
+    """
+    shape = tuple(shape)
+    n = data.nrecords()
+    if n is None:
+        n = 0
+    n = min(n, int(np.prod(shape)))
+
+    if grid is not None and \
+            {k for k, _ in grid.data_items()} != {k for k, _ in data.data_items()}:
+        grid = None
+
+    if grid is not None:
+        for k, v in data.data_items():
+            vals = np.asanyarray(v['values'])
+            gvals = grid.data_vals(k) if k in grid else None
+            if gvals is None or gvals.shape != shape + vals.shape[1:] \
+                    or not np.can_cast(vals.dtype, gvals.dtype) \
+                    or nrecords > n:
+                grid = None
+                break
+
+            # the data must continue what is in the grid already, not replace
+            # it. we check the first and the last record placed.
+            if nrecords > 0:
+                idxs = [0, nrecords - 1]
+                flat = gvals.reshape((-1,) + gvals.shape[len(shape):])
+                placed = vals[idxs]
+                if isinstance(placed, np.ma.MaskedArray):
+                    placed = placed.filled(np.nan if flat.dtype.kind in 'fc' else None)
+                if not num.arrays_equal(np.asarray(placed), flat[idxs]):
+                    grid = None
+                    break
+
+    if grid is None:
+        grid = MeshgridDataDict(**misc.unwrap_optional(
+            data.structure(add_shape=False)))
+        for k, v in data.data_items():
+            vals = np.asanyarray(v['values'])
+            grid[k]['values'] = _invalid_array(shape + vals.shape[1:], vals.dtype)
+        grid = grid.sanitize()
+        grid.validate()
+        nrecords = 0
+    else:
+        # meta data (limits, info about the state of the data, ...) changes
+        # while the data grows.
+        grid.clear_meta()
+        for k, v in data.meta_items():
+            grid.add_meta(k, v)
+        for k, v in data.data_items():
+            for key in [key for key in grid[k] if key != 'values' and key not in v]:
+                del grid[k][key]
+            grid[k].update({key: val for key, val in v.items() if key != 'values'})
+
+    for k, v in grid.data_items():
+        gvals = v['values']
+        flat = gvals.reshape((-1,) + gvals.shape[len(shape):])
+        vals = np.asanyarray(data.data_vals(k))[nrecords:n]
+        if isinstance(vals, np.ma.MaskedArray):
+            vals = vals.filled(np.nan if flat.dtype.kind in 'fc' else None)
+        flat[nrecords:n] = vals
+
+    return grid, n
+
+
 def meshgrid_to_datadict(data: MeshgridDataDict) -> DataDict:
     """
     Make a DataDict from a MeshgridDataDict by reshaping the data.
@@ -1198,7 +1414,7 @@ def meshgrid_to_datadict(data: MeshgridDataDict) -> DataDict:
 
 # Tools for manipulating and transforming data
 
-def _find_replacement_name(ddict: DataDictBase, name: str) -> str:
+def _find_replacement_name(ddict: Dict[str, Any], name: str) -> str:
     """
     Find a replacement name for a data field that already exists in a
     datadict.
@@ -1220,6 +1436,39 @@ def _find_replacement_name(ddict: DataDictBase, name: str) -> str:
         return newname
 
 
+class _ValueComparer:
+    """
+    Compares data values for content equality, as ``num.arrays_equal``,
+    but checks cheap criteria first: identity, shape, shared buffer, and
+    fingerprints (which are cached, by array, while the comparer exists).
+    """
+
+    def __init__(self) -> None:
+        self._fingerprints: Dict[int, Tuple[np.ndarray, Any]] = {}
+
+    def fingerprint(self, arr: np.ndarray) -> Any:
+        # we keep a reference to the array, so the id stays valid.
+        if id(arr) not in self._fingerprints:
+            self._fingerprints[id(arr)] = (arr, num.array_fingerprint(arr))
+        return self._fingerprints[id(arr)][1]
+
+    def equal(self, a: np.ndarray, b: np.ndarray) -> bool:
+        if a is b:
+            return True
+        a, b = np.asanyarray(a), np.asanyarray(b)
+        if a.shape != b.shape:
+            return False
+        if not isinstance(a, np.ma.MaskedArray) \
+                and not isinstance(b, np.ma.MaskedArray) \
+                and a.dtype == b.dtype and a.strides == b.strides \
+                and a.__array_interface__['data'] == b.__array_interface__['data']:
+            return True
+        fp = self.fingerprint(a)
+        if fp is not None and fp == self.fingerprint(b):
+            return True
+        return bool(num.arrays_equal(a, b))
+
+
 def combine_datadicts(*dicts: DataDict) -> Union[DataDictBase, DataDict]:
     """
     Try to make one datadict out of multiple.
@@ -1230,64 +1479,63 @@ def combine_datadicts(*dicts: DataDict) -> Union[DataDictBase, DataDict]:
     - return type is 'downgraded' to DataDictBase if the contents are not
       compatible (i.e., different numbers of records in the inputs)
 
+    Data values are not copied; the returned datadict refers to the
+    value arrays of the inputs.
+
     :returns: combined data
     """
 
     # TODO: deal correctly with MeshGridData when combined with other types
-    # TODO: should we strictly copy all values?
     # TODO: we should try to consolidate axes as much as possible. Currently
     #   axes in the return can be separated even if they match (caused
     #   by earlier mismatches)
 
-    ret = None
-    rettype = None
+    if len(dicts) == 0:
+        raise ValueError('Need at least one datadict to combine.')
 
-    for d in dicts:
-        if ret is None:
-            ret = d.copy()
-            rettype = type(d)
+    def copy_field(field: Dict[str, Any]) -> Dict[str, Any]:
+        ret = dict(field)
+        if 'axes' in ret:
+            ret['axes'] = list(ret['axes'])
+        return ret
 
+    rettype: Type[DataDictBase] = type(dicts[0])
+    fields = {k: copy_field(v) for k, v in dicts[0].data_items()}
+    axes: Set[str] = set(dicts[0].axes())
+    nrecords = dicts[0].nrecords() if hasattr(dicts[0], 'nrecords') else None
+    comparer = _ValueComparer()
+
+    for d in dicts[1:]:
+        # if we don't have a well defined number of records anymore,
+        # need to revert the type to DataDictBase
+        if hasattr(d, 'nrecords') and hasattr(dicts[0], 'nrecords'):
+            if d.nrecords() != nrecords:
+                rettype = DataDictBase
         else:
-
-            # if we don't have a well defined number of records anymore,
-            # need to revert the type to DataDictBase
-            if hasattr(d, 'nrecords') and hasattr(ret, 'nrecords'):
-                if d.nrecords() != ret.nrecords():
-                    rettype = DataDictBase
+            rettype = DataDictBase
+
+        # First, parse the axes in the to-be-added ddict.
+        # if dimensions with same names are present already in the current
+        # return ddict and are not compatible with what's to be added,
+        # rename the incoming dimension.
+        ax_map = {}
+        for d_ax in d.axes():
+            if d_ax in axes and comparer.equal(d.data_vals(d_ax),
+                                               fields[d_ax]['values']):
+                ax_map[d_ax] = d_ax
             else:
-                rettype = DataDictBase
-            ret = rettype(**ret)
-
-            # First, parse the axes in the to-be-added ddict.
-            # if dimensions with same names are present already in the current
-            # return ddict and are not compatible with what's to be added,
-            # rename the incoming dimension.
-            ax_map = {}
-            for d_ax in d.axes():
-                if d_ax in ret.axes():
-                    if num.arrays_equal(d.data_vals(d_ax), ret.data_vals(d_ax)):
-                        ax_map[d_ax] = d_ax
-                    else:
-                        newax = _find_replacement_name(ret, d_ax)
-                        ax_map[d_ax] = newax
-                        ret[newax] = d[d_ax]
-                elif d_ax in ret.dependents():
-                    newax = _find_replacement_name(ret, d_ax)
-                    ax_map[d_ax] = newax
-                    ret[newax] = d[d_ax]
-                else:
-                    ax_map[d_ax] = d_ax
-                    ret[d_ax] = d[d_ax]
-
-            for d_dep in d.dependents():
-                if d_dep in ret:
-                    newdep = _find_replacement_name(ret, d_dep)
-                else:
-                    newdep = d_dep
-
-                dep_axes = [ax_map[ax] for ax in d[d_dep]['axes']]
-                ret[newdep] = d[d_dep]
-                ret[newdep]['axes'] = dep_axes
-    assert ret is not None
+                newax = _find_replacement_name(fields, d_ax)
+                ax_map[d_ax] = newax
+                fields[newax] = copy_field(d[d_ax])
+                axes.add(newax)
+
+        for d_dep in d.dependents():
+            newdep = _find_replacement_name(fields, d_dep)
+            fields[newdep] = copy_field(d[d_dep])
+            fields[newdep]['axes'] = [ax_map[ax] for ax in d[d_dep]['axes']]
+
+    ret = rettype(**fields)
+    for k, v in dicts[0].meta_items():
+        ret.add_meta(k, cp.deepcopy(v))
     ret.validate()
     return ret
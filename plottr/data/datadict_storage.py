@@ -16,8 +16,14 @@ underscore pre- and suffix.
 """
 import os
 import time
+import uuid
+import queue
+import weakref
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Union, Optional, Dict, Type, Collection
+from typing import Any, Union, Optional, Dict, Type, Collection, Tuple, Sequence, List
 from types import TracebackType
 
 import numpy as np
@@ -30,7 +36,7 @@ from ..node import (
     emitGuiUpdate,
 )
 
-from .datadict import DataDict, is_meta_key, DataDictBase
+from .datadict import DataDict, is_meta_key, DataDictBase, track_limits
 
 __author__ = 'Wolfgang Pfaff'
 __license__ = 'MIT'
@@ -38,6 +44,10 @@ __license__ = 'MIT'
 DATAFILEXT = '.ddh5'
 TIMESTRFORMAT = "%Y-%m-%d %H:%M:%S"
 
+#: name of the group attribute that holds a unique ID, set whenever the group
+#: is (re-)created. It's not meta data, so it is not loaded with the data.
+GROUP_ID_ATTR = 'group_id'
+
 
 class AppendMode(Enum):
     """How/Whether to append data to existing data."""
@@ -176,10 +186,12 @@ def init_file(f: h5py.File,
         f.flush()
         grp = f.create_group(groupname)
         add_cur_time_attr(grp)
+        set_attr(grp, GROUP_ID_ATTR, uuid.uuid4().hex)
         f.flush()
     else:
         grp = f.create_group(groupname)
         add_cur_time_attr(grp)
+        set_attr(grp, GROUP_ID_ATTR, uuid.uuid4().hex)
         f.flush()
 
 
@@ -229,6 +241,7 @@ def write_data_to_file(datadict: DataDict,
             for kk, vv in datadict.meta_items(k, clean_keys=False):
                 set_attr(ds, kk, vv)
 
+            update_summary(ds, data)
             ds.flush()
 
         # if the dataset already exits, append data according to
@@ -241,15 +254,112 @@ def write_data_to_file(datadict: DataDict,
                 newshp = tuple([nrows] + list(shp[1:]))
                 ds.resize(newshp)
                 ds[dslen:] = data[dslen:]
+                if nrows < dslen:
+                    update_summary(ds, ds[()])
+                else:
+                    update_summary(ds, data[dslen:], append=True)
             elif append_mode == AppendMode.all:
                 newshp = tuple([dslen + nrows] + list(shp[1:]))
                 ds.resize(newshp)
                 ds[dslen:] = data[:]
+                update_summary(ds, data, append=True)
 
             ds.flush()
     f.flush()
 
 
+#: names of the dataset attributes that hold the summary of the data
+#: (see :func:`update_summary`)
+SUMMARY_ATTRS = ('nrecords', 'nan_count', 'limits')
+
+
+def summarize(values: np.ndarray) -> Dict[str, Any]:
+    """Summary of the values of a data field, as stored in the dataset
+    attributes: number of records, number of NaN values, and limits
+    (``[min, max]``, not including NaN). Limits are only included for
+    (non-complex) numerical data; without valid values they are
+    ``[nan, nan]`` for floats, and ``[max, min]`` of the data type for
+    integers.
+    """
+    values = np.asarray(values)
+    ret: Dict[str, Any] = dict(
+        nrecords=np.int64(values.shape[0]),
+        nan_count=np.int64(0),
+    )
+    if values.dtype.kind in 'fc':
+        ret['nan_count'] = np.int64(np.count_nonzero(np.isnan(values)))
+    if values.dtype.kind == 'f':
+        valid = values[~np.isnan(values)]
+        if valid.size > 0:
+            ret['limits'] = np.array([valid.min(), valid.max()], dtype=values.dtype)
+        else:
+            ret['limits'] = np.array([np.nan, np.nan], dtype=values.dtype)
+    elif values.dtype.kind in 'iu':
+        if values.size > 0:
+            ret['limits'] = np.array([values.min(), values.max()], dtype=values.dtype)
+        else:
+            info = np.iinfo(values.dtype)
+            ret['limits'] = np.array([info.max, info.min], dtype=values.dtype)
+    return ret
+
+
+def merge_summaries(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary of two pieces of data, from their summaries
+    (see :func:`summarize`)."""
+    ret = dict(nrecords=first['nrecords'] + second['nrecords'],
+               nan_count=first['nan_count'] + second['nan_count'])
+    if 'limits' in first and 'limits' in second:
+        ret['limits'] = np.array([np.fmin(first['limits'][0], second['limits'][0]),
+                                  np.fmax(first['limits'][1], second['limits'][1])],
+                                 dtype=first['limits'].dtype)
+    return ret
+
+
+def update_summary(ds: h5py.Dataset, values: np.ndarray,
+                   append: bool = False) -> None:
+    """Update the summary attributes of a dataset (see :func:`summarize`).
+
+    :param ds: the dataset.
+    :param values: if ``append`` is ``False``, all values in the dataset;
+        otherwise, the values that have just been appended.
+    :param append: if ``True``, merge the summary of ``values`` into the
+        existing one (if the dataset does not have a summary yet, it is
+        computed from all values in the dataset).
+    """
+    summary = summarize(values)
+    if append:
+        if any(k not in ds.attrs for k in summary):
+            summary = summarize(ds[()])
+        else:
+            previous = {k: ds.attrs[k] for k in summary}
+            summary = merge_summaries(previous, summary)
+    for k, v in summary.items():
+        # modifying existing attributes in place also works in SWMR mode.
+        if k in ds.attrs:
+            ds.attrs.modify(k, v)
+        else:
+            ds.attrs[k] = v
+
+
+def dataset_summary(ds: h5py.Dataset) -> Optional[Dict[str, Any]]:
+    """The summary of the data in a dataset, from its attributes.
+
+    :returns: ``None`` if the dataset has no summary; otherwise, a dictionary
+        with ``nrecords``, ``nan_count``, ``min`` and ``max``. ``min`` and
+        ``max`` are ``None`` if there are no valid (numerical) values.
+    """
+    if any(k not in ds.attrs for k in SUMMARY_ATTRS[:2]):
+        return None
+    ret: Dict[str, Any] = dict(nrecords=int(ds.attrs['nrecords']),
+                               nan_count=int(ds.attrs['nan_count']),
+                               min=None, max=None)
+    if 'limits' in ds.attrs:
+        lo, hi = ds.attrs['limits']
+        if not (np.isnan(lo) or np.isnan(hi) or lo > hi):
+            ret['min'], ret['max'] = lo, hi
+    return ret
+
+
 def file_is_readable(filepath: str,
                      swmr_mode: bool = True,
                      n_retries: int = 5,
@@ -271,6 +381,45 @@ def file_is_readable(filepath: str,
                 raise
 
 
+def open_for_reading(filepath: str,
+                     swmr_mode: bool = True,
+                     n_retries: int = 5,
+                     retry_delay: float = 0.01) -> h5py.File:
+    """Open a DDH5 file for reading.
+
+    If the file cannot be opened (for instance, because it is being written
+    to at the moment), try again, after a delay.
+
+    :param filepath: path of the file (incl. extension).
+    :param swmr_mode: if `True`, open HDF5 file in SWMR mode.
+    :param n_retries: how often to try again.
+    :param retry_delay: delay between tries (in seconds).
+    :return: the open file.
+    """
+    cur_try = 0
+    while True:
+        try:
+            return h5py.File(filepath, 'r', libver='latest', swmr=swmr_mode)
+        except OSError:
+            cur_try += 1
+            if cur_try <= n_retries:
+                time.sleep(retry_delay)
+            else:
+                raise
+
+
+def _filepath(basepath: str) -> str:
+    if len(basepath) > len(DATAFILEXT) and \
+            basepath[-len(DATAFILEXT):] == DATAFILEXT:
+        filepath = basepath
+    else:
+        filepath = basepath + DATAFILEXT
+
+    if not os.path.exists(filepath):
+        raise ValueError("Specified file does not exist.")
+    return filepath
+
+
 def datadict_from_hdf5(basepath: str,
                        groupname: str = 'data',
                        startidx: Union[int, None] = None,
@@ -290,100 +439,338 @@ def datadict_from_hdf5(basepath: str,
     :param ignore_unequal_lengths: if `True`, don't fail when the rows have
         unequal length; will return the longest consistent DataDict possible.
     :param swmr_mode: if `True`, open HDF5 file in SWMR mode.
+    :param n_retries: how often to try again to open the file if that fails.
+    :param retry_delay: delay between tries (in seconds).
     :return: validated DataDict.
     """
-
-    if len(basepath) > len(DATAFILEXT) and \
-            basepath[-len(DATAFILEXT):] == DATAFILEXT:
-        filepath = basepath
-    else:
-        filepath = basepath + DATAFILEXT
-
-    if not os.path.exists(filepath):
-        raise ValueError("Specified file does not exist.")
-
+    filepath = _filepath(basepath)
+    with open_for_reading(filepath, swmr_mode=swmr_mode, n_retries=n_retries,
+                          retry_delay=retry_delay) as f:
+        return datadict_from_group(f, groupname, startidx=startidx,
+                                   stopidx=stopidx,
+                                   structure_only=structure_only,
+                                   ignore_unequal_lengths=ignore_unequal_lengths)
+
+
+def datadict_from_group(f: h5py.File,
+                        groupname: str = 'data',
+                        startidx: Union[int, None] = None,
+                        stopidx: Union[int, None] = None,
+                        structure_only: bool = False,
+                        ignore_unequal_lengths: bool = True) -> DataDict:
+    """Load a DataDict from a group in an open file. Arguments are as for
+    :func:`datadict_from_hdf5`."""
     if startidx is None:
         startidx = 0
 
-    if file_is_readable(filepath, swmr_mode=swmr_mode,
-                        n_retries=n_retries, retry_delay=retry_delay):
-        pass
-
     res = {}
-    with h5py.File(filepath, 'r', libver='latest', swmr=swmr_mode) as f:
-        if groupname not in f:
-            raise ValueError('Group does not exist.')
+    if groupname not in f:
+        raise ValueError('Group does not exist.')
 
-        grp = f[groupname]
-        keys = list(grp.keys())
-        lens = [len(grp[k][:]) for k in keys]
+    grp = f[groupname]
+    keys = list(grp.keys())
+    lens = [grp[k].shape[0] for k in keys]
 
-        if len(set(lens)) > 1:
-            if not ignore_unequal_lengths:
-                raise RuntimeError('Unequal lengths in the datasets.')
+    if len(set(lens)) > 1:
+        if not ignore_unequal_lengths:
+            raise RuntimeError('Unequal lengths in the datasets.')
 
-            if stopidx is None or stopidx > min(lens):
-                stopidx = min(lens)
-        else:
-            if stopidx is None or stopidx > lens[0]:
-                stopidx = lens[0]
+        if stopidx is None or stopidx > min(lens):
+            stopidx = min(lens)
+    else:
+        if stopidx is None or stopidx > lens[0]:
+            stopidx = lens[0]
 
-        for attr in grp.attrs:
-            if is_meta_key(attr):
-                res[attr] = deh5ify(grp.attrs[attr])
+    for attr in grp.attrs:
+        if is_meta_key(attr):
+            res[attr] = deh5ify(grp.attrs[attr])
 
-        for k in keys:
-            ds = grp[k]
-            entry: Dict[str, Union[Collection[Any], np.ndarray]] = dict(values=np.array([]), )
+    for k in keys:
+        ds = grp[k]
+        entry: Dict[str, Union[Collection[Any], np.ndarray]] = dict(values=np.array([]), )
 
-            if 'axes' in ds.attrs:
-                entry['axes'] = deh5ify(ds.attrs['axes']).tolist()
-            else:
-                entry['axes'] = []
+        if 'axes' in ds.attrs:
+            entry['axes'] = deh5ify(ds.attrs['axes']).tolist()
+        else:
+            entry['axes'] = []
+
+        if 'unit' in ds.attrs:
+            entry['unit'] = deh5ify(ds.attrs['unit'])
 
-            if 'unit' in ds.attrs:
-                entry['unit'] = deh5ify(ds.attrs['unit'])
+        if not structure_only:
+            entry['values'] = ds[startidx:stopidx]
 
-            if not structure_only:
-                entry['values'] = ds[startidx:stopidx]
+        entry['__shape__'] = ds.shape
 
-            entry['__shape__'] = ds[:].shape
+        # and now the meta data
+        for attr in ds.attrs:
+            if is_meta_key(attr):
+                entry[attr] = deh5ify(ds.attrs[attr])
 
-            # and now the meta data
-            for attr in ds.attrs:
-                if is_meta_key(attr):
-                    _val = deh5ify(ds.attrs[attr])
-                    entry[attr] = deh5ify(ds.attrs[attr])
+        # the summary refers to all data in the file, so the limits are only
+        # used if all values are loaded (see :meth:`.DataDictBase.limits`).
+        summary = dataset_summary(ds)
+        if summary is not None and summary['nrecords'] == ds.shape[0]:
+            entry['__summary__'] = summary
+            if 'limits' in ds.attrs:
+                entry['__limits__'] = (summary['min'], summary['max'], ds.size)
 
-            res[k] = entry
+        res[k] = entry
 
     dd = DataDict(**res)
     dd.validate()
     return dd
 
 
-def all_datadicts_from_hdf5(basepath: str, **kwargs: Any) -> Dict[str, Any]:
-    if len(basepath) > len(DATAFILEXT) and \
-            basepath[-len(DATAFILEXT):] == DATAFILEXT:
-        filepath = basepath
-    else:
-        filepath = basepath + DATAFILEXT
+def all_datadicts_from_hdf5(basepath: str,
+                            groupnames: Optional[Collection[str]] = None,
+                            swmr_mode: bool = True,
+                            n_retries: int = 5,
+                            retry_delay: float = 0.01,
+                            **kwargs: Any) -> Dict[str, Any]:
+    """Load the DataDicts from all (or some) groups in a file.
 
-    if not os.path.exists(filepath):
-        raise ValueError("Specified file does not exist.")
+    The file is opened only once for all groups.
 
+    :param basepath: full filepath without the file extension
+    :param groupnames: the groups to load. Default: all top-level groups.
+    :param swmr_mode: if `True`, open HDF5 file in SWMR mode.
+    :param n_retries: how often to try again to open the file if that fails.
+    :param retry_delay: delay between tries (in seconds).
+    :param kwargs: passed on to :func:`datadict_from_group`.
+    :return: the DataDicts, by group name.
+    """
+    filepath = _filepath(basepath)
     ret = {}
-    if file_is_readable(filepath, swmr_mode=kwargs.get('swmr_mode', True)):
-        with h5py.File(filepath, mode='r', libver='latest',
-                       swmr=kwargs.get('swmr_mode', True)) as f:
-            keys = [k for k in f.keys()]
+    with open_for_reading(filepath, swmr_mode=swmr_mode, n_retries=n_retries,
+                          retry_delay=retry_delay) as f:
+        if groupnames is None:
+            groupnames = list(f.keys())
+        for k in groupnames:
+            ret[k] = datadict_from_group(f, k, **kwargs)
+
+    return ret
+
 
-        for k in keys:
-            ret[k] = datadict_from_hdf5(basepath=basepath, groupname=k, **kwargs)
+#: ID of a group, and the names and shapes of its datasets
+_GroupState = Tuple[Optional[str], Tuple[Tuple[str, Tuple[int, ...]], ...]]
 
+
+@dataclass
+class _DDH5CacheEntry:
+    data: DataDict
+    #: modification time (in ns) and size of the file when read
+    stat: Tuple[int, int]
+    #: time of reading
+    read_time: float
+    #: size of the data values (in bytes)
+    nbytes: int
+    #: state of the group when read (see :meth:`DDH5Cache._group_state`)
+    state: _GroupState = (None, ())
+
+
+class DDH5Cache:
+    """Cache of data loaded from DDH5 files, shared by everything in the
+    process that loads them (see :data:`ddh5_cache`).
+
+    Data is cached per file and group. When the file has changed since it was
+    last read, only the records that were added since are read, and appended
+    to the cached data. Thus, if several loaders show data from the same
+    file, each new piece of the file is read only once: whether the cached
+    data is current is decided by the ID of the group and the sizes of its
+    datasets, which change with every append.
+
+    Loaders that use an entry can subscribe to it; subscriptions are weak
+    references, i.e., they end when the subscriber is deleted. Once the
+    cached data exceeds ``max_bytes``, entries are evicted least recently
+    used first, starting with the ones that nobody subscribes to.
+
+    :param max_bytes: memory limit for the cached data values.
+    """
+
+    #: if the file is unchanged, and was last modified at least this long
+    #: (in seconds) before the cached data was read, the data is known to be
+    #: current without opening the file.
+    mtime_resolution = 2.
+
+    def __init__(self, max_bytes: int = 2 ** 30):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], _DDH5CacheEntry]" = OrderedDict()
+        self._subscribers: Dict[Tuple[str, str], weakref.WeakSet] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _key(filepath: str, groupname: str) -> Tuple[str, str]:
+        if filepath[-len(DATAFILEXT):] != DATAFILEXT:
+            filepath = filepath + DATAFILEXT
+        return os.path.abspath(filepath), groupname
+
+    def subscribe(self, subscriber: Any, filepath: str, groupname: str = 'data') -> None:
+        """Register ``subscriber`` as user of the data in a file and group."""
+        with self._lock:
+            key = self._key(filepath, groupname)
+            self._subscribers.setdefault(key, weakref.WeakSet()).add(subscriber)
+
+    def unsubscribe(self, subscriber: Any, filepath: str, groupname: str = 'data') -> None:
+        """End a subscription (see :meth:`subscribe`)."""
+        with self._lock:
+            subscribers = self._subscribers.get(self._key(filepath, groupname))
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+
+    def n_subscribers(self, filepath: str, groupname: str = 'data') -> int:
+        with self._lock:
+            return len(self._subscribers.get(self._key(filepath, groupname), ()))
+
+    def nbytes(self) -> int:
+        """Size of all cached data values (in bytes)."""
+        with self._lock:
+            return sum(e.nbytes for e in self._entries.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def load(self, filepath: str, groupname: str = 'data', **kw: Any) -> DataDict:
+        """Load data from a file, using the cache.
+
+        :param filepath: path of the file (with or without extension).
+        :param groupname: name of the group to load.
+        :param kw: passed on to :func:`datadict_from_hdf5`.
+        :returns: the data. The values are shared with the cache (and with
+            other users of the cache), and must not be modified in place; the
+            field dictionaries and meta data are not shared.
+        """
+        key = self._key(filepath, groupname)
+        with self._lock:
+            read_time = time.time()
+            st = os.stat(key[0])
+            stat = (st.st_mtime_ns, st.st_size)
+            entry = self._entries.get(key)
+            # the file might have been modified right after we read it, without
+            # a change in modification time (limited resolution) or size
+            # (chunks are allocated in advance). unless the entry was read well
+            # after the last modification, we check the sizes of the datasets;
+            # that only needs the meta data of the file.
+            if entry is not None and entry.stat == stat and (
+                    entry.read_time > st.st_mtime + self.mtime_resolution
+                    or self._current_state(key, **kw) == entry.state):
+                self._entries.move_to_end(key)
+                return _shallow_copy(entry.data)
+
+            data = None
+            if entry is not None:
+                state, data = self._append_new(entry, key, **kw)
+            if data is None:
+                state, data = self._read(key, **kw)
+
+            nbytes = sum(np.asanyarray(v['values']).nbytes for _, v in data.data_items())
+            self._entries[key] = _DDH5CacheEntry(data, stat, read_time, nbytes,
+                                                 state)
+            self._entries.move_to_end(key)
+            self._evict(keep=key)
+            return _shallow_copy(data)
+
+    @staticmethod
+    def _group_state(f: h5py.File, groupname: str) -> _GroupState:
+        """The ID of a group (see :data:`GROUP_ID_ATTR`), and the shapes of
+        its datasets."""
+        grp = f[groupname]
+        shapes = tuple(sorted((k, tuple(ds.shape)) for k, ds in grp.items()
+                              if isinstance(ds, h5py.Dataset)))
+        return deh5ify(grp.attrs.get(GROUP_ID_ATTR)), shapes
+
+    def _current_state(self, key: Tuple[str, str], swmr_mode: bool = True,
+                       n_retries: int = 5, retry_delay: float = 0.01,
+                       **kw: Any) -> Optional[_GroupState]:
+        """The state of a group in the file, or ``None`` if it cannot be
+        determined."""
+        try:
+            with open_for_reading(key[0], swmr_mode=swmr_mode, n_retries=n_retries,
+                                  retry_delay=retry_delay) as f:
+                return self._group_state(f, key[1])
+        except (OSError, KeyError):
+            return None
+
+    def _read(self, key: Tuple[str, str], startidx: Optional[int] = None,
+              swmr_mode: bool = True, n_retries: int = 5,
+              retry_delay: float = 0.01,
+              **kw: Any) -> Tuple[_GroupState, DataDict]:
+        """Read data, and the state of the group."""
+        with open_for_reading(key[0], swmr_mode=swmr_mode, n_retries=n_retries,
+                              retry_delay=retry_delay) as f:
+            data = datadict_from_group(f, key[1], startidx=startidx, **kw)
+            state = self._group_state(f, key[1])
+        return state, data
+
+    def _append_new(self, entry: _DDH5CacheEntry, key: Tuple[str, str],
+                    **kw: Any) -> Tuple[_GroupState, Optional[DataDict]]:
+        """Read the records that are not cached yet, and return the combined
+        data. Returns ``None`` as data if the file does not continue the
+        cached data (i.e., if it needs to be loaded fully)."""
+        cached = entry.data
+        n = cached.nrecords()
+        assert n is not None
+        # we read the last cached record again, to check that the group
+        # still has the same content (for groups without ID).
+        state, new = self._read(key, startidx=max(n - 1, 0), **kw)
+        if new.structure_key() != cached.structure_key():
+            return state, None
+        # a re-created group has a new ID.
+        if state[0] != entry.state[0] \
+                or new.get('__creation_time_sec__') != cached.get('__creation_time_sec__'):
+            return state, None
+        for k, _ in new.data_items():
+            if new.meta_val('shape', k)[0] < n:
+                return state, None
+        if n > 0:
+            for k, v in new.data_items():
+                if not _same_record(v['values'][0], cached.data_vals(k)[-1]):
+                    return state, None
+                v['values'] = v['values'][1:]
+
+        nnew = new.nrecords()
+        if nnew == 0:
+            return state, cached
+        for k, v in new.data_items():
+            v['values'] = np.concatenate([cached.data_vals(k), v['values']])
+        return state, new
+
+    def _evict(self, keep: Tuple[str, str]) -> None:
+        total = sum(e.nbytes for e in self._entries.values())
+        candidates = sorted(
+            (k for k in self._entries if k != keep),
+            key=lambda k: len(self._subscribers.get(k, ())) > 0)
+        for k in candidates:
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(k).nbytes
+
+
+def _same_record(a: Any, b: Any) -> bool:
+    try:
+        return np.array_equal(a, b, equal_nan=True)
+    except TypeError:
+        return np.array_equal(a, b)
+
+
+def _shallow_copy(data: DataDict) -> DataDict:
+    """Copy of ``data`` that shares the values, but not the field
+    dictionaries and meta data."""
+    ret = DataDict()
+    for k, v in data.items():
+        if isinstance(v, dict):
+            v = dict(v)
+            if 'axes' in v:
+                v['axes'] = list(v['axes'])
+        ret[k] = v
     return ret
 
 
+#: The cache used by the :class:`DDH5Loader` nodes.
+ddh5_cache = DDH5Cache()
+
+
 # Node for monitoring #
 
 class DDH5LoaderWidget(NodeWidget):
@@ -421,7 +808,7 @@ class DDH5LoaderWidget(NodeWidget):
         self.groupinput.textEdited.connect(
             lambda x: self.signalOption('groupname')
         )
-        self.reload.pressed.connect(self.node.update)
+        self.reload.pressed.connect(self.node.reload)
 
 
 class DDH5Loader(Node):
@@ -431,54 +818,123 @@ class DDH5Loader(Node):
     nRetries = 5
     retryDelay = 0.01
 
+    #: if ``True``, load data through :data:`ddh5_cache`, i.e., share loaded
+    #: data with other loaders of the same file, and only read new records.
+    useCache = True
+
     def __init__(self, name: str):
         self._filepath: Optional[str] = None
+        self._dataLimits: Dict[str, Tuple[Any, Any, int]] = {}
+
+        # modification time (ns) and size of the file when last loaded, and
+        # the time of loading.
+        self._changeToken: Optional[Tuple[int, int]] = None
+        self._loadTime = 0.
 
         super().__init__(name)
 
-        self.groupname = 'data'  # type: ignore[misc]
+        self.groupname = 'data'
         self.nLoadedRecords = 0
 
     @property
     def filepath(self) -> Optional[str]:
         return self._filepath
 
-    @filepath.setter  # type: ignore[misc]
+    @filepath.setter
     @updateOption('filepath')
     def filepath(self, val: str) -> None:
+        self._unsubscribe()
         self._filepath = val
+        self.nLoadedRecords = 0
+        self._dataLimits = {}
+        self._changeToken = None
+        self._subscribe()
 
     @property
     def groupname(self) -> str:
         return self._groupname
 
-    @groupname.setter  # type: ignore[misc]
+    @groupname.setter
     @updateOption('groupname')
     def groupname(self, val: str) -> None:
+        self._unsubscribe()
         self._groupname = val
+        self.nLoadedRecords = 0
+        self._dataLimits = {}
+        self._changeToken = None
+        self._subscribe()
+
+    def _subscribe(self) -> None:
+        if self.useCache and self._filepath is not None \
+                and getattr(self, '_groupname', None) is not None:
+            ddh5_cache.subscribe(self, self._filepath, self._groupname)
+
+    def _unsubscribe(self) -> None:
+        if self._filepath is not None \
+                and getattr(self, '_groupname', None) is not None:
+            ddh5_cache.unsubscribe(self, self._filepath, self._groupname)
 
     # Data processing #
 
+    def fileToken(self) -> Tuple[int, int]:
+        """Modification time (in ns) and size of the file; if neither has
+        changed, the data is not loaded again."""
+        assert self._filepath is not None
+        st = os.stat(self._filepath)
+        return st.st_mtime_ns, st.st_size
+
+    def loadData(self) -> DataDict:
+        """Load the data from the file."""
+        assert self._filepath is not None
+        if self.useCache:
+            return ddh5_cache.load(self._filepath,
+                                   groupname=self.groupname,
+                                   n_retries=self.nRetries,
+                                   retry_delay=self.retryDelay)
+        return datadict_from_hdf5(self._filepath,
+                                  groupname=self.groupname,
+                                  n_retries=self.nRetries,
+                                  retry_delay=self.retryDelay)
+
+    def reload(self) -> None:
+        """Load the data, even if the file has not changed."""
+        self._changeToken = None
+        self.update()
+
     def process(self, dataIn: Optional[DataDictBase] = None) -> Optional[Dict[str, Any]]:
         if self._filepath is None or self._groupname is None:
             return None
         if not os.path.exists(self._filepath):
             return None
 
+        # if the file has not changed since we've last loaded it, there's
+        # no need to load and process anything. because of the limited
+        # resolution of the modification time (and because HDF5 allocates
+        # space in advance), a file that was modified right before loading
+        # could change without changing the token; see :class:`DDH5Cache`.
+        loadTime = time.time()
+        token = self.fileToken()
+        if token == self._changeToken \
+                and self._loadTime > token[0] * 1e-9 + DDH5Cache.mtime_resolution:
+            return None
+
         try:
-            data = datadict_from_hdf5(self._filepath,
-                                      groupname=self.groupname,
-                                      n_retries=self.nRetries,
-                                      retry_delay=self.retryDelay)
+            data = self.loadData()
         except OSError:
             # TODO needs logging
             return None
 
+        self._changeToken = token
+        self._loadTime = loadTime
+
         title = f"{self.filepath}"
         data.add_meta('title', title)
         nrecords = data.nrecords()
         assert nrecords is not None
         self.nLoadedRecords = nrecords
+        # data in ddh5 files is only ever appended, so we only need to look
+        # at the new records to keep the limits up to date.
+        self._dataLimits = track_limits(data, self._dataLimits)
 
         if super().process(dataIn=data) is None:
             return None
@@ -512,6 +968,20 @@ class DDH5Writer(object):
     :param groupname: name of the top-level group in the file container. An existing
         group of that name will be deleted.
     :param name: name of this dataset. Used in path/file creation and added as meta data.
+    :param shape: shape of the grid the data is taken on, if known in advance
+        (axes in the order of the dependents, slowest first, data added in
+        that order). Added as meta data (``grid_shape``), such that the data
+        can be gridded without inferring the shape (see
+        :func:`.datadict.declared_shape`).
+    :param async_writes: if ``True``, :meth:`add_data` only puts the data
+        into a queue, and the data is added and written to the file by a
+        background thread. Data that is queued while a write is going on is
+        written together. If the queue is full, :meth:`add_data` waits until
+        there is space. Errors in the background thread are raised by the next
+        call to :meth:`add_data`, or when leaving the context. While the
+        writer is open, :attr:`datadict` must not be accessed.
+    :param queue_size: maximum number of :meth:`add_data` calls that can be
+        queued in ``async_writes`` mode.
     """
 
     # TODO: need an operation mode for not keeping data in memory.
@@ -520,7 +990,10 @@ class DDH5Writer(object):
     def __init__(self, basedir: str,
                  datadict: DataDict,
                  groupname: str = 'data',
-                 name: Optional[str] = None):
+                 name: Optional[str] = None,
+                 shape: Optional[Sequence[int]] = None,
+                 async_writes: bool = False,
+                 queue_size: int = 1000):
         """Constructor for :class:`.DDH5Writer`"""
 
         self.basedir = basedir
@@ -528,12 +1001,20 @@ class DDH5Writer(object):
         self.inserted_rows = 0
         self.name = name
         self.groupname = groupname
+        self.async_writes = async_writes
 
         self.file_base: Optional[str] = None
         self.file_path: Optional[str] = None
         self.file: Optional[h5py.File] = None
 
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        self._error_raised = False
+
         self.datadict.add_meta('dataset.name', name)
+        if shape is not None:
+            self.datadict.add_meta('grid_shape', tuple(int(i) for i in shape))
 
     def __enter__(self) -> "DDH5Writer":
         self.file_base = self.create_file_structure()
@@ -553,6 +1034,13 @@ class DDH5Writer(object):
             assert n_new_records is not None
             self.inserted_rows = n_new_records
 
+        if self.async_writes:
+            self._error = None
+            self._error_raised = False
+            self._thread = threading.Thread(target=self._write_queued,
+                                            name='DDH5Writer', daemon=True)
+            self._thread.start()
+
         return self
 
     def __exit__(self,
@@ -560,9 +1048,19 @@ class DDH5Writer(object):
                  exc_value: Optional[BaseException],
                  exc_traceback: Optional[TracebackType]) -> None:
         assert self.file is not None
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
         add_cur_time_attr(self.file[self.groupname], name='close')
         self.file.close()
 
+        # don't mask an exception that is already on its way.
+        if self._error is not None and not self._error_raised \
+                and exc_type is None:
+            self._error_raised = True
+            raise self._error
+
     def create_file_structure(self) -> str:
         """Determine the filepath and create all subfolders.
 
@@ -598,10 +1096,24 @@ class DDH5Writer(object):
         If some data is scalar and others are not, then the data should be reshaped
         to (1, ) for the scalar data, and (1, ...) for the others; in other words,
         an outer dimension with length 1 is added for all.
+
+        In ``async_writes`` mode, the data is only queued (see
+        :class:`DDH5Writer`).
         """
         assert self.file is not None
+        if self._thread is not None:
+            # once writing has failed, no more data is accepted.
+            if self._error is not None:
+                self._error_raised = True
+                raise self._error
+            self._queue.put(kwargs)
+            return
+
         self.datadict.add_data(**kwargs)
+        self._write()
 
+    def _write(self) -> None:
+        assert self.file is not None
         if self.inserted_rows > 0:
             mode = AppendMode.new
         else:
@@ -615,3 +1127,30 @@ class DDH5Writer(object):
             self.inserted_rows = nrecords
             add_cur_time_attr(self.file, name='last_change')
             add_cur_time_attr(self.file[self.groupname], name='last_change')
+
+    def _write_queued(self) -> None:
+        """Write the data from the queue, until ``None`` is received. This
+        runs in the background thread in ``async_writes`` mode."""
+        done = False
+        while not done:
+            items: List[Optional[Dict[str, Any]]] = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            done = None in items
+
+            # after an error we still empty the queue, so add_data doesn't
+            # block, but don't write anymore.
+            if self._error is not None:
+                continue
+
+            try:
+                for item in items:
+                    if item is not None:
+                        self.datadict.add_data(**item)
+                self._write()
+            except Exception as e:
+                self._error = e
@@ -0,0 +1,205 @@
+"""plottr.data.ddh5_index
+
+A persistent index of the DDH5 files in a folder tree.
+
+For each file, the index stores its modification time and size, and the
+structure of the data in it (groups, fields, axes, shapes, and meta data),
+as returned by :func:`.all_datadicts_from_hdf5` with ``structure_only=True``.
+The index is an SQLite database, so tools like the monitr can list a large
+data folder, and show the contents of files, without a full scan of the folder
+tree and without opening the HDF5 files.
+
+Structures are only read when asked for; they are read again when the
+modification time or size of the file has changed.
+"""
+import os
+import json
+import hashlib
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .datadict import DataDict
+from .datadict_storage import all_datadicts_from_hdf5
+
+__author__ = 'Wolfgang Pfaff'
+__license__ = 'MIT'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL,
+    size INTEGER,
+    creation_time REAL,
+    structure TEXT
+)
+"""
+
+
+def default_index_path(root: str) -> str:
+    """The default location of the index for a folder: in the user's cache
+    directory, with a name derived from the (absolute) folder path."""
+    cache_dir = os.environ.get('XDG_CACHE_HOME',
+                               os.path.join(os.path.expanduser('~'), '.cache'))
+    key = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, 'plottr', f'ddh5_index_{key}.sqlite')
+
+
+def _jsonable(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _jsonable(obj.tolist())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return str(obj)
+
+
+def structure_to_json(groups: Dict[str, DataDict]) -> str:
+    """Serialize the structure of the datadicts in a file (values are dropped;
+    meta data that cannot be represented in JSON is converted to strings)."""
+    ret = {}
+    for grp, data in groups.items():
+        d = {}
+        for k, v in data.items():
+            if isinstance(v, dict):
+                v = {vk: vv for vk, vv in v.items() if vk != 'values'}
+            d[k] = v
+        ret[grp] = _jsonable(d)
+    return json.dumps(ret)
+
+
+def structure_from_json(structure: str) -> Dict[str, DataDict]:
+    """Inverse of :func:`structure_to_json`."""
+    ret = {}
+    for grp, d in json.loads(structure).items():
+        for k, v in d.items():
+            if isinstance(v, dict):
+                v['values'] = np.array([])
+                for mk in ['__shape__', '__limits__']:
+                    if mk in v:
+                        v[mk] = tuple(v[mk])
+        ret[grp] = DataDict(**d)
+    return ret
+
+
+class DDH5Index:
+    """Index of the DDH5 files below a root folder.
+
+    :param root: the root folder. Files are stored relative to it.
+    :param path: path of the index database. Default: see
+        :func:`default_index_path`.
+    """
+
+    def __init__(self, root: str, path: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        if path is None:
+            path = default_index_path(self.root)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=10)
+        with self.conn:
+            self.conn.execute(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _rel(self, filepath: str) -> str:
+        return os.path.relpath(os.path.abspath(filepath), self.root)
+
+    def _abs(self, relpath: str) -> str:
+        return os.path.join(self.root, relpath)
+
+    def files(self) -> List[str]:
+        """All files in the index (absolute paths)."""
+        return [self._abs(r[0]) for r in
+                self.conn.execute("SELECT path FROM files")]
+
+    def add(self, filepaths: Iterable[str]) -> None:
+        """Add files to the index, without reading them."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO files (path) VALUES (?)",
+                [(self._rel(f),) for f in filepaths])
+
+    def remove(self, filepaths: Iterable[str]) -> None:
+        """Remove files from the index."""
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM files WHERE path = ?",
+                [(self._rel(f),) for f in filepaths])
+
+    def sync(self, filepaths: Iterable[str]) -> None:
+        """Make the index contain exactly the given files (keeping what we
+        know about files already in the index)."""
+        filepaths = set(filepaths)
+        indexed = set(self.files())
+        self.remove(indexed - filepaths)
+        self.add(filepaths - indexed)
+
+    def is_current(self, filepath: str) -> bool:
+        """Whether we have the structure of the file, and the file has not
+        changed since it was read."""
+        row = self.conn.execute(
+            "SELECT mtime, size FROM files "
+            "WHERE path = ? AND structure IS NOT NULL",
+            (self._rel(filepath),)).fetchone()
+        if row is None:
+            return False
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return False
+        return (st.st_mtime, st.st_size) == tuple(row)
+
+    def structure(self, filepath: str,
+                  read: bool = True) -> Optional[Dict[str, DataDict]]:
+        """The structure of the data in a file.
+
+        :param filepath: path of the file.
+        :param read: if ``True``, read the file if the index is not current
+            for it, and update the index. Errors from reading are raised.
+        :returns: the datadicts (without values) in the file, by group;
+            ``None`` if not current and ``read`` is ``False``.
+        """
+        if self.is_current(filepath):
+            row = self.conn.execute(
+                "SELECT structure FROM files WHERE path = ?",
+                (self._rel(filepath),)).fetchone()
+            return structure_from_json(row[0])
+        if not read:
+            return None
+
+        st = os.stat(filepath)
+        groups = all_datadicts_from_hdf5(filepath, structure_only=True)
+        # an empty result means the file could not be read (yet).
+        if len(groups) > 0:
+            self.set_structure(filepath, groups, st.st_mtime, st.st_size)
+        return groups
+
+    def set_structure(self, filepath: str, groups: Dict[str, DataDict],
+                      mtime: float, size: int) -> None:
+        """Store the structure of a file, read when it had the given
+        modification time and size."""
+        times = [d.meta_val('creation_time_sec') for d in groups.values()
+                 if d.has_meta('creation_time_sec')]
+        creation_time = float(min(times)) if len(times) > 0 else None
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files "
+                "(path, mtime, size, creation_time, structure) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self._rel(filepath), mtime, size, creation_time,
+                 structure_to_json(groups)))
+
+    def creation_time(self, filepath: str) -> Optional[float]:
+        """Creation time of the (first) group in the file, if known."""
+        row = self.conn.execute(
+            "SELECT creation_time FROM files WHERE path = ?",
+            (self._rel(filepath),)).fetchone()
+        return None if row is None else row[0]
@@ -4,20 +4,25 @@ qcodes_dataset.py
 Dealing with qcodes dataset (the database) data in plottr.
 """
 import os
-from itertools import chain
-from operator import attrgetter
-from typing import Dict, List, Set, Union, TYPE_CHECKING, Any, Tuple, Optional, cast
+import pathlib
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Set, Union, TYPE_CHECKING, Any, Tuple, Optional, cast, \
+    Iterable
 
 from typing_extensions import TypedDict
 
+import numpy as np
 import pandas as pd
 
 from qcodes.dataset.data_set import load_by_id
-from qcodes.dataset.experiment_container import experiments
-from qcodes.dataset.sqlite.database import initialise_or_create_database_at
+from qcodes.dataset.sqlite.database import connect
 
-from .datadict import DataDictBase, DataDict, combine_datadicts
+from .datadict import DataDictBase, DataDict, combine_datadicts, track_limits
 from ..node.node import Node, updateOption
+from ..utils import num
 
 __author__ = 'Wolfgang Pfaff'
 __license__ = 'MIT'
@@ -25,6 +30,8 @@ __license__ = 'MIT'
 if TYPE_CHECKING:
     from qcodes.dataset.data_set import DataSet
     from qcodes import ParamSpec
+    # called ``ConnectionPlus`` in older qcodes versions.
+    from qcodes.dataset.sqlite.connection import AtomicConnection
 
 
 def _get_names_of_standalone_parameters(paramspecs: List['ParamSpec']
@@ -65,6 +72,9 @@ class DataSetInfoDict(TypedDict):
 
 # Tools for extracting information on runs in a database
 
+#: max. number of terms per compound select when querying the database.
+_MAX_COMPOUND_SELECT = 500
+
 
 def get_ds_structure(
         ds: 'DataSet'
@@ -91,9 +101,12 @@ def get_ds_structure(
     in the returned structure.
     """
 
-    structure: DataSetStructureDict = {}
+    return _structure_from_paramspecs(ds.get_parameters())
+
 
-    paramspecs = ds.get_parameters()
+def _structure_from_paramspecs(paramspecs: List['ParamSpec']
+                               ) -> DataSetStructureDict:
+    structure: DataSetStructureDict = {}
 
     standalones = _get_names_of_standalone_parameters(paramspecs)
 
@@ -155,21 +168,78 @@ def get_ds_info(ds: 'DataSet', get_structure: bool = True) -> DataSetInfoDict:
     return data
 
 
+_connections = threading.local()
+
+
+def get_db_connection(path: str) -> 'AtomicConnection':
+    """
+    Get a read-only qcodes connection to the database file at ``path``.
+
+    Connections are opened once and then reused. Because sqlite connections
+    may only be used in the thread that created them, there is one
+    connection per path and thread.
+    """
+    path = os.path.abspath(path)
+    conns = _connections.__dict__.setdefault('conns', {})
+    if path not in conns:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No database at '{path}'.")
+        try:
+            conns[path] = connect(path, read_only=True)
+        except TypeError:
+            # qcodes versions that cannot open read-only connections.
+            conns[path] = connect(path)
+    return conns[path]
+
+
+def close_db_connections() -> None:
+    """Close all connections that the current thread has opened through
+    :func:`get_db_connection`."""
+    conns = _connections.__dict__.pop('conns', {})
+    for conn in conns.values():
+        conn.close()
+
+
 def load_dataset_from(path: str, run_id: int) -> 'DataSet':
     """
     Loads ``DataSet`` with the given ``run_id`` from a database file that
     is located in in the given ``path``.
 
-    Note that after the call to this function, the database location in the
-    qcodes config of the current python process is changed to ``path``.
+    The dataset uses a (shared) read-only connection to the database, see
+    :func:`get_db_connection`; the qcodes config is not modified.
     """
-    initialise_or_create_database_at(path)
-    return load_by_id(run_id=run_id)
+    return load_by_id(run_id=run_id, conn=get_db_connection(path))
+
+
+def _format_timestamp(ts: Optional[float]) -> Tuple[str, str]:
+    """date and time strings from a raw timestamp, as in ``get_ds_info``."""
+    if ts is None:
+        return '', ''
+    formatted = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+    return formatted[:10], formatted[11:]
+
+
+@lru_cache(maxsize=256)
+def _paramspecs_from_run_description(desc: str) -> List['ParamSpec']:
+    """The parameter specs from a serialized run description. Runs in a
+    database usually share few distinct descriptions, so we cache them."""
+    from qcodes.dataset.descriptions.versioning import serialization
+    from qcodes.dataset.descriptions.versioning.converters import new_to_old
+
+    interdeps = serialization.from_json_to_current(desc).interdeps
+    return list(new_to_old(interdeps).paramspecs)
+
+
+def _connect_read_only(path: str) -> sqlite3.Connection:
+    uri = pathlib.Path(os.path.abspath(path)).as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True)
 
 
 def get_runs_from_db(path: str, start: int = 0,
                      stop: Union[None, int] = None,
-                     get_structure: bool = False) -> Dict[int, DataSetInfoDict]:
+                     get_structure: bool = False,
+                     newer_than: Optional[int] = None,
+                     include: Iterable[int] = ()) -> Dict[int, DataSetInfoDict]:
     """
     Get a db ``overview`` dictionary from the db located in ``path``. The
     ``overview`` dictionary maps ``DataSet.run_id``s to dataset information as
@@ -180,31 +250,105 @@ def get_runs_from_db(path: str, start: int = 0,
 
     If `get_structure` is True, include info on the run data structure
     in the return dict.
-    """
-    initialise_or_create_database_at(path)
 
-    datasets = sorted(
-        chain.from_iterable(exp.data_sets() for exp in experiments()),
-        key=attrgetter('run_id')
-    )
+    If `newer_than` is given, only runs with a larger run ID are considered,
+    plus the runs with IDs in `include` (useful for runs that were still
+    incomplete when looked at last). `start` and `stop` then apply to this
+    selection.
 
-    # There is no need for checking whether ``stop`` is ``None`` because if
-    # it is the following is simply equivalent to ``datasets[start:]``
-    datasets = datasets[start:stop]
-
-    overview = {ds.run_id: get_ds_info(ds, get_structure=get_structure)
-                for ds in datasets}
+    The database is opened read-only and queried directly, with a few bulk
+    queries; no ``DataSet`` objects are created, and the qcodes database
+    config is not touched.
+    """
+    where = ''
+    if newer_than is not None:
+        where = f'WHERE runs.run_id > {int(newer_than)}'
+        include_ids = [str(int(i)) for i in include]
+        if len(include_ids) > 0:
+            where += f' OR runs.run_id IN ({", ".join(include_ids)})'
+
+    conn = _connect_read_only(path)
+    try:
+        runs = conn.execute(
+            f"""
+            SELECT runs.run_id, experiments.name, experiments.sample_name,
+                   runs.name, runs.completed_timestamp, runs.run_timestamp,
+                   runs.guid, runs.result_table_name, runs.run_description
+            FROM runs JOIN experiments ON runs.exp_id = experiments.exp_id
+            {where}
+            ORDER BY runs.run_id
+            """
+        ).fetchall()
+        runs = runs[start:stop]
+
+        # sqlite limits the number of terms in a compound select.
+        records: Dict[int, int] = {}
+        for i in range(0, len(runs), _MAX_COMPOUND_SELECT):
+            query = ' UNION ALL '.join(
+                f'SELECT {run[0]}, COUNT(*) FROM "{run[7]}"'
+                for run in runs[i:i + _MAX_COMPOUND_SELECT]
+            )
+            records.update(conn.execute(query).fetchall())
+    finally:
+        conn.close()
+
+    overview = {}
+    for (run_id, exp_name, sample_name, name, completed_ts, run_ts, guid,
+         _, desc) in runs:
+        completed_date, completed_time = _format_timestamp(completed_ts)
+        started_date, started_time = _format_timestamp(run_ts)
+        if get_structure:
+            structure: Optional[DataSetStructureDict] = \
+                _structure_from_paramspecs(
+                    _paramspecs_from_run_description(desc))
+        else:
+            structure = None
+
+        overview[run_id] = DataSetInfoDict(
+            experiment=exp_name,
+            sample=sample_name,
+            name=name,
+            completed_date=completed_date,
+            completed_time=completed_time,
+            started_date=started_date,
+            started_time=started_time,
+            structure=structure,
+            records=records[run_id],
+            guid=guid
+        )
     return overview
 
 
-def get_runs_from_db_as_dataframe(path: str) -> pd.DataFrame:
+def get_runs_from_db_as_dataframe(path: str,
+                                  previous: Optional[pd.DataFrame] = None
+                                  ) -> pd.DataFrame:
     """
     Wrapper around `get_runs_from_db` that returns the overview
     as pandas dataframe.
+
+    :param path: path to the database file.
+    :param previous: an overview previously obtained from the same database.
+        If given, only runs newer than the latest one in ``previous``, and
+        runs that were not completed yet, are read from the database, and
+        merged into a copy of ``previous``. If nothing has changed,
+        ``previous`` itself is returned.
+    :returns: the overview dataframe, indexed by run ID.
     """
-    overview = get_runs_from_db(path)
-    df = pd.DataFrame.from_dict(overview, orient='index')
-    return df
+    if previous is None or previous.empty:
+        overview = get_runs_from_db(path)
+        return pd.DataFrame.from_dict(overview, orient='index')
+
+    incomplete = previous.index[previous['completed_date'] == '']
+    overview = get_runs_from_db(path, newer_than=previous.index.max(),
+                                include=incomplete)
+    if len(overview) == 0:
+        return previous
+    update = pd.DataFrame.from_dict(overview, orient='index')
+    if update.index.isin(previous.index).all() \
+            and previous.loc[update.index].equals(update):
+        return previous
+    df = pd.concat([previous.drop(update.index, errors='ignore'), update])
+    return df.sort_index()
 
 
 # Extracting data
@@ -246,6 +390,53 @@ def ds_to_datadict(ds: 'DataSet') -> DataDictBase:
     return ddict
 
 
+def add_ds_meta(data: DataDictBase, ds: 'DataSet', path: str) -> None:
+    """
+    Add meta information on a qcodes DataSet to data extracted from it:
+    title and info text, GUID, db path and run ID, timestamps, and shape.
+
+    :param data: the data to add the meta information to.
+    :param ds: the dataset.
+    :param path: path of the database the dataset was loaded from.
+    """
+    guid = ds.guid
+    runId = ds.run_id
+    title = f"{os.path.split(path)[-1]} | " \
+            f"run ID: {runId} | GUID: {guid}"
+    info = """Started: {}
+Finished: {}
+GUID: {}
+DB-File [ID]: {} [{}]""".format(ds.run_timestamp(), ds.completed_timestamp(),
+                                guid, path, runId)
+
+    data.add_meta('title', title)
+    data.add_meta('info', info)
+    data.add_meta('qcodes_guid', guid)
+    data.add_meta('qcodes_db', path)
+    data.add_meta('qcodes_runId', runId)
+    data.add_meta('qcodes_completedTS', ds.completed_timestamp())
+    data.add_meta('qcodes_runTS', ds.run_timestamp())
+    data.add_meta('qcodes_shape', getattr(ds.description, "shapes", None))
+
+
+def _shared_axes_layout(ddicts: Dict[str, DataDict],
+                        combined: DataDictBase) -> Optional[Dict[str, List[str]]]:
+    """
+    Check whether combining ``ddicts`` kept all field names, i.e., all axes
+    with the same name could be shared between dependents.
+
+    :returns: the axes of each dependent if that is the case, else ``None``.
+    """
+    fields: Set[str] = set()
+    for name, dd in ddicts.items():
+        if combined.get(name, {}).get('axes') != dd[name]['axes']:
+            return None
+        fields.update(dd.keys())
+    if fields != set(n for n, _ in combined.data_items()):
+        return None
+    return {name: list(dd[name]['axes']) for name, dd in ddicts.items()}
+
+
 ### qcodes dataset loader node
 
 class QCodesDSLoader(Node):
@@ -257,6 +448,18 @@ class QCodesDSLoader(Node):
         self._pathAndId: Tuple[Optional[str], Optional[int]] = (None, None)
         self.nLoadedRecords = 0
         self._dataset: Optional[DataSet] = None
+        self._dataLimits: Dict[str, Tuple[Any, Any, int]] = {}
+
+        # to only append new results on updates: the last data we've
+        # produced, and how many rows we've loaded for each dependent.
+        # the layout (axes of each dependent) is only set if new rows can
+        # simply be appended to all fields.
+        self._data: Optional[DataDictBase] = None
+        self._layout: Optional[Dict[str, List[str]]] = None
+        self._nRows: Dict[str, int] = {}
+        # appended values are kept in buffers with room to grow: buffer, and
+        # number of rows used, for each field.
+        self._buffers: Dict[str, Tuple[np.ndarray, int]] = {}
 
         super().__init__(*arg, **kw)
 
@@ -274,6 +477,11 @@ class QCodesDSLoader(Node):
             self._pathAndId = val
             self.nLoadedRecords = 0
             self._dataset = None
+            self._dataLimits = {}
+            self._data = None
+            self._layout = None
+            self._nRows = {}
+            self._buffers = {}
 
     def process(self, dataIn: Optional[DataDictBase] = None) -> Optional[Dict[str, Any]]:
         if dataIn is not None:
@@ -286,25 +494,89 @@ class QCodesDSLoader(Node):
 
             if self._dataset.number_of_results > self.nLoadedRecords:
 
-                guid = self._dataset.guid
-                title = f"{os.path.split(path)[-1]} | " \
-                        f"run ID: {runId} | GUID: {guid}"
-                info = """Started: {}
-Finished: {}
-GUID: {}
-DB-File [ID]: {} [{}]""".format(self._dataset.run_timestamp(), self._dataset.completed_timestamp(),
-                                guid, path, runId)
-
-                data = ds_to_datadict(self._dataset)
-                data.add_meta('title', title)
-                data.add_meta('info', info)
-                data.add_meta('qcodes_guid', guid)
-                data.add_meta('qcodes_db', path)
-                data.add_meta('qcodes_runId', runId)
-                data.add_meta('qcodes_completedTS', self._dataset.completed_timestamp())
-                data.add_meta('qcodes_runTS', self._dataset.run_timestamp())
                 qcodes_shape = getattr(self._dataset.description, "shapes", None)
-                data.add_meta('qcodes_shape', qcodes_shape)
+                data = None
+                if self._layout is not None and qcodes_shape is None:
+                    data = self._appendNewResults()
+                if data is None:
+                    data = self._loadAllResults()
+
+                add_ds_meta(data, self._dataset, path)
+                self._dataLimits = track_limits(data, self._dataLimits)
                 self.nLoadedRecords = self._dataset.number_of_results
+                self._data = data
                 return dict(dataOut=data)
         return None
+
+    def _loadAllResults(self) -> DataDictBase:
+        assert self._dataset is not None
+        ddicts = ds_to_datadicts(self._dataset)
+        data = combine_datadicts(*ddicts.values())
+        self._layout = _shared_axes_layout(ddicts, data)
+        self._buffers = {}
+        self._nRows = {name: len(dd.data_vals(name))
+                       for name, dd in ddicts.items()}
+        return data
+
+    def _appendNewResults(self) -> Optional[DataDictBase]:
+        """
+        Make new data from the previous one and the results that arrived
+        since, without converting and combining everything again.
+
+        :returns: the new data, or ``None`` if new rows do not agree on the
+                  values of shared axes; then everything needs to be
+                  combined again.
+        """
+        assert self._dataset is not None and self._data is not None
+        assert self._layout is not None
+        pdata = self._dataset.cache.data()
+
+        newRows: Dict[str, np.ndarray] = {}
+        nRows = {}
+        for dep, axes in self._layout.items():
+            nRows[dep] = len(pdata[dep][dep])
+            for name in [dep] + axes:
+                vals = pdata[dep][name][self._nRows[dep]:]
+                if name not in newRows:
+                    newRows[name] = vals
+                elif not num.arrays_equal(newRows[name], vals):
+                    return None
+
+        # like combine_datadicts: only a DataDict if all records are complete.
+        if len(set(nRows.values())) == 1:
+            data: DataDictBase = DataDict()
+        else:
+            data = DataDictBase()
+        for name, field in self._data.data_items():
+            data[name] = {k: v for k, v in field.items() if k != 'values'}
+            data[name]['axes'] = list(field['axes'])
+            data[name]['values'] = self._appendValues(name, field['values'],
+                                                      newRows[name])
+        data.validate()
+        self._nRows = nRows
+        return data
+
+    def _appendValues(self, name: str, old: np.ndarray,
+                      new: np.ndarray) -> np.ndarray:
+        """
+        Append rows to the values of a field. The values are kept in a buffer
+        that grows in steps of doubling size, so appending only copies the
+        new rows (most of the time).
+
+        :returns: the values, as view on the buffer. Rows that have been
+                  returned once are not changed anymore.
+        """
+        if isinstance(old, np.ma.MaskedArray) or isinstance(new, np.ma.MaskedArray):
+            return np.concatenate([old, new])
+
+        n = len(old) + len(new)
+        buf, nused = self._buffers.get(name, (None, 0))
+        dtype = np.result_type(old, new)
+        if buf is None or old.base is not buf or nused != len(old) \
+                or buf.dtype != dtype or buf.shape[1:] != old.shape[1:] \
+                or len(buf) < n:
+            buf = np.empty((max(2 * n, 1024),) + old.shape[1:], dtype=dtype)
+            buf[:len(old)] = old
+        buf[len(old):n] = new
+        self._buffers[name] = (buf, n)
+        return buf[:n]
@@ -0,0 +1,287 @@
+"""plottr.data.storage
+
+Storage backends: a common interface for writing DataDicts to files, and
+reading them back, with different file formats behind it.
+
+Two backends are provided:
+
+- :class:`DDH5Backend`: the DDH5 (HDF5) format of
+  :mod:`plottr.data.datadict_storage`.
+- :class:`RawBackend`: a simple columnar format for streaming data at high
+  rates. A group is a folder with a JSON header (structure and meta data)
+  and one raw binary file per data field, to which records are only ever
+  appended. Appending is a plain write at the end of each file, without any
+  locking or meta data updates; the number of records follows from the file
+  sizes (incomplete records, from an interrupted append, are ignored when
+  reading, and removed before the next append). Data is read through :class:`numpy.memmap`, so reading the tail of
+  the data, or a slice, only touches that part of the files.
+  Only data with a fixed-size dtype (no object arrays) can be stored.
+"""
+import os
+import json
+import shutil
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import h5py
+
+from .datadict import DataDict
+from .datadict_storage import (DATAFILEXT, AppendMode, DDH5Loader,
+                               datadict_from_hdf5, datadict_to_hdf5,
+                               init_file, init_path, write_data_to_file)
+
+__author__ = 'Wolfgang Pfaff'
+__license__ = 'MIT'
+
+RAWEXT = '.ddraw'
+HEADERFILE = 'header.json'
+
+
+class StorageBackend:
+    """Interface of a storage backend.
+
+    Data is stored in groups within a file, like in DDH5. Paths can be given
+    with or without the file extension of the backend.
+    """
+
+    #: file extension of the format
+    extension = ''
+
+    def write(self, data: DataDict, path: str, groupname: str = 'data') -> None:
+        """Write data to a group; an existing group of that name is
+        replaced."""
+        raise NotImplementedError
+
+    def append(self, data: DataDict, path: str, groupname: str = 'data') -> None:
+        """Append all records in ``data`` to a group. The group is created if
+        it does not exist yet."""
+        raise NotImplementedError
+
+    def read(self, path: str, groupname: str = 'data',
+             startidx: Optional[int] = None,
+             stopidx: Optional[int] = None,
+             structure_only: bool = False) -> DataDict:
+        """Read records ``startidx`` to ``stopidx`` (exclusive) from a
+        group."""
+        raise NotImplementedError
+
+    def read_tail(self, path: str, startidx: int,
+                  groupname: str = 'data') -> DataDict:
+        """Read the records from ``startidx`` on, for instance the ones that
+        have been appended since the last read."""
+        return self.read(path, groupname, startidx=startidx)
+
+    def read_structure(self, path: str, groupname: str = 'data') -> DataDict:
+        """Read the structure and meta data of a group, without values."""
+        return self.read(path, groupname, structure_only=True)
+
+    def filepath(self, path: str) -> str:
+        """The path, with the file extension of the backend."""
+        if path[-len(self.extension):] != self.extension:
+            path = path + self.extension
+        return path
+
+
+class DDH5Backend(StorageBackend):
+    """Backend for the DDH5 format (see :mod:`.datadict_storage`)."""
+
+    extension = DATAFILEXT
+
+    def write(self, data: DataDict, path: str, groupname: str = 'data') -> None:
+        datadict_to_hdf5(data, self.filepath(path), groupname=groupname,
+                         append_mode=AppendMode.none)
+
+    def append(self, data: DataDict, path: str, groupname: str = 'data') -> None:
+        filepath = self.filepath(path)
+        init_path(filepath)
+        with h5py.File(filepath, mode='a', libver='latest') as f:
+            if groupname not in f:
+                init_file(f, groupname)
+            write_data_to_file(data, f, groupname, AppendMode.all)
+
+    def read(self, path: str, groupname: str = 'data',
+             startidx: Optional[int] = None,
+             stopidx: Optional[int] = None,
+             structure_only: bool = False) -> DataDict:
+        return datadict_from_hdf5(self.filepath(path), groupname=groupname,
+                                  startidx=startidx, stopidx=stopidx,
+                                  structure_only=structure_only)
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+class RawBackend(StorageBackend):
+    """Backend for the raw columnar format (see :mod:`.storage`).
+
+    Layout of a file: ``<path>.ddraw/<groupname>/header.json``, and
+    ``<path>.ddraw/<groupname>/<field>.bin`` for each data field.
+    """
+
+    extension = RAWEXT
+
+    def groupdir(self, path: str, groupname: str = 'data') -> str:
+        return os.path.join(self.filepath(path), groupname)
+
+    @staticmethod
+    def _field_path(groupdir: str, name: str) -> str:
+        return os.path.join(groupdir, name + '.bin')
+
+    @staticmethod
+    def _read_header(groupdir: str) -> Dict[str, Any]:
+        with open(os.path.join(groupdir, HEADERFILE)) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _values(data: DataDict, name: str,
+                header: Optional[Dict[str, Any]]) -> np.ndarray:
+        vals = np.asarray(data.data_vals(name))
+        if vals.dtype.kind == 'O':
+            raise ValueError(f"Cannot store '{name}': only data with a "
+                             f"fixed-size dtype is supported.")
+        if header is not None:
+            field = header['fields'][name]
+            vals = vals.astype(np.dtype(field['dtype']), copy=False)
+            if list(vals.shape[1:]) != field['shape']:
+                raise ValueError(f"Shape of records of '{name}' does not "
+                                 f"match the stored data.")
+        return np.ascontiguousarray(vals)
+
+    def write(self, data: DataDict, path: str, groupname: str = 'data') -> None:
+        groupdir = self.groupdir(path, groupname)
+        if os.path.exists(groupdir):
+            shutil.rmtree(groupdir)
+        os.makedirs(groupdir)
+
+        header: Dict[str, Any] = dict(
+            meta={k: v for k, v in data.meta_items(clean_keys=False)},
+            fields={})
+        for name, _ in data.data_items():
+            vals = self._values(data, name, None)
+            header['fields'][name] = dict(
+                dtype=vals.dtype.str,
+                shape=list(vals.shape[1:]),
+                axes=data.axes(name),
+                unit=data[name].get('unit', ''),
+                meta={k: v for k, v in data.meta_items(name, clean_keys=False)},
+            )
+            with open(self._field_path(groupdir, name), 'wb') as f:
+                vals.tofile(f)
+
+        # the header is written last; without it, the group does not exist.
+        tmp = os.path.join(groupdir, HEADERFILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(header, f, default=_json_default)
+        os.replace(tmp, os.path.join(groupdir, HEADERFILE))
+
+    def append(self, data: DataDict, path: str, groupname: str = 'data') -> None:
+        groupdir = self.groupdir(path, groupname)
+        if not os.path.exists(os.path.join(groupdir, HEADERFILE)):
+            self.write(data, path, groupname)
+            return
+
+        header = self._read_header(groupdir)
+        if set(header['fields']) != {n for n, _ in data.data_items()}:
+            raise ValueError('Data fields do not match the stored data.')
+        values = {name: self._values(data, name, header)
+                  for name in header['fields']}
+
+        # an earlier append might have been interrupted; drop everything
+        # after the last complete record, so the fields stay aligned.
+        n = self._nrecords(groupdir, header)
+        for name, field in header['fields'].items():
+            fieldpath = self._field_path(groupdir, name)
+            size = n * self._record_size(field)
+            if os.path.getsize(fieldpath) > size:
+                os.truncate(fieldpath, size)
+
+        for name, vals in values.items():
+            with open(self._field_path(groupdir, name), 'ab') as f:
+                vals.tofile(f)
+
+    def nrecords(self, path: str, groupname: str = 'data') -> int:
+        """Number of complete records in a group."""
+        groupdir = self.groupdir(path, groupname)
+        return self._nrecords(groupdir, self._read_header(groupdir))
+
+    @staticmethod
+    def _record_size(field: Dict[str, Any]) -> int:
+        return np.dtype(field['dtype']).itemsize \
+            * int(np.prod(field['shape'], dtype=int))
+
+    def _nrecords(self, groupdir: str, header: Dict[str, Any]) -> int:
+        # while appending, fields (and the last record of a field) might
+        # only be written partially; we only count complete records.
+        ns = []
+        for name, field in header['fields'].items():
+            recsize = self._record_size(field)
+            size = os.path.getsize(self._field_path(groupdir, name))
+            ns.append(size // recsize if recsize > 0 else 0)
+        return min(ns) if len(ns) > 0 else 0
+
+    def read(self, path: str, groupname: str = 'data',
+             startidx: Optional[int] = None,
+             stopidx: Optional[int] = None,
+             structure_only: bool = False) -> DataDict:
+        groupdir = self.groupdir(path, groupname)
+        if not os.path.exists(os.path.join(groupdir, HEADERFILE)):
+            raise ValueError('Group does not exist.')
+
+        header = self._read_header(groupdir)
+        n = self._nrecords(groupdir, header)
+        sl = slice(startidx, stopidx)
+
+        res: Dict[str, Any] = dict(header['meta'])
+        for name, field in header['fields'].items():
+            dtype = np.dtype(field['dtype'])
+            shape: Tuple[int, ...] = (n,) + tuple(field['shape'])
+            if structure_only or n == 0:
+                vals = np.zeros((0,) + shape[1:], dtype=dtype)
+            else:
+                # a plain view on the mapped memory; memmap instances would
+                # be copied by DataDict validation.
+                vals = np.memmap(self._field_path(groupdir, name), dtype=dtype,
+                                 mode='r', shape=shape)[sl].view(np.ndarray)
+            entry = dict(field['meta'])
+            entry.update(values=vals, axes=field['axes'], unit=field['unit'],
+                         __shape__=shape)
+            res[name] = entry
+
+        dd = DataDict(**res)
+        dd.validate()
+        return dd
+
+
+class RawLoader(DDH5Loader):
+    """Loader node for data in the raw columnar format (see
+    :class:`RawBackend`). ``filepath`` is the path of the ``.ddraw``
+    folder."""
+
+    nodeName = 'RawLoader'
+    useCache = False
+
+    def __init__(self, name: str):
+        self.backend = RawBackend()
+        super().__init__(name)
+
+    def fileToken(self) -> Tuple[int, int]:
+        # appending does not change the folder, only the files in it.
+        assert self._filepath is not None
+        groupdir = self.backend.groupdir(self._filepath, self.groupname)
+        mtime, size = 0, 0
+        if not os.path.isdir(groupdir):
+            return mtime, size
+        for e in os.scandir(groupdir):
+            st = e.stat()
+            mtime = max(mtime, st.st_mtime_ns)
+            size += st.st_size
+        return mtime, size
+
+    def loadData(self) -> DataDict:
+        assert self._filepath is not None
+        return self.backend.read(self._filepath, self.groupname)
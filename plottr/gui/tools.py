@@ -2,7 +2,7 @@
 
 helpers and tools for creating GUI elements.
 """
-from typing import List, Dict, Union
+from typing import List, Dict, Union, Optional
 
 from .. import QtWidgets
 
@@ -23,11 +23,41 @@ def widgetDialog(widget: QtWidgets.QWidget, title: str = '',
     return win
 
 
-def dictToTreeWidgetItems(d: Dict[str, Union[dict, str]]) -> List[QtWidgets.QTreeWidgetItem]:
+class LazyTreeWidgetItem(QtWidgets.QTreeWidgetItem):
+    """Tree widget item for a dictionary, whose children are only created
+    once the item is expanded (see :meth:`populate`)."""
+
+    def __init__(self, key: str, d: Dict[str, Union[dict, str]]):
+        super().__init__([str(key), ''])
+        self.pending: Optional[Dict[str, Union[dict, str]]] = d
+        self.setChildIndicatorPolicy(QtWidgets.QTreeWidgetItem.ShowIndicator)
+
+    def populate(self) -> None:
+        """Create the child items, if not done yet."""
+        if self.pending is not None:
+            self.addChildren(dictToTreeWidgetItems(self.pending, lazy=True))
+            self.pending = None
+            self.setChildIndicatorPolicy(
+                QtWidgets.QTreeWidgetItem.DontShowIndicatorWhenChildless)
+
+
+def dictToTreeWidgetItems(d: Dict[str, Union[dict, str]],
+                          lazy: bool = False) -> List[QtWidgets.QTreeWidgetItem]:
+    """Make tree widget items for a (nested) dictionary.
+
+    :param d: the dictionary.
+    :param lazy: if ``True``, items for nested dictionaries are
+        :class:`LazyTreeWidgetItem`, which need to be populated when expanded
+        (by connecting ``itemExpanded`` of the tree widget to
+        :func:`populateTreeWidgetItem`).
+    :returns: the top level items.
+    """
     items = []
     for k, v in d.items():
         if not isinstance(v, dict):
             item = QtWidgets.QTreeWidgetItem([str(k), str(v)])
+        elif lazy:
+            item = LazyTreeWidgetItem(k, v)
         else:
             item = QtWidgets.QTreeWidgetItem([k, ''])
             for child in dictToTreeWidgetItems(v):
@@ -36,5 +66,11 @@ def dictToTreeWidgetItems(d: Dict[str, Union[dict, str]]) -> List[QtWidgets.QTre
     return items
 
 
+def populateTreeWidgetItem(item: QtWidgets.QTreeWidgetItem) -> None:
+    """Create the children of a lazy item; does nothing for other items."""
+    if isinstance(item, LazyTreeWidgetItem):
+        item.populate()
+
+
 def flowchartAutoPlot() -> None:
     pass
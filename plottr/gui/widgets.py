@@ -4,12 +4,15 @@ widgets.py
 Common GUI widgets that are re-used across plottr.
 """
 
-from typing import Union, List, Tuple, Optional, Type, Sequence, Dict, Any
+from typing import Union, List, Tuple, Optional, Type, Sequence, Dict, Any, TYPE_CHECKING
 
-from .tools import dictToTreeWidgetItems
+from .tools import dictToTreeWidgetItems, populateTreeWidgetItem
 from plottr import QtCore, Flowchart, QtWidgets, Signal, Slot
 from plottr.node import Node, linearFlowchart
-from ..plot import PlotNode, PlotWidgetContainer, MPLAutoPlot
+from ..plot import PlotNode, PlotWidgetContainer
+
+if TYPE_CHECKING:
+    from ..plot import MPLAutoPlot
 
 __author__ = 'Wolfgang Pfaff'
 __license__ = 'MIT'
@@ -71,7 +74,9 @@ class PlotWindow(QtWidgets.QMainWindow):
     :meth:`addNodeWidgetFromFlowchart`.
     """
 
-    plotWidgetClass = MPLAutoPlot
+    #: class of the plot widget to create; ``None`` for the matplotlib
+    #: autoplot (imported only when needed).
+    plotWidgetClass: Optional[Type["MPLAutoPlot"]] = None
 
     def __init__(self, parent: Optional[QtWidgets.QMainWindow] = None,
                  fc: Optional[Flowchart] = None, **kw: Any):
@@ -79,7 +84,7 @@ class PlotWindow(QtWidgets.QMainWindow):
 
         self.plot = PlotWidgetContainer(parent=self)
         self.setCentralWidget(self.plot)
-        self.plotWidget: Optional[MPLAutoPlot] = None
+        self.plotWidget: Optional["MPLAutoPlot"] = None
 
         self.nodeToolBar = QtWidgets.QToolBar('Node control', self)
         self.addToolBar(self.nodeToolBar)
@@ -172,7 +177,11 @@ class PlotWindow(QtWidgets.QMainWindow):
                 pn = fc.nodes().get(plotNode, None)
                 if pn is not None and isinstance(pn, PlotNode):
                     pn.setPlotWidgetContainer(self.plot)
-                    self.plotWidget = self.plotWidgetClass(parent=self.plot)
+                    plotWidgetClass = self.plotWidgetClass
+                    if plotWidgetClass is None:
+                        from ..plot import MPLAutoPlot
+                        plotWidgetClass = MPLAutoPlot
+                    self.plotWidget = plotWidgetClass(parent=self.plot)
                     self.plot.setPlotWidget(self.plotWidget)
 
 
@@ -191,6 +200,7 @@ class SnapshotWidget(QtWidgets.QTreeWidget):
 
         self.setHeaderLabels(['Key', 'Value'])
         self.setColumnCount(2)
+        self.itemExpanded.connect(populateTreeWidgetItem)
 
     def loadSnapshot(self, snapshotDict : Optional[dict]) -> None:
         """
@@ -201,7 +211,7 @@ class SnapshotWidget(QtWidgets.QTreeWidget):
         if snapshotDict is None:
             return
 
-        items = dictToTreeWidgetItems(snapshotDict)
+        items = dictToTreeWidgetItems(snapshotDict, lazy=True)
         for item in items:
             self.addTopLevelItem(item)
             item.setExpanded(True)
@@ -151,7 +151,7 @@ class DataSelector(Node):
                 dt = num.largest_numtype(d_data_vals,
                                          include_integers=False)
                 if dt is not None:
-                    ret[d]['values'] = ret[d]['values'].astype(dt)
+                    ret[d]['values'] = ret[d]['values'].astype(dt, copy=False)
                 else:
                     return None
 
@@ -6,7 +6,7 @@ from plottr import Signal, Slot, QtWidgets
 from plottr.node import Node, NodeWidget, updateOption
 from plottr.node.node import updateGuiQuietly, emitGuiUpdate
 from plottr.gui.widgets import FormLayoutWrapper
-from plottr.data.datadict import DataDictBase, MeshgridDataDict
+from plottr.data.datadict import DataDictBase, MeshgridDataDict, meta_name_to_key
 
 
 class DimensionCombo(QtWidgets.QComboBox):
@@ -115,6 +115,8 @@ class SubtractAverage(Node):
                 data_vals = np.asanyarray(data.data_vals(dep))
                 avg = data_vals.mean(axis=axidx, keepdims=True)
                 data[dep]['values'] -= avg
+                # the values have changed, previous limits are not valid.
+                data[dep].pop(meta_name_to_key('limits'), None)
 
         return dict(dataOut=data)
 
@@ -1,12 +1,11 @@
 import sys
 import warnings
-from typing import Dict, Optional
+from typing import Dict, Optional, Callable, Any
 import inspect
 from dataclasses import dataclass
+from functools import lru_cache
 import numbers
 
-import lmfit
-
 from plottr import QtGui, QtCore, Slot, Signal
 from ..fitting_models import fitting_models
 from plottr.icons import paramFixIcon
@@ -28,7 +27,13 @@ def index_model_functions():
     return func_dict
 
 
-MODEL_FUNCS = index_model_functions()
+@lru_cache(maxsize=None)
+def model_functions() -> Dict[str, Dict[str, Callable[..., Any]]]:
+    '''The model funcs, indexed only once they are first needed.
+    '''
+    return index_model_functions()
+
+
 MAX_FLOAT = sys.float_info.max
 
 
@@ -82,7 +87,7 @@ class FittingGui(NodeWidget):
         """
         model_tree = QtGui.QTreeWidget()
         model_tree.setHeaderHidden(True)
-        for func_type, funcs in MODEL_FUNCS.items():
+        for func_type, funcs in model_functions().items():
             model_root = QtGui.QTreeWidgetItem(model_tree, [func_type])
             for func_name, func in funcs.items():
                 model_row = QtGui.QTreeWidgetItem(model_root, [func_name])
@@ -110,7 +115,7 @@ class FittingGui(NodeWidget):
         # flush param table
         self.param_table.setRowCount(0)
         # rebuild param table based on the selected model function
-        func = MODEL_FUNCS[model.parent().text(0)][model.text(0)]
+        func = model_functions()[model.parent().text(0)][model.text(0)]
         # assume the first variable is the independent variable
         params = list(inspect.signature(func).parameters)[1:]
         self.param_table.setRowCount(len(params))
@@ -390,12 +395,13 @@ class FittingNode(Node):
 
         print(self.fitting_options)
         # fitting process
+        import lmfit
         axname = dataIn.axes()[0]
         x = dataIn.data_vals(axname)
         y = dataIn.data_vals(dataIn.dependents()[0])
 
         model_str = self.fitting_options.model.split('.')
-        model_func = MODEL_FUNCS[model_str[0]][model_str[1]]
+        model_func = model_functions()[model_str[0]][model_str[1]]
         fit_params = self.fitting_options.parameters
         p0 = lmfit.Parameters()
         for name, opt in fit_params.items():
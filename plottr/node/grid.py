@@ -359,6 +359,11 @@ class DataGridder(Node):
         self._shape = None
         self._invalid = False
 
+        # grid allocated from the shape in the meta data, with the key of the
+        # data structure it was made for, and the number of records in it.
+        self._preallocated: Optional[
+            Tuple[Any, MeshgridDataDict, int]] = None
+
         super().__init__(name)
 
     # Properties
@@ -415,7 +420,7 @@ class DataGridder(Node):
         """
         return self._grid
 
-    @grid.setter  # type: ignore[misc]
+    @grid.setter
     @updateOption('grid')
     def grid(self, val: Tuple[GridOption, Dict[str, Any]]) -> None:
         """set the grid option. does some elementary type checking, but should
@@ -456,6 +461,7 @@ class DataGridder(Node):
         #   not reflected in the resulting data.
 
         if dataIn is None:
+            self._preallocated = None
             return None
 
         data = super().process(dataIn=dataIn)
@@ -482,9 +488,7 @@ class DataGridder(Node):
                         inner_axis_order=order,
                     )
                 elif method is GridOption.metadataShape:
-                    dout = dd.datadict_to_meshgrid(
-                        data, use_existing_shape=True
-                    )
+                    dout = self._gridFromMetadataShape(data)
             except GriddingError:
                 dout = data.expand()
                 self.logger().info("data could not be gridded. Falling back "
@@ -520,6 +524,31 @@ class DataGridder(Node):
 
         return dict(dataOut=dout)
 
+    def _gridFromMetadataShape(self, data: DataDict) -> MeshgridDataDict:
+        """Grid the data using the shape declared in its meta data.
+
+        If the data is flat, the full grid is allocated once, and the records
+        are placed into it by their index; when the same data grows, only new
+        records are added to the existing grid. That grid is updated in
+        place, so the output is a copy of it.
+        """
+        shape = dd.declared_shape(data)
+        if shape is None or all(
+                data.data_vals(d).shape == shape for d in data.dependents()):
+            self._preallocated = None
+            return dd.datadict_to_meshgrid(data, use_existing_shape=True)
+
+        # data from a different source needs a new grid.
+        title = data.meta_val('title') if data.has_meta('title') else None
+        key = (data.structure_key(), shape, title)
+        grid, nrecords = None, 0
+        if self._preallocated is not None and self._preallocated[0] == key:
+            _, grid, nrecords = self._preallocated
+        grid, nrecords = dd.datadict_to_preallocated_meshgrid(
+            data, shape, grid=grid, nrecords=nrecords)
+        self._preallocated = (key, grid, nrecords)
+        return grid.copy()
+
     # Setup UI
 
     def setupUi(self) -> None:
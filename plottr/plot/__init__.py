@@ -1,2 +1,10 @@
+from typing import TYPE_CHECKING
+
+from ..utils.lazy import lazy_attributes
 from .base import PlotNode, PlotWidgetContainer, makeFlowchartWithPlot
-from .mpl import AutoPlot as MPLAutoPlot
\ No newline at end of file
+
+# matplotlib is only imported once the autoplot is needed.
+if TYPE_CHECKING:
+    from .mpl import AutoPlot as MPLAutoPlot
+else:
+    lazy_attributes(globals(), {'MPLAutoPlot': ('.mpl', 'AutoPlot')})
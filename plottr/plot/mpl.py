@@ -4,6 +4,8 @@ plottr/plot/mpl.py : Tools for plotting with matplotlib.
 
 import logging
 import io
+import threading
+from abc import abstractmethod
 from enum import Enum, unique, auto
 from typing import Dict, List, Tuple, Union, cast, Type, Optional, Any
 from collections import OrderedDict
@@ -11,12 +13,13 @@ from collections import OrderedDict
 # standard scientific computing imports
 import numpy as np
 from matplotlib.image import AxesImage
-from matplotlib import rcParams, cm, colors, pyplot as plt
+from matplotlib import rcParams, rc_context, cm, colors, pyplot as plt
 from matplotlib.axes import Axes
 from matplotlib.backends.backend_qt5agg import (
     FigureCanvasQTAgg as FCanvas,
     NavigationToolbar2QT as NavBar,
 )
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
@@ -147,6 +150,29 @@ def determinePlotDataType(data: Optional[DataDictBase]) -> PlotDataType:
     return PlotDataType.unknown
 
 
+def dataIsComplex(data: Optional[DataDictBase],
+                  dependentName: Optional[str] = None) -> bool:
+    """Determine whether data is complex.
+
+    :param data: data to check.
+    :param dependentName: dependent to check. If ``None``, check all
+                          dependents, and return ``True`` if any of them is
+                          complex.
+    """
+    if data is None:
+        return False
+
+    if dependentName is None:
+        for d in data.dependents():
+            if np.issubsctype(data.data_vals(d), np.complexfloating):
+                return True
+    else:
+        if np.issubsctype(data.data_vals(dependentName), np.complexfloating):
+            return True
+
+    return False
+
+
 # matplotlib tools and settings
 default_prop_cycle = rcParams['axes.prop_cycle']
 default_cmap = cm.get_cmap('magma')
@@ -169,24 +195,30 @@ class SymmetricNorm(colors.Normalize):
         return super().__call__(value, clip)
 
 
+def mplDefaults() -> Dict[str, Any]:
+    """Some reasonable matplotlib defaults for appearance (rc parameters)."""
+    return {
+        'figure.dpi': 300,
+        'figure.figsize': (4.5, 3),
+        'savefig.dpi': 300,
+        'axes.grid': True,
+        'grid.linewidth': 0.5,
+        'grid.linestyle': ':',
+        'font.family': ('Arial', 'Helvetica', 'DejaVu Sans'),
+        'font.size': 6,
+        'lines.markersize': 3,
+        'lines.linestyle': '-',
+        'savefig.transparent': False,
+        'figure.subplot.bottom': 0.15,
+        'figure.subplot.top': 0.85,
+        'figure.subplot.left': 0.15,
+        'figure.subplot.right': 0.9,
+    }
+
+
 def setMplDefaults() -> None:
     """Set some reasonable matplotlib defaults for appearance."""
-
-    rcParams['figure.dpi'] = 300
-    rcParams['figure.figsize'] = (4.5, 3)
-    rcParams['savefig.dpi'] = 300
-    rcParams['axes.grid'] = True
-    rcParams['grid.linewidth'] = 0.5
-    rcParams['grid.linestyle'] = ':'
-    rcParams['font.family'] = 'Arial', 'Helvetica', 'DejaVu Sans'
-    rcParams['font.size'] = 6
-    rcParams['lines.markersize'] = 3
-    rcParams['lines.linestyle'] = '-'
-    rcParams['savefig.transparent'] = False
-    rcParams['figure.subplot.bottom'] = 0.15
-    rcParams['figure.subplot.top'] = 0.85
-    rcParams['figure.subplot.left'] = 0.15
-    rcParams['figure.subplot.right'] = 0.9
+    rcParams.update(mplDefaults())
 
 
 # 2D plots
@@ -344,7 +376,7 @@ def attachColorBar(ax: Axes, im: AxesImage) -> Axes:
     """
     div = make_axes_locatable(ax)
     cax = div.append_axes("right", size="5%", pad=0.05)
-    cb = plt.colorbar(im, cax=cax)
+    cb = ax.figure.colorbar(im, cax=cax)
     return cax
 
 
@@ -403,32 +435,26 @@ def plot1dTrace(ax: Axes, x: np.ndarray, y: np.ndarray,
         ax.legend(loc=1, fontsize='small')
 
 
-class MPLPlot(FCanvas):
+class _FigureTools:
     """
-    This is the basic matplotlib canvas widget we are using for matplotlib
-    plots. This canvas only provides a few convenience tools for automatic
-    sizing and creating subfigures, but is otherwise not very different
-    from the class ``FCanvas`` that comes with matplotlib (and which we inherit).
-    It can be used as any QT widget.
+    Figure management shared by the on-screen canvas (:class:`MPLPlot`) and
+    the offscreen figure (:class:`AggPlot`).
+
+    Classes using this need to provide ``self.fig`` and a ``draw`` method,
+    and call :meth:`_setupFigure` during initialization.
     """
 
-    def __init__(self, parent: Optional[QtWidgets.QWidget] = None, width: float = 4.0,
-                 height: float = 3.0, dpi: int = 150, nrows: int = 1,
-                 ncols: int = 1):
-        """
-        Create the canvas.
+    fig: Figure
 
-        :param parent: the parent widget
-        :param width: canvas width (inches)
-        :param height: canvas height (inches)
-        :param dpi: figure dpi
-        :param nrows: number of subplot rows
-        :param ncols: number of subplot columns
-        """
+    @abstractmethod
+    def draw(self) -> None:
+        """Draw the figure."""
 
-        self.fig = Figure(figsize=(width, height), dpi=dpi)
-        super().__init__(self.fig)
+    def _setDefaults(self) -> None:
+        """Set the matplotlib defaults, before creating new axes."""
+        setMplDefaults()
 
+    def _setupFigure(self, nrows: int, ncols: int) -> None:
         self.axes: List[Axes] = []
         self._tightLayout = False
         self._showInfo = False
@@ -436,7 +462,6 @@ class MPLPlot(FCanvas):
         self._info = ''
 
         self.clearFig(nrows, ncols)
-        self.setParent(parent)
 
     def autosize(self) -> None:
         """
@@ -463,7 +488,8 @@ class MPLPlot(FCanvas):
         :returns: the created axes in the grid
         """
         self.fig.clear()
-        setMplDefaults()
+        self._infoArtist = None
+        self._setDefaults()
 
         self.axes = []
         iax = 1
@@ -484,14 +510,6 @@ class MPLPlot(FCanvas):
         self.autosize()
         return self.axes
 
-    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
-        """
-        Re-implementation of the widget resizeEvent method.
-        Makes sure we resize the plots appropriately.
-        """
-        self.autosize()
-        super().resizeEvent(event)
-
     def setTightLayout(self, tight: bool) -> None:
         """
         Set tight layout mode.
@@ -518,17 +536,6 @@ class MPLPlot(FCanvas):
             )
         self.draw()
 
-    def toClipboard(self) -> None:
-        """
-        Copy the current canvas to the clipboard.
-        """
-        buf = io.BytesIO()
-        self.fig.savefig(buf, dpi=300, facecolor='w', format='png',
-                         transparent=True)
-        QtWidgets.QApplication.clipboard().setImage(
-            QtGui.QImage.fromData(buf.getvalue()))
-        buf.close()
-
     def setFigureTitle(self, title: str) -> None:
         """Add a title to the figure."""
         self.fig.text(0.5, 0.99, title,
@@ -543,6 +550,108 @@ class MPLPlot(FCanvas):
         self.updateInfo()
 
 
+class MPLPlot(_FigureTools, FCanvas):
+    """
+    This is the basic matplotlib canvas widget we are using for matplotlib
+    plots. This canvas only provides a few convenience tools for automatic
+    sizing and creating subfigures, but is otherwise not very different
+    from the class ``FCanvas`` that comes with matplotlib (and which we inherit).
+    It can be used as any QT widget.
+    """
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None, width: float = 4.0,
+                 height: float = 3.0, dpi: int = 150, nrows: int = 1,
+                 ncols: int = 1):
+        """
+        Create the canvas.
+
+        :param parent: the parent widget
+        :param width: canvas width (inches)
+        :param height: canvas height (inches)
+        :param dpi: figure dpi
+        :param nrows: number of subplot rows
+        :param ncols: number of subplot columns
+        """
+
+        self.fig = Figure(figsize=(width, height), dpi=dpi)
+        FCanvas.__init__(self, self.fig)
+
+        self._setupFigure(nrows, ncols)
+        self.setParent(parent)
+
+    def draw(self) -> None:
+        FCanvas.draw(self)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        """
+        Re-implementation of the widget resizeEvent method.
+        Makes sure we resize the plots appropriately.
+        """
+        self.autosize()
+        super().resizeEvent(event)
+
+    def toClipboard(self) -> None:
+        """
+        Copy the current canvas to the clipboard.
+        """
+        buf = io.BytesIO()
+        self.fig.savefig(buf, dpi=300, facecolor='w', format='png',
+                         transparent=True)
+        QtWidgets.QApplication.clipboard().setImage(
+            QtGui.QImage.fromData(buf.getvalue()))
+        buf.close()
+
+
+class AggPlot(_FigureTools):
+    """
+    An offscreen figure, drawn with the Agg backend.
+
+    Provides the same figure tools as :class:`MPLPlot`, but is not a widget
+    and does not need the Qt event loop. The figure can thus be drawn on a
+    worker thread, and only the finished image is handed to the GUI.
+    """
+
+    def __init__(self, width: float = 4.0, height: float = 3.0,
+                 dpi: float = 150, nrows: int = 1, ncols: int = 1):
+        """
+        Create the figure.
+
+        :param width: figure width (inches)
+        :param height: figure height (inches)
+        :param dpi: figure dpi
+        :param nrows: number of subplot rows
+        :param ncols: number of subplot columns
+        """
+        self.fig = Figure(figsize=(width, height), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self._setupFigure(nrows, ncols)
+
+    def draw(self) -> None:
+        self.canvas.draw()
+
+    def _setDefaults(self) -> None:
+        # the global rc parameters are not touched, since this may not run
+        # in the GUI thread; use :func:`matplotlib.rc_context` with
+        # :func:`mplDefaults` around creating and drawing the figure.
+        pass
+
+    def toImage(self) -> QtGui.QImage:
+        """
+        Render the figure into an image.
+
+        QImages (unlike pixmaps) may be created outside the GUI thread.
+
+        :returns: the rendered figure as RGBA image.
+        """
+        self.canvas.draw()
+        width, height = self.canvas.get_width_height()
+        buf = self.canvas.buffer_rgba()
+        img = QtGui.QImage(bytes(buf), width, height,
+                           QtGui.QImage.Format_RGBA8888)
+        # detach from the python buffer
+        return img.copy()
+
+
 # class MPLPlotContainer(QtGui.QWidget):
 #     """
 #     A widget that contains multiple MPL plots (each with their own tools).
@@ -584,18 +693,22 @@ class _MPLPlotWidget(PlotWidget):
             self.plot.setFigureInfo(data.meta_val('info'))
 
     def addMplBarOptions(self) -> None:
-        tlCheck = QtWidgets.QCheckBox('Tight layout')
-        tlCheck.toggled.connect(self.plot.setTightLayout)
+        self.tightLayoutCheck = QtWidgets.QCheckBox('Tight layout')
+        self.tightLayoutCheck.toggled.connect(self.plot.setTightLayout)
 
-        infoCheck = QtWidgets.QCheckBox('Info')
-        infoCheck.toggled.connect(self.plot.setShowInfo)
+        self.infoCheck = QtWidgets.QCheckBox('Info')
+        self.infoCheck.toggled.connect(self.plot.setShowInfo)
 
         self.mplBar.addSeparator()
-        self.mplBar.addWidget(tlCheck)
+        self.mplBar.addWidget(self.tightLayoutCheck)
         self.mplBar.addSeparator()
-        self.mplBar.addWidget(infoCheck)
+        self.mplBar.addWidget(self.infoCheck)
         self.mplBar.addSeparator()
-        self.mplBar.addAction('Copy', self.plot.toClipboard)
+        self.mplBar.addAction('Copy', self.toClipboard)
+
+    def toClipboard(self) -> None:
+        """Copy the current plot to the clipboard."""
+        self.plot.toClipboard()
 
 
 # A toolbar for setting options on the MPL autoplot
@@ -756,8 +869,14 @@ class AutoPlot(_MPLPlotWidget):
     If the input data is complex, the user has the option to plot real/imaginary
     parts, or magnitude and phase. Real/Imaginary are plotted in the same panel,
     whereas magnitude and phase are separated into two panels.
+
+    Optionally, figures can be rendered on a worker thread
+    (see :meth:`setRenderInBackground`).
     """
 
+    #: default for new widgets: whether to render figures on a worker thread.
+    renderInBackground = False
+
     def __init__(self, parent: Optional[QtWidgets.QWidget] = None):
         super().__init__(parent=parent)
 
@@ -768,6 +887,7 @@ class AutoPlot(_MPLPlotWidget):
 
         self.dataType: Optional[Type[DataDictBase]] = None
         self.dataStructure: Optional[DataDictBase] = None
+        self.dataStructureKey: Optional[Tuple[Any, ...]] = None
         self.dataShapes: Optional[Dict[str, Tuple[int, ...]]] = None
         self.dataLimits: Optional[Dict[str, Tuple[float, float]]] = None
 
@@ -784,6 +904,25 @@ class AutoPlot(_MPLPlotWidget):
 
         self.plotOptionsToolBar.setIconSize(QtCore.QSize(32, 32))
 
+        # Rendering in the background: the finished image is shown in place
+        # of the canvas.
+        self._frameRenderer: Optional[_FrameRenderer] = None
+        self._frameId = 0
+        self._shownFrameId = 0
+        self.frameView = _FrameView(self)
+        self.layout().insertWidget(1, self.frameView)
+        self.frameView.resized.connect(self._requestFrame)
+
+        self.backgroundCheck = QtWidgets.QCheckBox('Background rendering')
+        self.backgroundCheck.setChecked(self.renderInBackground)
+        self.backgroundCheck.toggled.connect(self.setRenderInBackground)
+        self.mplBar.addSeparator()
+        self.mplBar.addWidget(self.backgroundCheck)
+        self.tightLayoutCheck.toggled.connect(self._requestFrame)
+        self.infoCheck.toggled.connect(self._requestFrame)
+
+        self.setRenderInBackground(self.renderInBackground)
+
         self.setMinimumSize(640, 480)
 
     def _analyzeData(self, data: Optional[DataDictBase]) -> Dict[str, bool]:
@@ -794,26 +933,34 @@ class AutoPlot(_MPLPlotWidget):
             dataType = None
 
         if data is None:
-            dataStructure = None
+            dataStructureKey = None
             dataShapes = None
             dataLimits = None
         else:
-            dataStructure = data.structure(include_meta=False)
+            # the structure key and shapes are cheap to get; limits are
+            # carried along with the data if a loader tracks them, or
+            # read from the summary stored in a DDH5 file.
+            dataStructureKey = data.structure_key()
             dataShapes = data.shapes()
             dataLimits = {}
             for n in data.axes() + data.dependents():
-                vals = data.data_vals(n)
-                dataLimits[n] = vals.min(), vals.max()
+                dataLimits[n] = data.limits(n)
 
+        typeChanged = dataType != self.dataType
+        structureChanged = typeChanged or \
+            dataStructureKey != self.dataStructureKey
         result = {
-            'dataTypeChanged': dataType != self.dataType,
-            'dataStructureChanged': dataStructure != self.dataStructure,
+            'dataTypeChanged': typeChanged,
+            'dataStructureChanged': structureChanged,
             'dataShapesChanged': dataShapes != self.dataShapes,
             'dataLimitsChanged': dataLimits != self.dataLimits,
         }
 
         self.dataType = dataType
-        self.dataStructure = dataStructure
+        if structureChanged:
+            self.dataStructureKey = dataStructureKey
+            self.dataStructure = None if data is None else \
+                data.structure(include_meta=False)
         self.dataShapes = dataShapes
         self.dataLimits = dataLimits
 
@@ -824,18 +971,7 @@ class AutoPlot(_MPLPlotWidget):
         If dependent_name is not given, check all dependents, return True if any
         of them is complex.
         """
-        if self.data is None:
-            return False
-
-        if dependentName is None:
-            for d in self.data.dependents():
-                if np.issubsctype(self.data.data_vals(d), np.complexfloating):
-                    return True
-        else:
-            if np.issubsctype(self.data.data_vals(dependentName), np.complexfloating):
-                return True
-
-        return False
+        return dataIsComplex(self.data, dependentName)
 
     def setData(self, data: Optional[DataDictBase]) -> None:
         """Analyses data and determines whether/what to plot.
@@ -886,15 +1022,6 @@ class AutoPlot(_MPLPlotWidget):
 
         self._plotData(adjustSize=True)
 
-    def _makeAxes(self, nAxes: int) -> List[Axes]:
-        """Create a grid of axes.
-        We try to keep the grid as square as possible.
-        """
-        nrows = int(nAxes ** .5 + .5)
-        ncols = int(np.ceil(nAxes / nrows))
-        axes = self.plot.clearFig(nrows, ncols, nAxes)
-        return axes
-
     def _plotData(self, adjustSize: bool = False) -> None:
         """Plot the data using previously determined data and plot types."""
 
@@ -910,6 +1037,123 @@ class AutoPlot(_MPLPlotWidget):
         else:
             self.complexRepresentation = self.complexPreference
 
+        if self.renderInBackground:
+            self._requestFrame()
+            return
+
+        assert self.data is not None
+        renderer = AutoPlotRenderer(self.plot, self.data, self.plotType,
+                                    self.complexRepresentation)
+        if not renderer.render():
+            return
+
+        self.setMeta(self.data)
+        if adjustSize:
+            self.plot.autosize()
+        else:
+            self.plot.draw()
+
+        QtCore.QCoreApplication.processEvents()
+
+    # Rendering in the background
+    @Slot(bool)
+    def setRenderInBackground(self, enable: bool) -> None:
+        """Set whether figures are rendered on a worker thread.
+
+        In that mode the figure is drawn with Agg into an image on a worker
+        thread, and only the finished image is shown. This keeps the GUI
+        responsive, but the plot is not interactive (no zooming, panning).
+        If new data arrives before an image is done, the outdated request is
+        dropped.
+
+        :param enable: if ``True``, render in the background.
+        """
+        if enable and self._frameRenderer is None:
+            self._frameRenderer = _FrameRenderer()
+            self._frameRenderer.moveToThread(_getRenderThread())
+            self._frameRenderer.frameReady.connect(self._showFrame)
+            self.destroyed.connect(self._frameRenderer.deleteLater)
+
+        self.renderInBackground = enable
+        self.plot.setVisible(not enable)
+        self.frameView.setVisible(enable)
+
+        if self.data is not None and self.plotType is not PlotType.empty:
+            self._plotData(adjustSize=True)
+
+    def _requestFrame(self) -> None:
+        if not self.renderInBackground or self.data is None:
+            return
+        if self.plotType is PlotType.empty:
+            return
+        assert self._frameRenderer is not None
+
+        self._frameId += 1
+        ratio = self.frameView.devicePixelRatioF()
+        dpi = self.plot.fig.get_dpi()
+        size = self.frameView.size()
+        # the data may be changed in place while the renderer is busy; the
+        # renderer gets a snapshot.
+        self._frameRenderer.request(
+            self._frameId,
+            data=self.data.copy(),
+            plotType=self.plotType,
+            complexRepresentation=self.complexRepresentation,
+            width=max(size.width(), 1) / dpi,
+            height=max(size.height(), 1) / dpi,
+            dpi=dpi * ratio,
+            tightLayout=self.plot._tightLayout,
+            showInfo=self.plot._showInfo,
+        )
+
+    @Slot(int, object)
+    def _showFrame(self, frameId: int, image: QtGui.QImage) -> None:
+        # frames that are older than what we show already are stale.
+        if frameId <= self._shownFrameId:
+            return
+        self._shownFrameId = frameId
+        image.setDevicePixelRatio(self.frameView.devicePixelRatioF())
+        self.frameView.setPixmap(QtGui.QPixmap.fromImage(image))
+
+    def toClipboard(self) -> None:
+        if self.renderInBackground:
+            pixmap = self.frameView.pixmap()
+            if pixmap is not None:
+                QtWidgets.QApplication.clipboard().setPixmap(pixmap)
+        else:
+            super().toClipboard()
+
+
+class AutoPlotRenderer:
+    """Draws data into a figure, following the rules of :class:`AutoPlot`.
+
+    This does not involve any widgets, so it can be used with an
+    :class:`AggPlot` outside the GUI thread.
+    """
+
+    def __init__(self, plot: _FigureTools, data: DataDictBase,
+                 plotType: PlotType,
+                 complexRepresentation: ComplexRepresentation):
+        """Constructor for :class:`AutoPlotRenderer`.
+
+        :param plot: the figure to draw into.
+        :param data: the data to plot.
+        :param plotType: the plot type to use.
+        :param complexRepresentation: how to show complex data.
+        """
+        self.plot = plot
+        self.data = data
+        self.plotType = plotType
+        self.complexRepresentation = complexRepresentation
+
+    def dataIsComplex(self, dependentName: Optional[str] = None) -> bool:
+        return dataIsComplex(self.data, dependentName)
+
+    def render(self) -> bool:
+        """Draw the data.
+
+        :returns: ``False`` if there's no plot routine for the plot type.
+        """
         if self.plotType is PlotType.multitraces:
             logger.debug(f"Plotting lines in a single panel")
             self._plot1dSinglepanel()
@@ -926,15 +1170,18 @@ class AutoPlot(_MPLPlotWidget):
 
         else:
             logger.info(f"No plot routine defined for {self.plotType}")
-            return
-        assert self.data is not None
-        self.setMeta(self.data)
-        if adjustSize:
-            self.plot.autosize()
-        else:
-            self.plot.draw()
+            return False
 
-        QtCore.QCoreApplication.processEvents()
+        return True
+
+    def _makeAxes(self, nAxes: int) -> List[Axes]:
+        """Create a grid of axes.
+        We try to keep the grid as square as possible.
+        """
+        nrows = int(nAxes ** .5 + .5)
+        ncols = int(np.ceil(nAxes / nrows))
+        axes = self.plot.clearFig(nrows, ncols, nAxes)
+        return axes
 
     # Plotting functions
     def _plot1dSinglepanel(self) -> None:
@@ -1101,3 +1348,128 @@ class AutoPlot(_MPLPlotWidget):
                             norm=SymmetricNorm(), cmap=symmetric_cmap
                             )
                 iax += 2
+
+
+def renderAutoPlotImage(data: DataDictBase, plotType: PlotType,
+                        complexRepresentation: ComplexRepresentation,
+                        width: float, height: float, dpi: float,
+                        tightLayout: bool = False,
+                        showInfo: bool = False) -> Optional[QtGui.QImage]:
+    """Render data the way :class:`AutoPlot` does, into an image.
+
+    Safe to call from a worker thread.
+
+    :param data: the data to plot. Must not be changed while rendering; pass
+        a copy of data that is still being updated.
+    :param plotType: the plot type to use.
+    :param complexRepresentation: how to show complex data.
+    :param width: figure width (inches).
+    :param height: figure height (inches).
+    :param dpi: figure dpi.
+    :param tightLayout: whether to use tight layout.
+    :param showInfo: whether to show the info text of the data.
+    :returns: the rendered image; ``None`` if there is nothing to plot.
+    """
+    with rc_context(mplDefaults()):
+        plot = AggPlot(width=width, height=height, dpi=dpi)
+        plot._tightLayout = tightLayout
+        plot._showInfo = showInfo
+        renderer = AutoPlotRenderer(plot, data, plotType, complexRepresentation)
+        if not renderer.render():
+            return None
+
+        if data.has_meta('title'):
+            plot.setFigureTitle(data.meta_val('title'))
+        if data.has_meta('info'):
+            plot.setFigureInfo(data.meta_val('info'))
+        plot.autosize()
+        return plot.toImage()
+
+
+class _FrameView(QtWidgets.QLabel):
+    """Shows rendered figures; notifies about size changes."""
+
+    resized = Signal()
+
+    def __init__(self, parent: Optional[QtWidgets.QWidget] = None):
+        super().__init__(parent)
+        self.setAlignment(QtCore.Qt.AlignCenter)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Ignored,
+                           QtWidgets.QSizePolicy.Ignored)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self.resized.emit()
+
+
+class _FrameRenderer(QtCore.QObject):
+    """Renders AutoPlot images; lives on the render thread.
+
+    Only the most recent request is kept. Requests that are superseded before
+    the renderer gets to them are dropped.
+    """
+
+    #: emitted with the frame id and the rendered image.
+    frameReady = Signal(int, object)
+
+    _renderRequested = Signal()
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[int, Dict[str, Any]]] = None
+        # always queued, so that requests piling up while we're busy can
+        # be collapsed.
+        self._renderRequested.connect(self._renderPending,
+                                      QtCore.Qt.QueuedConnection)
+
+    def request(self, frameId: int, **kw: Any) -> None:
+        """Request rendering a frame. Thread-safe.
+
+        :param frameId: id of the frame, increasing with every request.
+        :param kw: arguments for :func:`renderAutoPlotImage`.
+        """
+        with self._lock:
+            self._pending = (frameId, kw)
+        self._renderRequested.emit()
+
+    @Slot()
+    def _renderPending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+        # already picked up by an earlier call.
+        if pending is None:
+            return
+
+        frameId, kw = pending
+        try:
+            image = renderAutoPlotImage(**kw)
+        except Exception as e:
+            logger.error(f"Could not render frame: {type(e).__name__}: {e}")
+            return
+        if image is not None:
+            self.frameReady.emit(frameId, image)
+
+
+_renderThread: Optional[QtCore.QThread] = None
+
+
+def _stopRenderThread() -> None:
+    global _renderThread
+    if _renderThread is not None:
+        _renderThread.quit()
+        _renderThread.wait()
+        _renderThread = None
+
+
+def _getRenderThread() -> QtCore.QThread:
+    """The thread all background rendering of AutoPlots happens in."""
+    global _renderThread
+    if _renderThread is None:
+        _renderThread = QtCore.QThread()
+        _renderThread.setObjectName('plottr render')
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_stopRenderThread)
+        _renderThread.start()
+    return _renderThread
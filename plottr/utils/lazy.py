@@ -0,0 +1,47 @@
+"""lazy.py
+
+Tools for deferring the import of heavy dependencies until they are used.
+"""
+import sys
+from importlib import import_module
+from typing import Any, Dict, MutableMapping, Tuple
+
+
+def lazy_attributes(module_globals: MutableMapping[str, Any],
+                    attributes: Dict[str, Tuple[str, str]]) -> None:
+    """
+    Provide attributes of a module that are only imported on first access.
+
+    Meant to be called from a package ``__init__``, e.g.::
+
+        lazy_attributes(globals(), {'MPLAutoPlot': ('.mpl', 'AutoPlot')})
+
+    makes ``MPLAutoPlot`` available from the package, but imports the
+    submodule ``mpl`` only once it is used. Relies on module-level
+    ``__getattr__``; on python < 3.7 the attributes are imported right away.
+
+    :param module_globals: ``globals()`` of the module.
+    :param attributes: maps attribute names to (module name, attribute name).
+                       Relative module names are resolved with respect to the
+                       package of the module.
+    """
+    package = module_globals.get('__package__')
+    modname = module_globals.get('__name__')
+
+    def load(name: str) -> Any:
+        source, attr = attributes[name]
+        value = getattr(import_module(source, package), attr)
+        module_globals[name] = value
+        return value
+
+    if sys.version_info < (3, 7):
+        for name in attributes:
+            load(name)
+        return
+
+    def __getattr__(name: str) -> Any:
+        if name in attributes:
+            return load(name)
+        raise AttributeError(f"module {modname!r} has no attribute {name!r}")
+
+    module_globals['__getattr__'] = __getattr__
@@ -3,6 +3,9 @@
 Various utility functions.
 """
 
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple, TypeVar, Optional, Sequence
 
 
@@ -66,3 +69,19 @@ def unwrap_optional(val: Optional[T]) -> T:
     if val is None:
         raise ValueError("Expected a not None value but got a None value.")
     return val
+
+
+def spawn_process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Make a pool of worker processes that start in a fresh interpreter
+    ('spawn'), so they don't inherit any state (Qt, database connections)
+    from the parent.
+
+    Before python 3.7, the start method of a pool cannot be chosen; the pool
+    then uses the default of the platform.
+
+    :param max_workers: number of worker processes. Default: number of CPUs.
+    """
+    if sys.version_info < (3, 7):
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers,
+                               mp_context=multiprocessing.get_context('spawn'))
@@ -2,10 +2,10 @@
 
 Tools for numerical operations.
 """
-from typing import Sequence, Tuple, Union, List, Optional
+import hashlib
+from typing import Sequence, Tuple, Union, List, Optional, Any
 
 import numpy as np
-import pandas as pd
 
 from ..utils.misc import unwrap_optional
 
@@ -25,7 +25,15 @@ def largest_numtype(arr: np.ndarray, include_integers: bool = True) \
                              only integers in the the data.
     :return: type if possible. None if no numeric data in array.
     """
-    types = {type(a) for a in np.array(arr).flatten()}
+    arr = np.asarray(arr)
+    if arr.size == 0:
+        return None
+    # all elements of a non-object array share the type of the dtype; only
+    # for object arrays we need to look at the elements themselves.
+    if arr.dtype.kind != 'O':
+        types = {arr.dtype.type}
+    else:
+        types = set(map(type, arr.ravel()))
     curidx = -1
     if include_integers:
         ok_types = NUMTYPES
@@ -108,6 +116,70 @@ def arrays_equal(a: np.ndarray, b: np.ndarray,
     return np.all(equal | close | invalid)
 
 
+def array_fingerprint(arr: np.ndarray) -> Optional[Tuple[Tuple[int, ...], str, bytes]]:
+    """
+    Get a cheap identifier of the contents of an array: its shape, dtype,
+    and a hash of the raw data.
+
+    Arrays with equal fingerprints have identical contents. The reverse is
+    not necessarily true in the sense of :func:`arrays_equal` (for instance,
+    for values that are only close).
+
+    :param arr: input array
+    :return: the fingerprint, or ``None`` if the raw data does not identify
+             the contents (object and masked arrays).
+    """
+    if isinstance(arr, np.ma.MaskedArray):
+        return None
+    a = np.asarray(arr)
+    if a.dtype.hasobject:
+        return None
+    data = np.ascontiguousarray(a).reshape(-1).data
+    return a.shape, a.dtype.str, hashlib.blake2b(data, digest_size=16).digest()
+
+
+def minmax(arr: np.ndarray) -> Tuple[Any, Any]:
+    """
+    Get minimum and maximum of the valid entries of an array.
+
+    Invalid entries (``None``, ``nan``, and masked entries) are ignored.
+
+    :param arr: input array
+    :return: tuple of min and max. ``(None, None)`` if there are no valid
+             entries, or the entries cannot be compared.
+    """
+    a = np.asanyarray(arr)
+    if isinstance(a, np.ma.MaskedArray):
+        a = a.compressed()
+    a = a.reshape(-1)
+
+    if a.dtype.kind in 'fc':
+        a = a[~np.isnan(a)]
+    elif a.dtype.kind == 'O':
+        a = a[~is_invalid(a)]
+
+    if a.size == 0:
+        return None, None
+    try:
+        return a.min(), a.max()
+    except TypeError:
+        return None, None
+
+
+def merge_limits(*limits: Tuple[Any, Any]) -> Tuple[Any, Any]:
+    """
+    Combine limits as returned by :func:`minmax`.
+
+    :param limits: (min, max) tuples. ``None`` entries are ignored.
+    :return: the overall (min, max).
+    """
+    mins = [lim[0] for lim in limits if lim[0] is not None]
+    maxs = [lim[1] for lim in limits if lim[1] is not None]
+    if len(mins) == 0 or len(maxs) == 0:
+        return None, None
+    return np.min(np.array(mins)), np.max(np.array(maxs))
+
+
 def array1d_to_meshgrid(arr: Union[List, np.ndarray],
                         target_shape: Tuple[int, ...],
                         copy: bool = True) -> np.ndarray:
@@ -393,19 +465,89 @@ def crop2d(x: np.ndarray, y: np.ndarray, *arr: np.ndarray) \
     return tuple(ret)
 
 
+def _interp_nans_along_axis(arr: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Linearly interpolate ``nan`` entries of a 2d float array along an axis.
+
+    Matches the behavior of ``pandas.DataFrame.interpolate(axis=axis)``:
+    gaps between valid entries are filled linearly (w.r.t. the index),
+    trailing ``nan`` are filled with the last valid value, and leading ``nan``
+    are left unchanged.
+
+    The work is done per run of consecutive ``nan``, so besides a few cheap
+    passes over the array, the cost scales with the number of entries to fill.
+    """
+    ret = np.array(arr, dtype=float)
+    invalid = np.isnan(ret)
+    if not invalid.any():
+        return ret
+    n = ret.shape[axis]
+
+    def along(sl: slice) -> Tuple[slice, ...]:
+        return (slice(None), sl) if axis == 1 else (sl, slice(None))
+
+    # first and last index of each run of invalid entries, per line.
+    starts = invalid.copy()
+    starts[along(slice(1, None))] &= ~invalid[along(slice(None, -1))]
+    ends = invalid
+    ends[along(slice(None, -1))] &= ~invalid[along(slice(1, None))]
+
+    runs = []
+    for mask in starts, ends:
+        idx = np.nonzero(mask)
+        line, pos = idx[1 - axis], idx[axis]
+        order = np.lexsort((pos, line))
+        runs.append((line[order], pos[order]))
+    (line, first), (_, last) = runs
+
+    # leading runs (and fully invalid lines) stay invalid.
+    keep = first > 0
+    line, first, last = line[keep], first[keep], last[keep]
+    if line.size == 0:
+        return ret
+
+    # interpolate between the neighboring valid entries; trailing runs
+    # get the last valid value (slope 0).
+    prev = first - 1
+    nxt = np.where(last == n - 1, prev, last + 1)
+    lines = ret if axis == 1 else ret.T
+    fprev = lines[line, prev]
+    gap = nxt > prev
+    slope = np.zeros(line.size)
+    slope[gap] = (lines[line[gap], nxt[gap]] - fprev[gap]) \
+        / (nxt[gap] - prev[gap])
+
+    # expand the runs into the individual entries; offset is the distance
+    # to the previous valid entry.
+    lengths = last - first + 1
+    offset = np.arange(1, lengths.sum() + 1) \
+        - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    vals = np.repeat(slope, lengths) * offset + np.repeat(fprev, lengths)
+    pos = offset + np.repeat(prev, lengths)
+    line = np.repeat(line, lengths)
+    if axis == 1:
+        ret[line, pos] = vals
+    else:
+        ret[pos, line] = vals
+    return ret
+
+
 def interp_meshgrid_2d(xx: np.ndarray,
                        yy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
     Try to find missing vertices in a 2d meshgrid,
     where xx and yy are the x and y coordinates of each point.
-    This is just done by simple linear interpolation (using pandas).
+    This is just done by simple linear interpolation, xx along the second,
+    yy along the first axis.
 
     i.e.:
     if xx = [[0, 0], [1, nan]], yy = [[0, 1], [0, nan]]
     this will return [[0, 0], [1, 1]], [[0, 1], [0, 1]].
     """
-    xx2 = pd.DataFrame(xx).interpolate(axis=1).values
-    yy2 = pd.DataFrame(yy).interpolate(axis=0).values
+    xx = np.ma.filled(np.asanyarray(xx, dtype=float), np.nan)
+    yy = np.ma.filled(np.asanyarray(yy, dtype=float), np.nan)
+    xx2 = _interp_nans_along_axis(xx, 1)
+    yy2 = _interp_nans_along_axis(yy, 0)
     return xx2, yy2
 
 
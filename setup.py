@@ -46,6 +46,8 @@ setup(
             "plottr-monitr = plottr.apps.monitr:script",
             "plottr-inspectr = plottr.apps.inspectr:script",
             "plottr-autoplot-ddh5 = plottr.apps.autoplot:script",
+            "plottr-render = plottr.apps.render:script",
+            "plottr-qcodes-to-ddh5 = plottr.apps.qcodes_to_ddh5:script",
         ],
     }
 )
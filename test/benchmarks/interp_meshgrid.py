@@ -0,0 +1,56 @@
+"""Benchmark for filling missing coordinates in 2d meshgrids.
+
+Compares :func:`plottr.utils.num.interp_meshgrid_2d` with the pandas-based
+gap fill it replaced, on a partially filled grid (like an incomplete live
+2d sweep).
+
+Usage: ``python interp_meshgrid.py [size]``
+"""
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from plottr.utils import num
+
+
+def partial_grid(n: int, fill: float = 0.6):
+    """x/y meshgrid of size n x n, of which only a fraction is measured;
+    the remainder of the last (partial) row and all following rows are nan.
+    Additionally, some random points are missing."""
+    xx, yy = np.meshgrid(np.linspace(0, 1, n), np.linspace(-1, 1, n),
+                         indexing='ij')
+    nvalid = int(fill * n * n)
+    for g in xx, yy:
+        g.reshape(-1)[nvalid:] = np.nan
+    rng = np.random.default_rng(0)
+    holes = rng.integers(0, nvalid, size=n)
+    xx.reshape(-1)[holes] = np.nan
+    yy.reshape(-1)[holes] = np.nan
+    return xx, yy
+
+
+def interp_pandas(xx: np.ndarray, yy: np.ndarray):
+    xx2 = pd.DataFrame(xx).interpolate(axis=1).values
+    yy2 = pd.DataFrame(yy).interpolate(axis=0).values
+    return xx2, yy2
+
+
+def main(n: int = 4000, repeat: int = 3) -> None:
+    xx, yy = partial_grid(n)
+
+    ref = interp_pandas(xx, yy)
+    res = num.interp_meshgrid_2d(xx, yy)
+    for a, b in zip(ref, res):
+        assert np.array_equal(a, b, equal_nan=True)
+
+    print(f'{n} x {n} grid, best of {repeat}:')
+    for name, fun in [('pandas', interp_pandas),
+                      ('numpy', num.interp_meshgrid_2d)]:
+        t = min(timeit.repeat(lambda: fun(xx, yy), number=1, repeat=repeat))
+        print(f'  {name:>8s}: {t * 1e3:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,59 @@
+"""Benchmark for finding the largest numerical type in an array.
+
+Compares :func:`plottr.utils.num.largest_numtype` with the previous
+implementation that collected the types of all elements, on arrays with a
+numerical dtype and on object arrays (e.g., containing ``None``).
+
+Usage: ``python largest_numtype.py [size]``
+"""
+import sys
+import timeit
+from typing import Union
+
+import numpy as np
+
+from plottr.utils import num
+
+
+def largest_numtype_elementwise(arr: np.ndarray, include_integers: bool = True) \
+        -> Union[None, type]:
+    types = {type(a) for a in np.array(arr).flatten()}
+    curidx = -1
+    if include_integers:
+        ok_types = num.NUMTYPES
+    else:
+        ok_types = num.FLOATTYPES
+
+    for t in types:
+        if t in ok_types:
+            idx = ok_types.index(t)
+            if idx > curidx:
+                curidx = idx
+
+    if curidx > -1:
+        return ok_types[curidx]
+    elif not include_integers and len(set(types).intersection(num.INTTYPES)) > 0:
+        return float
+    else:
+        return None
+
+
+def main(n: int = 1_000_000, repeat: int = 3) -> None:
+    floats = np.random.default_rng(0).normal(size=n)
+    objects = floats.astype(object)
+    objects[::10] = None
+
+    print(f'{n} elements, best of {repeat}:')
+    for label, arr in [('float64', floats), ('object', objects)]:
+        for include_integers in True, False:
+            assert largest_numtype_elementwise(arr, include_integers) \
+                == num.largest_numtype(arr, include_integers)
+        for name, fun in [('elements', largest_numtype_elementwise),
+                          ('current', num.largest_numtype)]:
+            t = min(timeit.repeat(lambda: fun(arr, False), number=1,
+                                  repeat=repeat))
+            print(f'  {label:>8s} {name:>9s}: {t * 1e3:10.3f} ms')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,39 @@
+"""Benchmark for listing many files in the monitr.
+
+Times adding (and removing some of) a large number of files, in the usual
+date-based folder structure, to :class:`plottr.apps.ui.monitr.DataFileList`.
+
+Usage: ``python monitr_file_list.py [number of files]``
+"""
+import os
+import sys
+import time
+
+from plottr import QtWidgets
+from plottr.apps.ui.monitr import DataFileList
+
+
+def main(n: int = 100_000, ndays: int = 30) -> None:
+    app = QtWidgets.QApplication([])
+    fileList = DataFileList()
+    fileList.setSortingEnabled(True)
+
+    root = os.path.abspath('/data')
+    files = {os.path.join(root, f'2020-01-{d + 1:02}', f'{i:05}_run', 'data.ddh5')
+             for d in range(ndays) for i in range(n // ndays)}
+    fileList.loadFromList(root, [])
+
+    t0 = time.perf_counter()
+    fileList.updateFiles(files, set(), emitNew=False)
+    t1 = time.perf_counter()
+    print(f'add {len(files)} files: {(t1 - t0) * 1e3:8.1f} ms')
+
+    removed = set(sorted(files)[::10])
+    t0 = time.perf_counter()
+    fileList.updateFiles(set(), removed, emitNew=False)
+    t1 = time.perf_counter()
+    print(f'remove {len(removed)} files: {(t1 - t0) * 1e3:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
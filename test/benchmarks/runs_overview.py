@@ -0,0 +1,68 @@
+"""Benchmark for reading the run overview of a qcodes database.
+
+Compares :func:`plottr.data.qcodes_dataset.get_runs_from_db` with the
+previous implementation that loaded every run as a ``DataSet``.
+
+Usage: ``python runs_overview.py [number of runs]``
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+from itertools import chain
+from operator import attrgetter
+
+import qcodes as qc
+from qcodes.dataset.experiment_container import experiments, \
+    load_or_create_experiment
+from qcodes.dataset.sqlite.database import initialise_or_create_database_at
+
+from plottr.data.qcodes_dataset import get_runs_from_db, get_ds_info
+
+
+def get_runs_from_db_dataset(path, start=0, stop=None, get_structure=False):
+    """The ``DataSet``-based implementation, for reference."""
+    initialise_or_create_database_at(path)
+    datasets = sorted(
+        chain.from_iterable(exp.data_sets() for exp in experiments()),
+        key=attrgetter('run_id')
+    )
+    datasets = datasets[start:stop]
+    return {ds.run_id: get_ds_info(ds, get_structure=get_structure)
+            for ds in datasets}
+
+
+def make_db(path: str, nruns: int) -> None:
+    initialise_or_create_database_at(path)
+    exp = load_or_create_experiment('benchmark', sample_name='none')
+    meas = qc.Measurement(exp=exp)
+    meas.register_custom_parameter('x', unit='V')
+    meas.register_custom_parameter('y', unit='A', setpoints=['x'])
+    for n in range(nruns):
+        with meas.run() as saver:
+            for x in range(n % 10):
+                saver.add_result(('x', x), ('y', x ** 2))
+
+
+def main(nruns: int = 10000) -> None:
+    logging.getLogger('qcodes').setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'benchmark.db')
+        t0 = time.perf_counter()
+        make_db(path, nruns)
+        print(f'created {nruns} runs in {time.perf_counter() - t0:.1f} s')
+
+        for get_structure in False, True:
+            results = []
+            print(f'get_structure={get_structure}:')
+            for name, fun in [('DataSet', get_runs_from_db_dataset),
+                              ('sqlite', get_runs_from_db)]:
+                t0 = time.perf_counter()
+                results.append(fun(path, get_structure=get_structure))
+                print(f'  {name:>8s}: {time.perf_counter() - t0:8.2f} s')
+            assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
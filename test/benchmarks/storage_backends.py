@@ -0,0 +1,67 @@
+"""Benchmark for the storage backends.
+
+Compares :class:`plottr.data.storage.DDH5Backend` and
+:class:`plottr.data.storage.RawBackend` when streaming data: appending many
+small chunks of records, reading the tail after each append (like a live
+plot does), reading a slice, and reading all data.
+
+Usage: ``python storage_backends.py [number of chunks]``
+"""
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+from plottr.data import datadict as dd
+from plottr.data.storage import DDH5Backend, RawBackend
+
+
+def chunk(start: int, nrows: int) -> dd.DataDict:
+    x = np.arange(start, start + nrows, dtype=float)
+    return dd.DataDict(
+        x=dict(values=x),
+        y=dict(values=np.cos(x), axes=['x']),
+        z=dict(values=np.sin(x), axes=['x']),
+    )
+
+
+def main(nchunks: int = 2000, nrows: int = 10) -> None:
+    print(f'{nchunks} chunks of {nrows} records:')
+    for backend in DDH5Backend(), RawBackend():
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'data')
+            chunks = [chunk(i * nrows, nrows) for i in range(nchunks)]
+
+            t0 = time.perf_counter()
+            for c in chunks:
+                backend.append(c, path)
+            t1 = time.perf_counter()
+
+            nread = 0
+            for i in range(0, nchunks, max(nchunks // 100, 1)):
+                backend.append(chunk(nchunks * nrows, nrows), path)
+                nread += 1
+                backend.read_tail(path, (nchunks + i) * nrows)
+            t2 = time.perf_counter()
+
+            part = backend.read(path, startidx=nchunks * nrows // 2,
+                                stopidx=nchunks * nrows // 2 + 1000)
+            t3 = time.perf_counter()
+            data = backend.read(path)
+            # make sure the values are actually read
+            total = sum(float(np.sum(data.data_vals(n))) for n in ['x', 'y', 'z'])
+            t4 = time.perf_counter()
+
+            assert part.nrecords() == 1000
+            assert np.isfinite(total)
+            name = type(backend).__name__
+            print(f'  {name:>11s}: append {(t1 - t0) / nchunks * 1e6:8.1f} us/chunk, '
+                  f'append + tail read {(t2 - t1) / nread * 1e6:8.1f} us, '
+                  f'slice {(t3 - t2) * 1e3:6.2f} ms, '
+                  f'all {(t4 - t3) * 1e3:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,62 @@
+"""Tests for the matplotlib autoplot widget."""
+import numpy as np
+from matplotlib import rc_context, rcParams
+
+from plottr.data import datadict as dd
+from plottr.plot import mpl
+from plottr.utils import testdata
+
+
+def test_agg_plot_image():
+    data = dd.datadict_to_meshgrid(testdata.get_2d_scalar_cos_data(5, 4, 2))
+    with rc_context({'font.size': 20}):
+        img = mpl.renderAutoPlotImage(
+            data, mpl.PlotType.image, mpl.ComplexRepresentation.real,
+            width=4, height=3, dpi=50)
+        # the global settings are not changed.
+        assert rcParams['font.size'] == 20
+    assert (img.width(), img.height()) == (200, 150)
+
+    assert mpl.renderAutoPlotImage(
+        data, mpl.PlotType.empty, mpl.ComplexRepresentation.real,
+        width=4, height=3, dpi=50) is None
+
+
+def test_frame_renderer_drops_stale_requests(qtbot):
+    renderer = mpl._FrameRenderer()
+    data = dd.datadict_to_meshgrid(testdata.get_2d_scalar_cos_data(5, 4, 2))
+    kw = dict(data=data, plotType=mpl.PlotType.image,
+              complexRepresentation=mpl.ComplexRepresentation.real,
+              width=4, height=3, dpi=50)
+
+    frames = []
+    renderer.frameReady.connect(lambda i, img: frames.append(i))
+
+    # renderer lives in this thread; requests are only processed in the
+    # event loop, so only the last one is rendered.
+    for i in range(1, 4):
+        renderer.request(i, **kw)
+    qtbot.waitUntil(lambda: len(frames) > 0)
+    qtbot.wait(50)
+    assert frames == [3]
+
+
+def test_autoplot_background_rendering(qtbot):
+    widget = mpl.AutoPlot()
+    qtbot.addWidget(widget)
+    widget.show()
+
+    data = dd.datadict_to_meshgrid(testdata.get_2d_scalar_cos_data(5, 4, 2))
+    widget.setRenderInBackground(True)
+    for _ in range(3):
+        widget.setData(data)
+
+    qtbot.waitUntil(lambda: widget._shownFrameId == widget._frameId,
+                    timeout=10000)
+    assert widget.frameView.pixmap() is not None
+    assert not widget.plot.isVisible()
+
+    widget.setRenderInBackground(False)
+    assert widget.plot.isVisible()
+    assert len(widget.plot.axes) == 2
+    mpl._stopRenderThread()
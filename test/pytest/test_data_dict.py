@@ -3,7 +3,7 @@ import pytest
 
 from plottr.data.datadict import (
     DataDict, DataDictBase,
-    guess_shape_from_datadict, datadict_to_meshgrid
+    guess_shape_from_datadict, datadict_to_meshgrid, track_limits
 )
 from plottr.utils import num
 
@@ -301,3 +301,40 @@ def test_meshgrid_conversion():
     assert DataDictBase.same_structure(dd, dd2)
     assert num.arrays_equal(dd2.data_vals('a'), np.transpose(aa, (1, 0)))
     assert num.arrays_equal(dd2.data_vals('z'), np.transpose(zz, (1, 0)))
+
+
+def test_structure_key():
+    """Test the lightweight structure representation."""
+    dd = DataDict(
+        x=dict(values=[1, 2, 3], unit='V'),
+        y=dict(values=[1, 4, 9], axes=['x']),
+    )
+    key = dd.structure_key()
+    assert key == dd.copy().structure_key()
+
+    dd.add_data(x=[4], y=[16])
+    assert dd.structure_key() == key
+
+    dd['x']['unit'] = 'mV'
+    assert dd.structure_key() != key
+
+
+def test_track_limits():
+    """Test incremental limit tracking for appended data."""
+    dd = DataDict(
+        x=dict(values=np.array([1., 2., 3.])),
+        y=dict(values=np.array([1., np.nan, 9.]), axes=['x']),
+    )
+    lims = track_limits(dd)
+    assert lims == dict(x=(1., 3., 3), y=(1., 9., 3))
+    assert dd.limits('y') == (1., 9.)
+
+    # only the new records are used to update the limits
+    dd.add_data(x=[-1.], y=[16.])
+    assert dd.limits('x') == (-1., 3.)
+    lims = track_limits(dd, lims)
+    assert lims == dict(x=(-1., 3., 4), y=(1., 16., 4))
+
+    # limits meta does not match the values anymore, needs to be recomputed
+    dd['y']['values'] = dd['y']['values'][:2]
+    assert dd.limits('y') == (1., 1.)
@@ -1,7 +1,7 @@
 import pytest
 import numpy as np
 from plottr.utils.num import arrays_equal
-from plottr.data.datadict import DataDict, DataDictBase
+from plottr.data.datadict import DataDict, DataDictBase, MeshgridDataDict
 from plottr.data.datadict import combine_datadicts
 
 
@@ -308,3 +308,52 @@ def test_combine_ddicts():
                            z=dict(values=z, axes=['x', 'y']),
                            z_0=dict(values=z[::-1], axes=['x', 'y']))
     assert combined_dd == expected_dd
+
+
+def test_combine_many_dependents():
+    """Test combining datadicts that share axes, as from a qcodes run."""
+    x = np.arange(100.)
+    y = np.linspace(0, 1, 100)
+    dicts = []
+    for i in range(20):
+        # the axes are equal, but not always the same objects
+        dd = DataDict(x=dict(values=x if i % 2 else x.copy(), unit='V'),
+                      y=dict(values=y.copy()),
+                      **{f'z{i}': dict(values=x * i, axes=['x', 'y'])})
+        dd.validate()
+        dicts.append(dd)
+    dicts[0].add_meta('info', 'some info')
+
+    combined = combine_datadicts(*dicts)
+    assert isinstance(combined, DataDict)
+    assert combined.axes() == ['x', 'y']
+    assert combined.dependents() == [f'z{i}' for i in range(20)]
+    assert combined.meta_val('info') == 'some info'
+    for i in range(20):
+        assert combined.axes(f'z{i}') == ['x', 'y']
+
+    # the inputs are not modified
+    combined['z1']['axes'].append('foo')
+    combined['x']['unit'] = 'mV'
+    assert dicts[1].axes('z1') == ['x', 'y']
+    assert dicts[0]['x']['unit'] == 'V'
+
+    # values that are only close, or invalid in both, count as equal
+    dd = DataDict(x=dict(values=x + 1e-12),
+                  y=dict(values=np.where(y > 0.5, np.nan, y)),
+                  w=dict(values=x, axes=['x', 'y']))
+    dd.validate()
+    dicts[0]['y']['values'] = dd.data_vals('y').copy()
+    combined = combine_datadicts(dicts[0], dd)
+    assert combined.axes() == ['x', 'y']
+
+
+def test_combine_single_meshgrid():
+    """A single input keeps its type."""
+    x, y = np.meshgrid(np.arange(3.), np.arange(2.), indexing='ij')
+    mesh = MeshgridDataDict(x=dict(values=x), y=dict(values=y),
+                            z=dict(values=x * y, axes=['x', 'y']))
+    mesh.validate()
+    combined = combine_datadicts(mesh)
+    assert type(combined) is MeshgridDataDict
+    assert combined.shape() == (3, 2)
@@ -1,4 +1,6 @@
 """Test for datadict hdf5 serialization"""
+import os
+import time
 
 import numpy as np
 import pytest
@@ -127,3 +129,256 @@ def test_loader_node(qtbot):
     out = fc.outputValues()['dataOut'].copy()
     out.pop('__title__')
     assert _clean_from_file(out) == data
+
+
+def test_loader_node_limits(qtbot, tmp_path):
+    dds.DDH5Loader.useUi = False
+    fn = str(tmp_path / 'limits.ddh5')
+
+    data = dd.DataDict(
+        x=dict(values=np.arange(3.)),
+        y=dict(values=np.arange(3.) ** 2, axes=['x']),
+    )
+    dds.datadict_to_hdf5(data, fn, append_mode=dds.AppendMode.new)
+
+    fc = linearFlowchart(('loader', dds.DDH5Loader))
+    node = fc.nodes()['loader']
+    node.filepath = fn
+    out = fc.outputValues()['dataOut']
+    assert out.limits('x') == (0., 2.)
+    assert out.limits('y') == (0., 4.)
+
+    data.add_data(x=[-1.], y=[10.])
+    dds.datadict_to_hdf5(data, fn, append_mode=dds.AppendMode.new)
+    node.update()
+    out = fc.outputValues()['dataOut']
+    assert node.nLoadedRecords == 4
+    assert out.meta_val('limits', 'x') == (-1., 2., 4)
+    assert out.limits('y') == (0., 10.)
+
+
+def test_loader_skips_unchanged_file(qtbot, tmp_path):
+    dds.DDH5Loader.useUi = False
+    fn = str(tmp_path / 'unchanged.ddh5')
+
+    data = dd.DataDict(
+        x=dict(values=np.arange(3.)),
+        y=dict(values=np.arange(3.) ** 2, axes=['x']),
+    )
+    dds.datadict_to_hdf5(data, fn, append_mode=dds.AppendMode.new)
+    # pretend the file has been written a while ago
+    os.utime(fn, (time.time() - 10, time.time() - 10))
+
+    fc = linearFlowchart(('loader', dds.DDH5Loader))
+    node = fc.nodes()['loader']
+    outputs = []
+    node.sigOutputChanged.connect(lambda n: outputs.append(n.outputValues()['dataOut']))
+
+    node.filepath = fn
+    assert len(outputs) == 1
+    node.update()
+    assert len(outputs) == 1
+    assert fc.outputValues()['dataOut'] is outputs[0]
+
+    # reloading is always possible
+    node.reload()
+    assert len(outputs) == 2
+
+    # and a changed file is loaded again
+    data.add_data(x=[3.], y=[9.])
+    dds.datadict_to_hdf5(data, fn, append_mode=dds.AppendMode.new)
+    node.update()
+    assert len(outputs) == 3
+    assert outputs[-1].nrecords() == 4
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A fresh cache, used by the loaders instead of the global one."""
+    cache = dds.DDH5Cache()
+    monkeypatch.setattr(dds, 'ddh5_cache', cache)
+    return cache
+
+
+def test_loader_cache(qtbot, tmp_path, monkeypatch, cache):
+    monkeypatch.setattr(dds.DDH5Loader, 'useUi', False)
+    fn = str(tmp_path / 'cached.ddh5')
+
+    data = dd.DataDict(
+        x=dict(values=np.arange(3.)),
+        y=dict(values=np.arange(3.) ** 2, axes=['x']),
+    )
+    dds.datadict_to_hdf5(data, fn, append_mode=dds.AppendMode.new)
+
+    fcs = [linearFlowchart(('loader', dds.DDH5Loader)) for _ in range(2)]
+    for fc in fcs:
+        fc.nodes()['loader'].filepath = fn
+    assert cache.n_subscribers(fn) == 2
+
+    # both loaders share the values, but not the meta data
+    out0, out1 = [fc.outputValues()['dataOut'] for fc in fcs]
+    assert out0.data_vals('y') is out1.data_vals('y')
+    out0.add_meta('foo', 'bar', data='y')
+    assert '__foo__' not in out1['y']
+
+    # only the new records (and the last cached one, for checking) are read,
+    # once for all loaders, even though the file was just modified.
+    data.add_data(x=[3.], y=[9.])
+    dds.datadict_to_hdf5(data, fn, append_mode=dds.AppendMode.new)
+    real_load = dds.datadict_from_group
+    startidxs = []
+
+    def load(*args, **kwargs):
+        startidxs.append(kwargs.get('startidx'))
+        return real_load(*args, **kwargs)
+
+    with monkeypatch.context() as m:
+        m.setattr(dds, 'datadict_from_group', load)
+        for fc in fcs:
+            fc.nodes()['loader'].update()
+    assert startidxs == [2]
+    for fc in fcs:
+        assert np.array_equal(fc.outputValues()['dataOut'].data_vals('y'),
+                              data.data_vals('y'))
+
+    # a group that is re-created with the same structure (within the
+    # resolution of the creation time) is loaded fully
+    for values in [np.zeros(5), np.ones(8)]:
+        rewritten = dd.DataDict(x=dict(values=np.arange(values.size)),
+                                y=dict(values=values, axes=['x']))
+        dds.datadict_to_hdf5(rewritten, fn, append_mode=dds.AppendMode.none)
+        loaded = cache.load(fn)
+    assert np.array_equal(loaded.data_vals('y'), np.ones(8))
+
+    # a re-written file is loaded fully
+    data = dd.DataDict(x=dict(values=np.arange(2.)),
+                       z=dict(values=np.arange(2.), axes=['x']))
+    dds.datadict_to_hdf5(data, fn, append_mode=dds.AppendMode.none)
+    fcs[0].nodes()['loader'].update()
+    assert fcs[0].outputValues()['dataOut'].dependents() == ['z']
+
+    # subscriptions end with the loaders
+    del fc, fcs, out0, out1
+    import gc
+    gc.collect()
+    assert cache.n_subscribers(fn) == 0
+
+    monkeypatch.setattr(cache, 'max_bytes', 0)
+    dds.datadict_to_hdf5(data, str(tmp_path / 'other.ddh5'))
+    cache.load(str(tmp_path / 'other.ddh5'))
+    assert cache.nbytes() == 2 * 2 * 8
+
+
+def test_all_datadicts_single_open(tmp_path, monkeypatch):
+    fn = str(tmp_path / 'groups.ddh5')
+    for i, name in enumerate(['a', 'b', 'c']):
+        data = dd.DataDict(
+            x=dict(values=np.arange(3. + i)),
+            y=dict(values=np.arange(3. + i) ** 2, axes=['x']),
+        )
+        dds.datadict_to_hdf5(data, fn, groupname=name,
+                             append_mode=dds.AppendMode.none)
+
+    real_open = dds.h5py.File
+    opened = []
+
+    def counting_open(*args, **kwargs):
+        opened.append(args[0])
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(dds.h5py, 'File', counting_open)
+    groups = dds.all_datadicts_from_hdf5(fn)
+    assert len(opened) == 1
+    some = dds.all_datadicts_from_hdf5(fn, groupnames=['c', 'a'],
+                                       structure_only=True)
+    assert len(opened) == 2
+    monkeypatch.undo()
+
+    assert list(groups.keys()) == ['a', 'b', 'c']
+    for name, data in groups.items():
+        assert data == dds.datadict_from_hdf5(fn, groupname=name)
+    assert list(some.keys()) == ['c', 'a']
+    assert some['c']['x']['__shape__'] == (5,)
+    assert some['c'].data_vals('x').size == 0
+
+    with pytest.raises(ValueError):
+        dds.all_datadicts_from_hdf5(fn, groupnames=['d'])
+
+
+def test_summary_attributes(tmp_path):
+    data = dd.DataDict(
+        x=dict(values=np.array([], dtype=int)),
+        y=dict(values=np.array([]), axes=['x']),
+    )
+    with dds.DDH5Writer(str(tmp_path), data, name='summary') as writer:
+        writer.add_data(x=[3, 1], y=[np.nan, 2.])
+        writer.add_data(x=[7], y=[-1.])
+        writer.add_data(x=[5], y=[np.nan])
+        filepath = writer.file_path
+        ds = writer.file['data']['y']
+        assert ds.attrs['nrecords'] == 4
+        assert ds.attrs['nan_count'] == 2
+        assert list(ds.attrs['limits']) == [-1., 2.]
+        assert list(writer.file['data']['x'].attrs['limits']) == [1, 7]
+
+    loaded = dds.datadict_from_hdf5(filepath)
+    assert loaded.meta_val('summary', 'y') == \
+        dict(nrecords=4, nan_count=2, min=-1., max=2.)
+    assert loaded.limits('x') == (1, 7)
+
+    # the stored limits are used instead of scanning the values
+    loaded['y']['values'] = np.zeros(4)
+    assert loaded.limits('y') == (-1., 2.)
+    assert dd.track_limits(loaded)['y'] == (-1., 2., 4)
+
+    # ... but not for a part of the data
+    part = dds.datadict_from_hdf5(filepath, startidx=2)
+    assert part.limits('y') == (-1., -1.)
+
+    # appending all records, and cutting off records
+    data = dd.DataDict(x=dict(values=np.arange(4)),
+                       y=dict(values=np.arange(4.), axes=['x']))
+    dds.datadict_to_hdf5(data, filepath, append_mode=dds.AppendMode.all)
+    assert dds.datadict_from_hdf5(filepath).meta_val('summary', 'y') == \
+        dict(nrecords=8, nan_count=2, min=-1., max=3.)
+    dds.datadict_to_hdf5(data, filepath, append_mode=dds.AppendMode.new)
+    assert dds.datadict_from_hdf5(filepath).meta_val('summary', 'y') == \
+        dict(nrecords=4, nan_count=2, min=-1., max=2.)
+
+
+def test_async_writer(tmp_path, monkeypatch):
+    real_write = dds.write_data_to_file
+    nwrites = []
+
+    def slow_write(*args, **kwargs):
+        nwrites.append(1)
+        time.sleep(0.01)
+        return real_write(*args, **kwargs)
+
+    monkeypatch.setattr(dds, 'write_data_to_file', slow_write)
+    data = dd.DataDict(x=dict(values=[]), y=dict(values=[], axes=['x']))
+    with dds.DDH5Writer(str(tmp_path), data, name='async',
+                        async_writes=True, queue_size=5) as writer:
+        for i in range(50):
+            writer.add_data(x=[i], y=[i ** 2])
+        filepath = writer.file_path
+
+    # data that queued up while writing is written together
+    assert 0 < len(nwrites) < 50
+    loaded = dds.datadict_from_hdf5(filepath)
+    assert np.array_equal(loaded.data_vals('x'), np.arange(50))
+    assert np.array_equal(loaded.data_vals('y'), np.arange(50) ** 2)
+
+    # errors in the writing thread are raised in the main thread
+    data = dd.DataDict(x=dict(values=[]), y=dict(values=[], axes=['x']))
+    with pytest.raises(KeyError):
+        with dds.DDH5Writer(str(tmp_path), data, name='async',
+                            async_writes=True) as writer:
+            writer.add_data(x=[0], z=[0])
+    with pytest.raises(KeyError):
+        with dds.DDH5Writer(str(tmp_path), data, name='async',
+                            async_writes=True) as writer:
+            writer.add_data(x=[0], z=[0])
+            while writer._error is None:
+                time.sleep(0.01)
+            writer.add_data(x=[1], y=[1])
@@ -110,3 +110,73 @@ def test_set_grid_with_order(qtbot):
     )
 
 
+
+
+def test_grid_from_metadata_shape(qtbot):
+    """Test gridding incomplete data with the shape declared in the meta data."""
+
+    DataGridder.useUi = False
+    DataGridder.uiClass = None
+
+    fc = linearFlowchart(('grid', DataGridder))
+    node = fc.nodes()['grid']
+    node.grid = GridOption.metadataShape, dict()
+
+    x = np.arange(3.0)
+    y = np.arange(4.0)
+    xx, yy = np.meshgrid(x, y, indexing='ij')
+    vv = xx * yy
+    full = DataDict(
+        x=dict(values=xx.flatten()),
+        y=dict(values=yy.flatten()),
+        vals=dict(values=vv.flatten(), axes=['x', 'y']),
+    )
+    full.add_meta('qcodes_shape', '{"vals": [3, 4]}')
+    assert full.validate()
+
+    # half a row is missing; the grid has the full shape anyway.
+    data = DataDict(**{k: dict(v, values=v['values'][:6])
+                       for k, v in full.data_items()})
+    data.add_meta('qcodes_shape', {'vals': (3, 4)})
+    data.add_meta('info', 'running')
+    data.add_meta('limits', (0., 1., 6), data='vals')
+    fc.setInput(dataIn=data)
+    out = fc.outputValues()['dataOut']
+    assert isinstance(out, MeshgridDataDict)
+    assert out.shape() == (3, 4)
+    assert num.arrays_equal(out.data_vals('vals')[0], vv[0])
+    assert num.arrays_equal(out.data_vals('vals')[1, :2], vv[1, :2])
+    assert np.all(np.isnan(out.data_vals('vals')[1, 2:]))
+    assert np.all(np.isnan(out.data_vals('vals')[2]))
+
+    # when more data arrives, the existing grid is filled up (and gets the
+    # current meta data). the output is a copy; earlier outputs don't change.
+    first = out
+    grid = node._preallocated[1].data_vals('vals')
+    full.add_meta('info', 'finished')
+    full.add_meta('limits', (0., 6., 12), data='vals')
+    fc.setInput(dataIn=full)
+    out = fc.outputValues()['dataOut']
+    assert node._preallocated[1].data_vals('vals') is grid
+    assert out.data_vals('vals') is not grid
+    assert num.arrays_equal(out.data_vals('vals'), vv)
+    assert num.arrays_equal(out.data_vals('x'), xx)
+    assert out.meta_val('info') == 'finished'
+    assert out.meta_val('limits', 'vals') == (0., 6., 12)
+    assert np.all(np.isnan(first.data_vals('vals')[2]))
+
+    # different data with the same structure replaces what's in the grid.
+    other = DataDict(**{k: dict(v, values=v['values'][:10] + 100.)
+                        for k, v in full.data_items()})
+    other.add_meta('qcodes_shape', {'vals': (3, 4)})
+    fc.setInput(dataIn=other)
+    out = fc.outputValues()['dataOut']
+    assert node._preallocated[1].data_vals('vals') is not grid
+    assert num.arrays_equal(out.data_vals('vals').flatten()[:10],
+                            vv.flatten()[:10] + 100.)
+    assert np.all(np.isnan(out.data_vals('vals').flatten()[10:]))
+
+    # a grid shape written by the DDH5Writer takes precedence.
+    data.add_meta('grid_shape', np.array([2, 6]))
+    fc.setInput(dataIn=data)
+    assert fc.outputValues()['dataOut'].shape() == (2, 6)
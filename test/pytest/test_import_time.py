@@ -0,0 +1,54 @@
+"""Import-time checks for the plottr entry points.
+
+Each entry point is imported in a fresh interpreter. Heavy backends that an
+entry point does not need must not be imported. (We compare which modules
+are imported rather than import times, which depend too much on the
+machine the tests run on.)
+"""
+import os
+import subprocess
+import sys
+from typing import Set
+
+import pytest
+
+import plottr
+
+# module: modules that must not be imported
+ENTRY_POINTS = {
+    'plottr.apps.monitr': ['qcodes', 'pandas', 'matplotlib', 'lmfit'],
+    'plottr.apps.autoplot': ['qcodes', 'pandas', 'matplotlib', 'lmfit'],
+    'plottr.apps.inspectr': ['matplotlib', 'lmfit'],
+    'plottr.apps.render': ['qcodes', 'pandas', 'lmfit'],
+}
+
+
+def _imported_packages(module: str) -> Set[str]:
+    """top-level packages of all modules imported when importing `module`
+    in a fresh interpreter."""
+    env = os.environ.copy()
+    root = os.path.dirname(plottr.plottrPath)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [root] + [p for p in [env.get('PYTHONPATH')] if p])
+    env['QT_QPA_PLATFORM'] = 'offscreen'
+    proc = subprocess.run(
+        [sys.executable, '-c',
+         f'import sys, {module}; print("\\n".join(sys.modules))'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, env=env,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return {m.split('.')[0] for m in proc.stdout.split()}
+
+
+# lazy module attributes (PEP 562) need python 3.7; before, everything is
+# imported right away.
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='lazy imports need python 3.7')
+@pytest.mark.parametrize('module', list(ENTRY_POINTS))
+def test_entry_point_imports(module):
+    forbidden = ENTRY_POINTS[module]
+    imported = _imported_packages(module)
+    assert module.split('.')[0] in imported
+    assert imported.isdisjoint(forbidden), \
+        f"{module} imports {sorted(imported.intersection(forbidden))}"
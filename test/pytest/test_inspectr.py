@@ -0,0 +1,118 @@
+"""Tests for the widgets of the qcodes inspectr."""
+import pandas as pd
+import qcodes as qc
+from qcodes import load_or_create_experiment, initialise_or_create_database_at
+
+from plottr.apps.inspectr import RunList, RunInfo, LoadRunInfoProcess, \
+    QCodesDBInspector, loadRunInfo
+
+
+def _runs(ids, records=None):
+    ids = list(ids)
+    if records is None:
+        records = [10 * i for i in ids]
+    return pd.DataFrame(
+        dict(experiment='exp', sample='sample', name='run',
+             started_date='2021-01-01', started_time='12:00:00',
+             completed_date='', completed_time='',
+             records=records, guid=[f'guid-{i}' for i in ids]),
+        index=ids)
+
+
+def test_run_list(qtbot):
+    runList = RunList()
+    qtbot.addWidget(runList)
+    model, proxy = runList.runModel, runList.proxyModel
+
+    runList.setRuns(_runs([2, 9, 10]))
+    assert model.rowCount() == 3
+    # newest first, and run IDs are sorted as numbers
+    assert [proxy.index(i, 0).data() for i in range(3)] == ['10', '9', '2']
+
+    selected = []
+    runList.runSelected.connect(selected.append)
+    runList.setCurrentIndex(proxy.index(1, 0))
+    assert selected == [9]
+
+    # new runs and changes are applied in place, the selection is kept.
+    inserted, changed, reset = [], [], []
+    model.rowsInserted.connect(lambda *args: inserted.append(args[1:]))
+    model.dataChanged.connect(lambda tl, br: changed.append(tl.row()))
+    model.modelReset.connect(lambda: reset.append(True))
+    runList.setRuns(_runs([2, 9, 10, 11], records=[20, 90, 101, 0]))
+    assert inserted == [(3, 3)]
+    assert changed == [2]
+    assert reset == []
+    assert proxy.index(0, 0).data() == '11'
+    assert proxy.index(1, 6).data() == '101'
+    assert runList._runId(runList.selectionModel().selectedRows()[0]) == 9
+    assert selected == [9]
+
+    # a different selection replaces everything.
+    runList.setRuns(_runs([1]))
+    assert reset == [True]
+    assert model.rowCount() == 1
+    runList.clear()
+    assert model.rowCount() == 0
+
+
+def _make_db(path, nruns):
+    initialise_or_create_database_at(path)
+    exp = load_or_create_experiment('exp', sample_name='sample')
+    m = qc.Measurement(exp=exp)
+    m.register_custom_parameter('x', unit='V')
+    m.register_custom_parameter('y', setpoints=['x'])
+    for i in range(nruns):
+        with m.run() as datasaver:
+            datasaver.add_result(('x', i), ('y', i))
+    exp.conn.close()
+
+
+def test_load_run_info(qtbot, tmp_path):
+    path = str(tmp_path / 'runs.db')
+    _make_db(path, 3)
+
+    info = loadRunInfo(path, 2)
+    assert info['Data structure']['y'] == dict(unit='', label='', axes=['x'])
+    assert loadRunInfo(path, 2) is info
+
+    # only the latest of several requests is processed.
+    process = LoadRunInfoProcess()
+    loaded = []
+    process.runInfoLoaded.connect(lambda *args: loaded.append(args[:2]))
+    for runId in 1, 2, 3:
+        process.request(path, runId)
+    qtbot.waitUntil(lambda: len(loaded) > 0)
+    qtbot.wait(50)
+    assert loaded == [(path, 3)]
+
+
+def test_inspectr_run_selection(qtbot, tmp_path):
+    path = str(tmp_path / 'runs.db')
+    _make_db(path, 2)
+
+    win = QCodesDBInspector(dbPath=path)
+    qtbot.addWidget(win)
+    qtbot.waitUntil(lambda: win.dbdf is not None)
+
+    infos = []
+    win._sendInfo.connect(infos.append)
+    win.setRunSelection(1)
+    win.setRunSelection(2)
+    qtbot.waitUntil(lambda: len(infos) > 0)
+    qtbot.wait(50)
+    assert infos == [loadRunInfo(path, 2)]
+    win.close()
+
+
+def test_run_info_tree_is_lazy(qtbot):
+    runInfo = RunInfo()
+    qtbot.addWidget(runInfo)
+    runInfo.setInfo({'snapshot': {'station': {'instruments': {'a': {'b': 1}}}}})
+
+    station = runInfo.topLevelItem(0).child(0)
+    assert station.isExpanded()
+    instruments = station.child(0)
+    assert instruments.childCount() == 0
+    instruments.setExpanded(True)
+    assert instruments.child(0).text(0) == 'a'
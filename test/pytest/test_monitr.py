@@ -0,0 +1,218 @@
+"""Tests for the widgets of the monitr."""
+import os
+import shutil
+
+from plottr.data.datadict_storage import datadict_to_hdf5, AppendMode, \
+    all_datadicts_from_hdf5
+from plottr.data.ddh5_index import DDH5Index
+from plottr.apps.ui.monitr import DataFileList, summaryText
+from plottr.apps.monitr import StructurePrefetcher, FolderScanner
+from plottr.utils import testdata
+
+
+def _write(path):
+    datadict_to_hdf5(testdata.get_1d_scalar_cos_data(5, 1), path,
+                     append_mode=AppendMode.none)
+    return path + '.ddh5'
+
+
+def test_file_list_watches_for_changes(qtbot, tmp_path):
+    root = str(tmp_path)
+    old = _write(os.path.join(root, '2020-01-01', 'run_1', 'data'))
+    os.utime(os.path.join(root, '2020-01-01'), (0, 0))
+    os.utime(os.path.join(root, '2020-01-01', 'run_1'), (0, 0))
+
+    fileList = DataFileList()
+    qtbot.addWidget(fileList)
+    fileList.loadFromPath(root)
+    assert fileList.files == {old}
+    assert fileList.findItemByPath(os.path.join(root, '2020-01-01')) is not None
+    # old folders are not watched, only the root
+    assert fileList.watcher.directories() == [root]
+
+    # a new folder with a new file is found without scanning everything
+    with qtbot.waitSignal(fileList.newDataFilesFound, timeout=5000) as blocker:
+        new = _write(os.path.join(root, '2020-01-02', 'run_1', 'data'))
+    assert blocker.args == [[new]]
+    assert fileList.files == {old, new}
+    assert os.path.join(root, '2020-01-02', 'run_1') \
+        in fileList.watcher.directories()
+
+    # and new files in watched folders as well
+    with qtbot.waitSignal(fileList.newDataFilesFound, timeout=5000) as blocker:
+        new2 = _write(os.path.join(root, '2020-01-02', 'run_1', 'data2'))
+    assert blocker.args == [[new2]]
+
+    os.remove(new2)
+    qtbot.waitUntil(lambda: fileList.files == {old, new}, timeout=5000)
+    assert fileList.findItemByPath(new2) is None
+
+    # files in folders that are not watched are found by a full scan
+    old2 = _write(os.path.join(root, '2020-01-01', 'run_1', 'data2'))
+    qtbot.wait(200)
+    assert old2 not in fileList.files
+    with qtbot.waitSignal(fileList.newDataFilesFound, timeout=1000) as blocker:
+        fileList.loadFromPath(root, emitNew=True)
+    assert blocker.args == [[old2]]
+
+
+def test_file_list_folder_rename(qtbot, tmp_path):
+    root = str(tmp_path)
+    old = _write(os.path.join(root, 'a', 'data'))
+    fileList = DataFileList()
+    qtbot.addWidget(fileList)
+    fileList.loadFromPath(root)
+    assert fileList.files == {old}
+
+    # one change that adds a folder, and removes one.
+    os.rename(os.path.join(root, 'a'), os.path.join(root, 'b'))
+    fileList.onDirectoryChanged(root)
+    assert fileList.files == {os.path.join(root, 'b', 'data.ddh5')}
+    assert fileList.findItemByPath(old) is None
+
+
+def test_file_list_items(qtbot):
+    root = os.path.abspath('/data')
+    paths = [os.path.join(root, d, f'run_{i}', 'data.ddh5')
+             for d in ['a', 'b'] for i in range(3)]
+
+    fileList = DataFileList()
+    qtbot.addWidget(fileList)
+    fileList.loadFromList(root, paths)
+    assert fileList.topLevelItemCount() == 2
+
+    # items for folder contents are created only when expanded
+    a = fileList.findItemByPath(os.path.join(root, 'a'))
+    assert a.childCount() == 0
+    assert fileList.findItemByPath(paths[0]) is None
+    a.setExpanded(True)
+    assert a.childCount() == 3
+    run0 = fileList.findItemByPath(os.path.dirname(paths[0]))
+    run0.setExpanded(True)
+    item = fileList.findItemByPath(paths[0])
+    assert fileList.itemPath(item) == paths[0]
+
+    # new files get items in expanded folders only
+    new = [os.path.join(root, 'a', 'run_3', 'data.ddh5'),
+           os.path.join(root, 'a', 'run_0', 'data2.ddh5'),
+           os.path.join(root, 'c', 'run_0', 'data.ddh5')]
+    fileList.updateFiles(set(new), set())
+    assert a.childCount() == 4
+    assert run0.childCount() == 2
+    assert fileList.topLevelItemCount() == 3
+    assert fileList.findItemByPath(os.path.dirname(new[2])) is None
+
+    # empty folders are removed together with the last file in them
+    fileList.updateFiles(set(), {paths[0], new[1]})
+    assert a.childCount() == 3
+    assert fileList.findItemByPath(os.path.dirname(paths[0])) is None
+    fileList.updateFiles(set(), {new[2]})
+    assert fileList.topLevelItemCount() == 2
+    assert fileList.findItemByPath(os.path.join(root, 'c')) is None
+
+    # removed folders need to be populated again
+    fileList.updateFiles({paths[0]}, set())
+    run0 = fileList.findItemByPath(os.path.dirname(paths[0]))
+    assert run0.childCount() == 0
+    run0.setExpanded(True)
+    assert fileList.findItemByPath(paths[0]) is not None
+
+
+def test_ddh5_index(tmp_path):
+    root = str(tmp_path / 'data')
+    f1 = _write(os.path.join(root, 'run_1', 'data'))
+    f2 = _write(os.path.join(root, 'run_2', 'data'))
+    indexPath = str(tmp_path / 'index.sqlite')
+
+    index = DDH5Index(root, indexPath)
+    index.sync([f1, f2])
+    assert sorted(index.files()) == [f1, f2]
+    assert not index.is_current(f1)
+    assert index.structure(f1, read=False) is None
+
+    groups = index.structure(f1)
+    ref = all_datadicts_from_hdf5(f1, structure_only=True)
+    assert index.is_current(f1)
+    assert index.creation_time(f1) == ref['data'].meta_val('creation_time_sec')
+    index.close()
+
+    # a new index object reads everything back, without opening the file
+    index = DDH5Index(root, indexPath)
+    assert index.is_current(f1)
+    groups = index.structure(f1, read=False)
+    assert groups['data'].structure() == ref['data'].structure()
+    assert groups['data'].meta_val('shape', 'x') == (5,)
+    assert groups['data'].dependents() == ref['data'].dependents()
+
+    # changed files are read again
+    datadict_to_hdf5(testdata.get_1d_scalar_cos_data(10, 1), f1)
+    assert not index.is_current(f1)
+    assert index.structure(f1)['data'].meta_val('shape', 'x') == (10,)
+
+    index.sync([f2])
+    assert index.files() == [f2]
+    index.close()
+
+
+def test_structure_prefetcher(qtbot, tmp_path):
+    f = _write(str(tmp_path / 'data'))
+    broken = str(tmp_path / 'broken.ddh5')
+    with open(broken, 'w') as fh:
+        fh.write('not a hdf5 file')
+
+    prefetcher = StructurePrefetcher(nWorkers=2, nRetries=2, retryDelay=0.01)
+    assert prefetcher.cached(f) is None
+
+    with qtbot.waitSignal(prefetcher.structureLoaded, timeout=5000) as blocker:
+        prefetcher.request([f])
+    path, groups, stat = blocker.args
+    assert path == f
+    assert groups['data'].structure() == \
+        all_datadicts_from_hdf5(f, structure_only=True)['data'].structure()
+    assert stat == (os.stat(f).st_mtime, os.stat(f).st_size)
+    assert prefetcher.cached(f) is groups
+    assert not prefetcher.isLoading(f)
+
+    # changed files are not taken from the cache
+    datadict_to_hdf5(testdata.get_1d_scalar_cos_data(10, 1), f)
+    assert prefetcher.cached(f) is None
+
+    with qtbot.waitSignal(prefetcher.structureFailed, timeout=5000) as blocker:
+        prefetcher.request([broken])
+    assert blocker.args[0] == broken
+    prefetcher.shutdown()
+
+
+def test_folder_scanner(qtbot, tmp_path):
+    root = str(tmp_path)
+    f1 = _write(os.path.join(root, 'a', 'run_1', 'data'))
+    f2 = _write(os.path.join(root, 'b', 'run_1', 'data'))
+
+    fileList = DataFileList()
+    qtbot.addWidget(fileList)
+    fileList.loadFromList(root, [])
+    scanner = FolderScanner()
+    scanner.scanned.connect(fileList.applyScan)
+    with qtbot.waitSignal(fileList.filesChanged, timeout=5000) as blocker:
+        scanner.scan(root, fileList.fileExtensions, fileList.activeFolderAge)
+    assert blocker.args == [[f1, f2], []]
+    assert os.path.join(root, 'a', 'run_1') in fileList.watcher.directories()
+
+    # files that are missing in a scan result are only removed if they're
+    # gone (they might have been created after the scan).
+    fileList.applyScan(root, [f1], [])
+    assert fileList.files == {f1, f2}
+
+    # removing a folder removes the files in it
+    shutil.rmtree(os.path.join(root, 'b'))
+    qtbot.waitUntil(lambda: fileList.files == {f1}, timeout=5000)
+    assert fileList.findItemByPath(os.path.join(root, 'b')) is None
+    scanner.shutdown()
+
+
+def test_summary_text():
+    assert summaryText(None) == ''
+    assert summaryText(dict(nrecords=3, nan_count=1, min=-1.5, max=2)) == \
+        '3 records, -1.5 to 2, 1 NaN'
+    assert summaryText(dict(nrecords=3, nan_count=0, min=None, max=None)) == \
+        '3 records'
@@ -150,3 +150,81 @@ def test_cropping2d():
     assert num.arrays_equal(x, arr[:2, :2])
     assert num.arrays_equal(y, arr.T[:2, :2])
     assert num.arrays_equal(z, data[:2, :2])
+
+
+def test_minmax():
+    """Test getting limits of arrays with invalid entries."""
+    a = np.array([np.nan, 3., -1., 2.])
+    assert num.minmax(a) == (-1., 3.)
+
+    a = np.array([None, 3, 5], dtype=object)
+    assert num.minmax(a) == (3, 5)
+
+    a = np.ma.masked_array([1., 10., 2.], mask=[False, True, False])
+    assert num.minmax(a) == (1., 2.)
+
+    assert num.minmax(np.array([np.nan, np.nan])) == (None, None)
+    assert num.minmax(np.array([])) == (None, None)
+
+    assert num.merge_limits((0, 2), (None, None), (-1, 1)) == (-1, 2)
+    assert num.merge_limits((None, None)) == (None, None)
+
+
+def test_largest_numtype():
+    """Test finding the largest numerical type, from dtype and elements."""
+    assert num.largest_numtype(np.arange(3)) == np.int64
+    assert num.largest_numtype(np.arange(3), include_integers=False) is float
+    assert num.largest_numtype(np.arange(3.).astype(np.float32)) == np.float32
+    assert num.largest_numtype(np.arange(3.) * 1j) == np.complex128
+    assert num.largest_numtype(np.array(['a', 'b'])) is None
+    assert num.largest_numtype(np.array([])) is None
+
+    arr = np.array([1, None, 2.5, 'a'], dtype=object)
+    assert num.largest_numtype(arr) is float
+    arr[2] = 2
+    assert num.largest_numtype(arr) is int
+    assert num.largest_numtype(arr, include_integers=False) is float
+    arr[1] = 1j
+    assert num.largest_numtype(arr, include_integers=False) is complex
+
+
+def test_array_fingerprint():
+    """Test that fingerprints identify array contents"""
+    a = np.arange(6.).reshape(2, 3)
+    assert num.array_fingerprint(a) == num.array_fingerprint(a.copy())
+    assert num.array_fingerprint(a.T) == num.array_fingerprint(a.T.copy())
+    assert num.array_fingerprint(a) != num.array_fingerprint(a.reshape(3, 2))
+    assert num.array_fingerprint(a) != num.array_fingerprint(a.astype(int))
+    b = a.copy()
+    b[1, 2] = 0
+    assert num.array_fingerprint(a) != num.array_fingerprint(b)
+
+    assert num.array_fingerprint(a.astype(object)) is None
+    assert num.array_fingerprint(np.ma.masked_array(a)) is None
+
+
+def test_interp_meshgrid_2d():
+    """Test filling of missing coordinates in 2d meshgrids."""
+    xx = np.array([[0, 0], [1, np.nan]])
+    yy = np.array([[0, 1], [0, np.nan]])
+    xx2, yy2 = num.interp_meshgrid_2d(xx, yy)
+    assert np.array_equal(xx2, np.array([[0., 0.], [1., 1.]]))
+    assert np.array_equal(yy2, np.array([[0., 1.], [0., 1.]]))
+
+    # gaps are interpolated, trailing values continued, leading left alone.
+    nan = np.nan
+    xx = np.array([[nan, 1., nan, nan, 4., nan],
+                   [nan, nan, nan, nan, nan, nan],
+                   [0., 1., 2., 3., 4., 5.]])
+    xx2, yy2 = num.interp_meshgrid_2d(xx, xx.T)
+    expected = np.array([[nan, 1., 2., 3., 4., 4.],
+                         [nan, nan, nan, nan, nan, nan],
+                         [0., 1., 2., 3., 4., 5.]])
+    assert np.array_equal(xx2, expected, equal_nan=True)
+    assert np.array_equal(yy2, expected.T, equal_nan=True)
+    assert np.isnan(xx[0, 2])
+
+    # masked entries are treated as missing.
+    xx = np.ma.masked_array([[0., 5., 2.]], mask=[[False, True, False]])
+    xx2, _ = num.interp_meshgrid_2d(xx, np.zeros((1, 3)))
+    assert np.array_equal(xx2, np.array([[0., 1., 2.]]))
@@ -1,3 +1,5 @@
+import threading
+
 import numpy as np
 import pytest
 from packaging import version
@@ -6,13 +8,17 @@ import qcodes as qc
 from qcodes import load_or_create_experiment, initialise_or_create_database_at
 
 from plottr.data.datadict import DataDict
-from plottr.utils import testdata
+from plottr.utils import testdata, num
 from plottr.node.tools import linearFlowchart
 from plottr.data.qcodes_dataset import (
     QCodesDSLoader,
     get_ds_structure,
     get_ds_info,
     get_runs_from_db,
+    get_runs_from_db_as_dataframe,
+    get_db_connection,
+    close_db_connections,
+    load_dataset_from,
     ds_to_datadict)
 
 
@@ -255,6 +261,38 @@ def test_get_runs_from_db(database_with_three_datasets):
     # Finally, assert WITH STRUCTURE
     assert overview_with_structure == expected_overview_with_structure
 
+    # only a subset of the runs
+    overview = get_runs_from_db(db_path, start=1, stop=2)
+    assert overview == {datasets[1].run_id: expected_overview[datasets[1].run_id]}
+
+
+def test_get_runs_from_db_incrementally(empty_db_path):
+    exp = load_or_create_experiment('incremental', sample_name='no sample')
+    m = qc.Measurement(exp=exp)
+    m.register_custom_parameter('x')
+    m.register_custom_parameter('y', setpoints=['x'])
+
+    with m.run() as datasaver:
+        datasaver.add_result(('x', 0.), ('y', 0.))
+
+    # a run that is still ongoing when we first look at the db
+    with m.run() as datasaver:
+        datasaver.add_result(('x', 0.), ('y', 0.))
+        datasaver.flush_data_to_database()
+        df = get_runs_from_db_as_dataframe(empty_db_path)
+        assert df.loc[2, 'completed_date'] == ''
+        assert get_runs_from_db_as_dataframe(empty_db_path, df) is df
+        datasaver.add_result(('x', 1.), ('y', 1.))
+
+    with m.run() as datasaver:
+        datasaver.add_result(('x', 0.), ('y', 0.))
+
+    df = get_runs_from_db_as_dataframe(empty_db_path, df)
+    expected = get_runs_from_db_as_dataframe(empty_db_path)
+    assert df.equals(expected)
+    assert df.loc[2, 'records'] == 2
+    assert list(df.index) == [1, 2, 3]
+
 
 def test_update_qcloader(qtbot, empty_db_path):
     db_path = empty_db_path
@@ -311,3 +349,117 @@ def test_update_qcloader(qtbot, empty_db_path):
     #         break
     #     check()
     # check()
+
+
+def test_qcloader_appends_new_results(qtbot, empty_db_path):
+    exp = load_or_create_experiment('appending', sample_name='no sample')
+    m = qc.Measurement(exp=exp)
+    m.register_custom_parameter('x')
+    m.register_custom_parameter('y', setpoints=['x'])
+    m.register_custom_parameter('z', setpoints=['x'])
+
+    fc = linearFlowchart(('loader', QCodesDSLoader))
+    loader = fc.nodes()['loader']
+
+    def check():
+        loader.update()
+        data = fc.output()['dataOut']
+        expected = ds_to_datadict(ds)
+        assert type(data) == type(expected)
+        assert data.structure(include_meta=False) == \
+            expected.structure(include_meta=False)
+        for name, _ in expected.data_items():
+            assert num.arrays_equal(data.data_vals(name),
+                                    expected.data_vals(name))
+        return data
+
+    with m.run() as datasaver:
+        ds = datasaver.dataset
+        loader.pathAndId = empty_db_path, ds.captured_run_id
+
+        outputs = []
+        for i in range(3):
+            datasaver.add_result(('x', i), ('y', i), ('z', -i))
+            datasaver.flush_data_to_database()
+            outputs.append(check())
+        assert loader._layout == {'y': ['x'], 'z': ['x']}
+        # appended values share a buffer; earlier outputs don't change.
+        assert outputs[2].data_vals('y').base is outputs[1].data_vals('y').base
+        assert num.arrays_equal(outputs[1].data_vals('y'), np.arange(2))
+
+        # y and z are not measured together anymore, so their x values
+        # diverge, and cannot be shared.
+        datasaver.add_result(('x', 3), ('y', 3))
+        datasaver.flush_data_to_database()
+        data = check()
+        assert loader._layout is None
+        assert set(data.axes()) == {'x', 'x_0'}
+
+        datasaver.add_result(('x', 3), ('z', -3))
+        datasaver.flush_data_to_database()
+        check()
+        assert loader._layout is not None
+
+
+def test_load_dataset_from_reuses_connections(tmp_path):
+    paths = [str(tmp_path / f'db_{i}.db') for i in range(2)]
+    guids = []
+    for i, path in enumerate(paths):
+        initialise_or_create_database_at(path)
+        exp = load_or_create_experiment(f'exp_{i}', sample_name='no sample')
+        m = qc.Measurement(exp=exp)
+        m.register_custom_parameter('x')
+        with m.run() as datasaver:
+            datasaver.add_result(('x', i))
+        guids.append(datasaver.dataset.guid)
+        exp.conn.close()
+    config_db = qc.config['core']['db_location']
+
+    # loading from different files does not change the qcodes config
+    for _ in range(2):
+        for path, guid in zip(paths, guids):
+            assert load_dataset_from(path, 1).guid == guid
+    assert qc.config['core']['db_location'] == config_db
+
+    conn = get_db_connection(paths[0])
+    assert get_db_connection(paths[0]) is conn
+    assert load_dataset_from(paths[0], 1).conn is conn
+
+    # connections are per thread
+    other = []
+    t = threading.Thread(target=lambda: other.append(get_db_connection(paths[0])))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+    close_db_connections()
+    assert get_db_connection(paths[0]) is not conn
+    close_db_connections()
+
+    with pytest.raises(FileNotFoundError):
+        get_db_connection(str(tmp_path / 'missing.db'))
+
+
+def test_qcloader_limits_known_shape(qtbot, empty_db_path):
+    exp = load_or_create_experiment('known_shape', sample_name='no sample')
+    m = qc.Measurement(exp=exp)
+    m.register_custom_parameter('x')
+    m.register_custom_parameter('y', setpoints=['x'])
+    m.set_shapes({'y': (10,)})
+
+    fc = linearFlowchart(('loader', QCodesDSLoader))
+    loader = fc.nodes()['loader']
+
+    # the data is pre-allocated with nan's, so the number of values does not
+    # change while the run is going on; the limits need to follow anyway.
+    with m.run() as datasaver:
+        ds = datasaver.dataset
+        loader.pathAndId = empty_db_path, ds.captured_run_id
+        for i in range(10):
+            datasaver.add_result(('x', i), ('y', 2. * i))
+            datasaver.flush_data_to_database()
+            loader.update()
+            data = fc.output()['dataOut']
+            assert data.data_vals('y').size == 10
+            assert data.limits('x') == (0, i)
+            assert data.limits('y') == (0., 2. * i)
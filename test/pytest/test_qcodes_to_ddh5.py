@@ -0,0 +1,68 @@
+"""Tests for the conversion of qcodes runs to DDH5."""
+import json
+import os
+
+import numpy as np
+import qcodes as qc
+from qcodes import load_or_create_experiment, initialise_or_create_database_at
+
+from plottr.data import datadict_storage as dds
+from plottr.data.qcodes_dataset import load_dataset_from, ds_to_datadict
+from plottr.apps import qcodes_to_ddh5 as conv
+
+
+def test_convert_runs(tmp_path):
+    dbPath = str(tmp_path / 'runs.db')
+    outputDir = str(tmp_path / 'ddh5')
+    initialise_or_create_database_at(dbPath)
+    exp = load_or_create_experiment('exp', sample_name='sample')
+
+    m = qc.Measurement(exp=exp)
+    m.register_custom_parameter('x', unit='V')
+    m.register_custom_parameter('y', setpoints=['x'])
+    with m.run() as datasaver:
+        for x in range(5):
+            datasaver.add_result(('x', x), ('y', x ** 2))
+
+    m = qc.Measurement(exp=exp, name='shaped')
+    m.register_custom_parameter('x')
+    m.register_custom_parameter('z', setpoints=['x'])
+    m.set_shapes({'z': (3,)})
+    with m.run() as datasaver:
+        for x in range(3):
+            datasaver.add_result(('x', x), ('z', -x))
+
+    # an incomplete run is not converted.
+    m.run().__enter__()
+
+    results = conv.convertRuns(dbPath, outputDir, nWorkers=2)
+    assert [results[i]['status'] for i in (1, 2, 3)] == \
+        ['converted', 'converted', 'incomplete']
+
+    for runId in 1, 2:
+        path = results[runId]['path']
+        assert os.path.exists(path)
+        data = dds.datadict_from_hdf5(path)
+        expected = ds_to_datadict(load_dataset_from(dbPath, runId))
+        for name, _ in expected.data_items():
+            assert np.array_equal(data.data_vals(name),
+                                  expected.data_vals(name))
+        ds = load_dataset_from(dbPath, runId)
+        assert data.meta_val('qcodes_guid') == ds.guid
+        assert data.meta_val('qcodes_completedTS') == ds.completed_timestamp()
+    # no temporary files are left over.
+    files = [os.path.join(d, f) for d, _, fs in os.walk(outputDir) for f in fs]
+    assert sorted(files) == sorted(results[i]['path'] for i in (1, 2))
+    assert not dds.datadict_from_hdf5(results[1]['path']).has_meta('qcodes_shape')
+    assert json.loads(dds.datadict_from_hdf5(results[2]['path'])
+                      .meta_val('qcodes_shape')) == {'z': [3]}
+
+    # converting again skips what is there already.
+    results = conv.convertRuns(dbPath, outputDir, runIds=[1, 2, 4])
+    assert [results[i]['status'] for i in (1, 2, 4)] == \
+        ['skipped', 'skipped', 'error']
+    assert conv.convertedGuid(results[1]['path']) == \
+        load_dataset_from(dbPath, 1).guid
+
+    results = conv.convertRuns(dbPath, outputDir, runIds=[1], overwrite=True)
+    assert results[1]['status'] == 'converted'
@@ -0,0 +1,63 @@
+"""Tests for headless rendering of autoplot figures."""
+import os
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from plottr.data import datadict as dd
+from plottr.data import datadict_storage as dds
+from plottr.apps import render
+from plottr.utils import testdata
+
+
+def test_render_data_into_figure():
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    assert not render.renderData(fig, None)
+
+    data = dd.datadict_to_meshgrid(testdata.get_2d_scalar_cos_data(5, 4, 2))
+    assert render.renderData(fig, data)
+    # two panels plus two color bars
+    assert len(fig.axes) == 4
+
+
+def test_parse_run_ids():
+    assert render.parseRunIds('1-3,7, 9-10') == [1, 2, 3, 7, 9, 10]
+    assert render.parseRunIds('') == []
+
+
+def test_render_batch_and_resume(tmp_path):
+    datadir = tmp_path / 'data'
+    outdir = str(tmp_path / 'figures')
+    os.makedirs(datadir)
+
+    data2d = testdata.get_2d_scalar_cos_data(5, 4)
+    dds.datadict_to_hdf5(data2d, str(datadir / 'two_d'),
+                         append_mode=dds.AppendMode.none)
+    data1d = testdata.get_1d_scalar_cos_data(10, 2)
+    dds.datadict_to_hdf5(data1d, str(datadir / 'one_d'),
+                         append_mode=dds.AppendMode.none)
+
+    jobs = render.ddh5Jobs([str(datadir)])
+    assert len(jobs) == 2
+
+    manifest = render.renderBatch(jobs, outdir, nWorkers=2)
+    assert len(manifest) == 2
+    for job in jobs:
+        entry = manifest[render.jobKey(job)]
+        assert entry['status'] == 'ok', entry['error']
+        assert len(entry['outputs']) == 1
+        assert os.path.exists(entry['outputs'][0])
+
+    # nothing changed, nothing should be rendered again.
+    times = {k: v['time'] for k, v in manifest.items()}
+    manifest = render.renderBatch(jobs, outdir, nWorkers=2)
+    assert {k: v['time'] for k, v in manifest.items()} == times
+    assert render.isUpToDate(jobs[0], manifest[render.jobKey(jobs[0])])
+
+    # a changed file needs to be rendered again.
+    data1d.add_data(x=[11.], data_1=[0.], data_2=[1.])
+    dds.datadict_to_hdf5(data1d, str(datadir / 'one_d'))
+    job1d = [j for j in jobs if 'one_d' in j['path']][0]
+    assert not render.isUpToDate(job1d, manifest[render.jobKey(job1d)])
@@ -0,0 +1,98 @@
+"""Tests for the storage backends."""
+import numpy as np
+import pytest
+
+from plottr.data import datadict as dd
+from plottr.data.storage import DDH5Backend, RawBackend, RawLoader
+from plottr.node.tools import linearFlowchart
+
+
+def _data(start, stop):
+    x = np.arange(start, stop, dtype=float)
+    return dd.DataDict(
+        x=dict(values=x, unit='V'),
+        y=dict(values=np.repeat(x.reshape(-1, 1), 3, axis=1), axes=['x']),
+        __info__='some info',
+    )
+
+
+@pytest.mark.parametrize('backend', [DDH5Backend(), RawBackend()])
+def test_write_append_read(tmp_path, backend):
+    path = str(tmp_path / 'data')
+    backend.write(_data(0, 5), path)
+    backend.append(_data(5, 8), path)
+    backend.append(_data(8, 10), path, groupname='other')
+
+    data = backend.read(path)
+    assert data.validate()
+    assert np.array_equal(data.data_vals('x'), np.arange(8.))
+    assert data.data_vals('y').shape == (8, 3)
+    assert data.axes('y') == ['x']
+    assert data['x']['unit'] == 'V'
+    assert data.meta_val('info') == 'some info'
+
+    tail = backend.read_tail(path, 6)
+    assert np.array_equal(tail.data_vals('x'), [6., 7.])
+    part = backend.read(path, startidx=2, stopidx=4)
+    assert np.array_equal(part.data_vals('y')[:, 0], [2., 3.])
+
+    structure = backend.read_structure(path)
+    assert structure.data_vals('x').size == 0
+    assert structure.meta_val('shape', 'y') == (8, 3)
+
+    other = backend.read(path, groupname='other')
+    assert np.array_equal(other.data_vals('x'), [8., 9.])
+
+    backend.write(_data(0, 2), path)
+    assert backend.read(path).nrecords() == 2
+
+
+def test_raw_backend(tmp_path):
+    backend = RawBackend()
+    path = str(tmp_path / 'data')
+    backend.append(_data(0, 5), path)
+
+    # incomplete records (e.g., while writing) are not read
+    with open(backend.groupdir(path) + '/x.bin', 'ab') as f:
+        f.write(b'\x00' * 12)
+    assert backend.nrecords(path) == 5
+
+    # ... and dropped when appending, so all fields stay aligned
+    backend.append(_data(5, 7), path)
+    data = backend.read(path)
+    assert np.array_equal(data.data_vals('x'), np.arange(7.))
+    assert np.array_equal(data.data_vals('y')[:, 0], np.arange(7.))
+
+    # same for records that have only been written for some fields
+    with open(backend.groupdir(path) + '/x.bin', 'ab') as f:
+        np.arange(7., 9.).tofile(f)
+    backend.append(_data(7, 9), path)
+    data = backend.read(path)
+    assert np.array_equal(data.data_vals('x'), np.arange(9.))
+    assert np.array_equal(data.data_vals('y')[:, 0], np.arange(9.))
+
+    with pytest.raises(ValueError):
+        backend.append(dd.DataDict(x=dict(values=[1.])), path)
+    with pytest.raises(ValueError):
+        backend.write(dd.DataDict(x=dict(values=np.array([None, 'a']))),
+                      path, groupname='objects')
+    with pytest.raises(ValueError):
+        backend.read(path, groupname='missing')
+
+
+def test_raw_loader(qtbot, tmp_path, monkeypatch):
+    monkeypatch.setattr(RawLoader, 'useUi', False)
+    backend = RawBackend()
+    path = str(tmp_path / 'data') + backend.extension
+    backend.write(_data(0, 5), path)
+
+    fc = linearFlowchart(('loader', RawLoader))
+    fc.nodes()['loader'].filepath = path
+    assert np.array_equal(fc.outputValues()['dataOut'].data_vals('x'),
+                          np.arange(5.))
+
+    backend.append(_data(5, 7), path)
+    fc.nodes()['loader'].update()
+    out = fc.outputValues()['dataOut']
+    assert np.array_equal(out.data_vals('x'), np.arange(7.))
+    assert out.limits('x') == (0., 6.)